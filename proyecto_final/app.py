@@ -5,19 +5,25 @@ FACEGUARD - Sistema de Reconocimiento Facial
 import os
 import sys
 import threading
+import time
 from datetime import datetime
 
 import cv2
-import numpy as np
 from config import Config
 from datasets.capturador import CapturadorDataset
+from modules.entrenamiento import entrenar_galeria, formatear_duracion
 from modules.reconocimiento import SistemaReconocimiento
 from utils.alert_logger import AlertLogger
+from utils.calidad import evaluar_rostros
+from utils.deduplicacion import DeduplicadorDesconocidos
+from utils.estadisticas import EstadisticasSesion
 from utils.draw_utils import (
-    dibujar_bbox,
-    dibujar_menu_seleccion,
-    mostrar_mensaje_centro,
+    dibujar_detecciones_lote,
+    renderizar_menu,
 )
+from utils.file_utils import LimpiadorTemporales
+from utils.overlay import RenderizadorHUD
+from utils.registro_eventos import RegistroEventos
 
 # Agregar paths necesarios
 sys.path.append(os.path.dirname(__file__))
@@ -36,10 +42,15 @@ class AplicacionFaceGuard:
         Config.init_app()
 
         self.frame_count = 0
-        self.detecciones_sesion = []
-        self.alertas_sesion = []
+        self.estadisticas = EstadisticasSesion()
         self.alert_logger = AlertLogger()
-        self.desconocidos_guardados = set()
+        self.deduplicador = DeduplicadorDesconocidos()
+        self.limpiador = LimpiadorTemporales()
+        self.registro_eventos = None
+        self.hud = RenderizadorHUD(
+            "FACEGUARD - Sistema de Reconocimiento - SECTOR A",
+            "Q - Salir | ESPACIO - Pausar | R - Reiniciar | S - Screenshot",
+        )
 
         self.processing_thread = None
         self.thread_activo = False
@@ -54,21 +65,19 @@ class AplicacionFaceGuard:
         Returns:
             int: Opcion seleccionada (1-3) o 0 para salir
         """
-        # Crear frame negro para el menu
-        frame = np.ones((720, 1280, 3), dtype="uint8") * 255
-
-        opciones = ["Capturar nuevo dataset de persona", "Entrenar modelo de reconocimiento", "Reconocimiento facial en tiempo real", "Salir"]
+        opciones = ("Capturar nuevo dataset de persona", "Entrenar modelo de reconocimiento", "Reconocimiento facial en tiempo real", "Salir")
 
         seleccion = 0
+        seleccion_mostrada = None
 
         while True:
-            # Dibujar menu
-            frame_menu = frame.copy()
-            frame_menu = dibujar_menu_seleccion(frame_menu, opciones, seleccion, "FACEGUARD - MENU PRINCIPAL")
-
-            cv2.imshow("FaceGuard", frame_menu)
+            # Redibujar solo si cambio la seleccion (los frames del menu estan cacheados)
+            if seleccion != seleccion_mostrada:
+                cv2.imshow("FaceGuard", renderizar_menu(opciones, seleccion, "FACEGUARD - MENU PRINCIPAL"))
+                seleccion_mostrada = seleccion
 
-            key = cv2.waitKeyEx(10)
+            # Espera bloqueante: sin teclas no hay trabajo
+            key = cv2.waitKeyEx(0)
 
             # Tecla arriba: flecha arriba o W
             if key == 2490368 or key == ord("w") or key == ord("W"):
@@ -107,21 +116,19 @@ class AplicacionFaceGuard:
         Menu para capturar dataset de una persona
         """
         # Menu visual para seleccionar categoria
-        frame = np.ones((720, 1280, 3), dtype="uint8") * 255
-
-        categorias_opciones = ["Empleado", "VIP", "Visitante"]
+        categorias_opciones = ("Empleado", "VIP", "Visitante")
         categorias_map = {0: "empleados", 1: "vip", 2: "visitantes"}
 
         seleccion = 0
+        seleccion_mostrada = None
 
         # Seleccionar categoria
         while True:
-            frame_menu = frame.copy()
-            frame_menu = dibujar_menu_seleccion(frame_menu, categorias_opciones, seleccion, "SELECCIONAR CATEGORIA")
-
-            cv2.imshow("FaceGuard - Captura Dataset", frame_menu)
+            if seleccion != seleccion_mostrada:
+                cv2.imshow("FaceGuard - Captura Dataset", renderizar_menu(categorias_opciones, seleccion, "SELECCIONAR CATEGORIA"))
+                seleccion_mostrada = seleccion
 
-            key = cv2.waitKeyEx(10)
+            key = cv2.waitKeyEx(0)
 
             # Flechas arriba/abajo o W/S
             if key == 2490368 or key == ord("w") or key == ord("W"):
@@ -154,9 +161,11 @@ class AplicacionFaceGuard:
                 break
             print("Nombre invalido (no uses numeros)")
 
+        automatico = input("Captura automatica? [S/n]: ").strip().lower() != "n"
+
         # Capturar dataset
         capturador = CapturadorDataset()
-        exito = capturador.capturar_dataset_persona(nombre, categoria, objetivo=10)
+        exito = capturador.capturar_dataset_persona(nombre, categoria, objetivo=10, automatico=automatico)
 
         if exito:
             print("\nDataset capturado exitosamente!")
@@ -174,39 +183,18 @@ class AplicacionFaceGuard:
         Returns:
             frame: Frame con informacion dibujada
         """
-        altura, ancho = frame.shape[:2]
+        latencia = self.estadisticas.resumen_latencia()
+        texto_latencia = f"{latencia['ultima']:.0f} ms" if latencia else "-"
+        descartados = self.estadisticas.frames_descartados + self.estadisticas.resultados_descartados
 
-        # Fondo semi-transparente para el panel de info
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (ancho, 120), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
-
-        # Titulo
-        cv2.putText(frame, "FACEGUARD - Sistema de Reconocimiento - SECTOR A", (20, 35), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-
-        # Informacion
         info_textos = [
-            f"Frame: {self.frame_count}",
+            f"Frame: {self.frame_count} | Latencia: {texto_latencia} | Descartados: {descartados}",
             f"Personas registradas: {len(sistema.roles_cache)}",
-            f"Detecciones sesion: {len(self.detecciones_sesion)}",
-            f"Alertas generadas: {len(self.alertas_sesion)}",
+            f"Detecciones sesion: {self.estadisticas.total_detecciones}",
+            f"Alertas generadas: {self.estadisticas.total_alertas}",
         ]
 
-        y_pos = 65
-        for texto in info_textos:
-            cv2.putText(frame, texto, (20, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
-            y_pos += 25
-
-        # Controles
-        cv2.putText(
-            frame,
-            "Q - Salir | ESPACIO - Pausar | R - Reiniciar | S - Screenshot",
-            (20, altura - 20),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            (200, 200, 200),
-            1,
-        )
+        self.hud.dibujar_info(frame, info_textos)
 
         return frame
 
@@ -221,10 +209,8 @@ class AplicacionFaceGuard:
         Returns:
             frame: Frame con detecciones dibujadas
         """
-        for deteccion in detecciones:
-            frame = dibujar_bbox(frame, deteccion["bbox"], deteccion["nombre"], deteccion["rol"], deteccion["confianza"], deteccion["autorizado"])
-
-        return frame
+        # Las pistas cerradas al salir de cuadro alertan pero ya no tienen rostro en pantalla
+        return dibujar_detecciones_lote(frame, [d for d in detecciones if not d.get("pista_cerrada")])
 
     def mostrar_alerta(self, frame, alerta):
         """
@@ -234,8 +220,6 @@ class AplicacionFaceGuard:
             frame: Frame de OpenCV
             alerta: Informacion de la alerta
         """
-        altura, ancho = frame.shape[:2]
-
         # Panel de alerta en la parte superior
         if alerta["tipo_alerta"] == "critico":
             color_alerta = (0, 0, 255)
@@ -251,38 +235,46 @@ class AplicacionFaceGuard:
             texto_nivel = "NOTIFICACION"
 
         # Parpadeo para alertas criticas
-        if alerta["tipo_alerta"] == "critico" and self.frame_count % 10 < 5:
-            # Fondo de alerta
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (0, 150), (ancho, 250), color_alerta, -1)
-            cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
-
-        # Panel de alerta
-        cv2.rectangle(frame, (50, 150), (ancho - 50, 250), color_alerta, 3)
-        cv2.rectangle(frame, (50, 150), (ancho - 50, 190), color_alerta, -1)
-
-        # Texto de alerta
-        cv2.putText(frame, texto_nivel, (70, 180), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3)
+        parpadeo = alerta["tipo_alerta"] == "critico" and self.frame_count % 10 < 5
 
         analysis_text = alerta["analysis"] if alerta["tipo_alerta"] == "critico" else ""
         persona_text = f"Persona: {alerta['nombre']} {analysis_text}"
-        cv2.putText(frame, persona_text, (70, 215), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
 
-        cv2.putText(frame, f"Rol: {alerta['rol']}", (70, 240), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        self.hud.dibujar_alerta(frame, texto_nivel, persona_text, f"Rol: {alerta['rol']}", color_alerta, parpadeo)
 
     def guardar_screenshot(self, deteccion):
-        if deteccion.get("nombre") == "Desconocido":
-            det_id = f"{deteccion['bbox']['x']}_{deteccion['bbox']['y']}_{self.frame_count}"
+        """
+        Guarda el recorte de un desconocido, deduplicando por embedding
+
+        Args:
+            deteccion: Deteccion con rostro_img y embedding
+        """
+        if deteccion.get("nombre") != "Desconocido":
+            return
+
+        rostro_img = deteccion.get("rostro_img")
+        if rostro_img is None or rostro_img.size == 0:
+            return
+
+        # Puntuacion del motor de calidad sobre el recorte completo (sin umbrales de rechazo)
+        alto, ancho = rostro_img.shape[:2]
+        calidad = float(evaluar_rostros(rostro_img, [(0, 0, ancho, alto)], verificar_centrado=False)["puntuacion"][0])
+
+        accion, entrada = self.deduplicador.registrar(deteccion.get("embedding"), calidad)
 
-            if det_id not in self.desconocidos_guardados:
-                self.desconocidos_guardados.add(det_id)
+        if accion is None:
+            return
+
+        if accion == "nuevo":
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            entrada["ruta"] = os.path.join(Config.TEMP_DIR, f"desconocido_{timestamp}.jpg")
 
-                rostro_img = deteccion.get("rostro_img")
-                if rostro_img is not None:
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                    filename = os.path.join(Config.TEMP_DIR, f"desconocido_{timestamp}.jpg")
-                    cv2.imwrite(filename, rostro_img)
-                    print(f"Rostro desconocido guardado: {filename}")
+        cv2.imwrite(entrada["ruta"], rostro_img)
+
+        if accion == "nuevo":
+            print(f"Rostro desconocido guardado: {entrada['ruta']}")
+        else:
+            print(f"Rostro desconocido actualizado (mejor calidad): {entrada['ruta']}")
 
     def guardar_screenshot_manual(self, frame):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -304,17 +296,29 @@ class AplicacionFaceGuard:
         print(f"Detecciones exitosas: {stats['detecciones_exitosas']}")
         print(f"Alertas generadas: {stats['alertas_generadas']}")
         print(f"Tasa de exito: {stats['tasa_exito']}%")
-
-        if self.detecciones_sesion:
+        print(f"Inferencias: {stats['inferencias']} (~{stats['costo_inferencia_ms']} ms c/u) | Evitadas: {stats['inferencias_evitadas']} | Postergadas por presupuesto: {stats['rostros_postergados']}")
+        latencia = self.estadisticas.resumen_latencia()
+        if latencia:
+            print(f"Latencia captura -> resultado: media {latencia['media']:.0f} ms | p95 {latencia['p95']:.0f} ms | max {latencia['max']:.0f} ms")
+        print(f"Frames descartados por viejos: {self.estadisticas.frames_descartados} | Resultados descartados: {self.estadisticas.resultados_descartados}")
+        print(f"Temporales eliminados: {self.limpiador.archivos_eliminados} ({self.limpiador.bytes_liberados / (1024 * 1024):.1f} MB liberados)")
+
+        if self.estadisticas.total_detecciones:
             print("\nPersonas detectadas en esta sesion:")
-            personas_unicas = set([d["nombre"] for d in self.detecciones_sesion])
-            for persona in personas_unicas:
-                cantidad = sum(1 for d in self.detecciones_sesion if d["nombre"] == persona)
+            for persona, cantidad in self.estadisticas.por_persona.most_common():
                 print(f"  - {persona}: {cantidad} veces")
 
-        if self.alertas_sesion:
-            print("\nAlertas generadas:")
-            for alerta in self.alertas_sesion[-5:]:
+            print("\nDetecciones por rol:")
+            for rol, cantidad in self.estadisticas.por_rol.most_common():
+                print(f"  - {rol}: {cantidad}")
+
+        if self.estadisticas.total_alertas:
+            print("\nAlertas por nivel:")
+            for nivel, cantidad in self.estadisticas.por_nivel_alerta.most_common():
+                print(f"  - {nivel}: {cantidad}")
+
+            print("\nUltimas alertas:")
+            for alerta in self.estadisticas.ultimas_alertas(5):
                 print(f"  - {alerta['timestamp']}: {alerta['nombre']} ({alerta['tipo_alerta']})")
 
         print("\n" + "=" * 70)
@@ -326,8 +330,18 @@ class AplicacionFaceGuard:
                 self.frame_a_procesar = None
 
             if frame_data is not None:
-                frame_num, frame = frame_data
-                resultado = sistema.procesar_frame(frame)
+                frame_num, capturado, frame = frame_data
+
+                # Un frame demasiado viejo ya no describe la escena: no se gasta inferencia en el
+                if time.monotonic() - capturado > Config.LATENCIA_MAX_EDAD_FRAME:
+                    self.estadisticas.frames_descartados += 1
+                    continue
+
+                resultado = sistema.procesar_frame(frame, capturado)
+
+                # Un evento por embedding nuevo (las pistas finalizadas no vuelven a pasar por el modelo)
+                for evento in resultado["eventos"]:
+                    self.registro_eventos.registrar(evento)
 
                 with self.lock:
                     self.resultado_listo = (frame_num, resultado)
@@ -364,9 +378,10 @@ class AplicacionFaceGuard:
         print("\nIniciando deteccion...\n")
 
         self.frame_count = 0
-        self.detecciones_sesion = []
-        self.alertas_sesion = []
-        self.desconocidos_guardados.clear()
+        self.estadisticas.reiniciar()
+        self.deduplicador.reiniciar()
+
+        self.registro_eventos = RegistroEventos()
 
         self.thread_activo = True
         self.frame_a_procesar = None
@@ -375,39 +390,52 @@ class AplicacionFaceGuard:
         self.processing_thread = threading.Thread(target=self.procesamiento_thread_worker, args=(sistema,), daemon=True)
         self.processing_thread.start()
 
+        self.limpiador.iniciar()
         self.alert_logger.log_sesion_inicio()
 
         pausado = False
+        frame_pausado = False
         ultima_alerta = None
         frames_desde_alerta = 0
         ultimo_frame_procesado = -1
         detecciones_actuales = []
+        capturado_actual = None
 
         try:
             while True:
                 if not pausado:
                     frame = sistema.capturar_frame()
+                    capturado = time.monotonic()
 
                     if frame is None:
                         print("Error capturando frame")
                         break
 
+                    # Siempre el frame mas nuevo: si el worker no tomo el anterior, se reemplaza
                     if self.frame_count % Config.PROCESAR_CADA_N_FRAMES == 0:
                         with self.lock:
-                            if self.frame_a_procesar is None:
-                                self.frame_a_procesar = (self.frame_count, frame.copy())
+                            self.frame_a_procesar = (self.frame_count, capturado, frame.copy())
 
                     with self.lock:
                         if self.resultado_listo is not None:
                             frame_num, resultado = self.resultado_listo
                             self.resultado_listo = None
 
-                            if frame_num > ultimo_frame_procesado:
+                            edad_resultado = time.monotonic() - resultado["capturado"]
+                            self.estadisticas.registrar_latencia(resultado["latencia_ms"])
+
+                            if edad_resultado > Config.LATENCIA_MAX_EDAD_RESULTADO:
+                                # Resultado viejo: no se dibuja ni genera alertas
+                                self.estadisticas.resultados_descartados += 1
+
+                            elif frame_num > ultimo_frame_procesado:
                                 ultimo_frame_procesado = frame_num
                                 detecciones_actuales = resultado["detecciones"]
+                                capturado_actual = resultado["capturado"]
 
                                 if detecciones_actuales:
-                                    self.detecciones_sesion.extend(detecciones_actuales)
+                                    for det in detecciones_actuales:
+                                        self.estadisticas.registrar_deteccion(det)
 
                                     print(f"\nFrame {frame_num}:")
                                     for det in detecciones_actuales:
@@ -430,10 +458,15 @@ class AplicacionFaceGuard:
                                                 "rol": det["rol"],
                                                 "tipo_alerta": det["tipo_alerta"],
                                             }
-                                            self.alertas_sesion.append(alerta_info)
+                                            self.estadisticas.registrar_alerta(alerta_info)
                                             self.alert_logger.log_alerta(det)
                                             print(f"\n  ALERTA: {det['nombre']} - {det['tipo_alerta']}")
 
+                    # Las cajas dejan de dibujarse cuando su frame ya es demasiado viejo
+                    if capturado_actual is not None and time.monotonic() - capturado_actual > Config.LATENCIA_MAX_EDAD_RESULTADO:
+                        detecciones_actuales = []
+                        capturado_actual = None
+
                     frame = self.dibujar_detecciones(frame, detecciones_actuales)
 
                     if ultima_alerta and frames_desde_alerta < 60:
@@ -443,8 +476,10 @@ class AplicacionFaceGuard:
                     frame = self.mostrar_info_pantalla(frame, sistema)
                     self.frame_count += 1
 
-                else:
-                    frame = mostrar_mensaje_centro(frame, "PAUSADO - Presiona ESPACIO para continuar", (255, 255, 0))
+                elif not frame_pausado:
+                    # El frame en pausa no cambia: el mensaje se dibuja una sola vez
+                    self.hud.dibujar_mensaje_centro(frame, "PAUSADO - Presiona ESPACIO para continuar", (255, 255, 0))
+                    frame_pausado = True
 
                 cv2.imshow("FaceGuard - Reconocimiento Facial", frame)
 
@@ -455,19 +490,20 @@ class AplicacionFaceGuard:
                     break
                 elif key == ord(" "):
                     pausado = not pausado
+                    frame_pausado = False
                     estado = "PAUSADO" if pausado else "REANUDADO"
                     print(f"\n{estado}")
                 elif key == ord("s") or key == ord("S"):
                     self.guardar_screenshot_manual(frame)
                 elif key == ord("r") or key == ord("R"):
-                    self.detecciones_sesion = []
-                    self.alertas_sesion = []
+                    self.estadisticas.reiniciar()
                     self.frame_count = 0
                     detecciones_actuales = []
+                    capturado_actual = None
                     ultima_alerta = None
                     frames_desde_alerta = 0
                     ultimo_frame_procesado = -1
-                    self.desconocidos_guardados.clear()
+                    self.deduplicador.reiniciar()
                     print("\nEstadisticas reiniciadas")
 
         except KeyboardInterrupt:
@@ -479,11 +515,14 @@ class AplicacionFaceGuard:
             if self.processing_thread and self.processing_thread.is_alive():
                 self.processing_thread.join(timeout=2.0)
 
+            self.limpiador.detener()
+            self.registro_eventos.cerrar()
+
             self.alert_logger.log_sesion_fin(
                 {
                     "frames_procesados": self.frame_count,
-                    "total_detecciones": len(self.detecciones_sesion),
-                    "alertas_generadas": len(self.alertas_sesion),
+                    "total_detecciones": self.estadisticas.total_detecciones,
+                    "alertas_generadas": self.estadisticas.total_alertas,
                 }
             )
 
@@ -545,49 +584,22 @@ class AplicacionFaceGuard:
         print("-" * 70 + "\n")
 
         try:
-            from deepface import DeepFace
-
-            # Procesar cada categoria
-            imagenes_procesadas = 0
-            errores = 0
-
-            for categoria in ["empleados", "vip", "visitantes"]:
-                ruta_categoria = os.path.join(Config.DATABASE_DIR, categoria)
-                if not os.path.exists(ruta_categoria):
-                    continue
-
-                print(f"\nProcesando categoria: {categoria.upper()}")
-                personas = [p for p in os.listdir(ruta_categoria) if os.path.isdir(os.path.join(ruta_categoria, p))]
-
-                for persona in personas:
-                    ruta_persona = os.path.join(ruta_categoria, persona)
-                    imagenes = [f for f in os.listdir(ruta_persona) if f.endswith((".jpg", ".png"))]
-
-                    print(f"  - {persona}: {len(imagenes)} imagenes", end=" ")
-
-                    for imagen in imagenes:
-                        ruta_imagen = os.path.join(ruta_persona, imagen)
-                        try:
-                            # DeepFace generara y cacheara las representaciones
-                            DeepFace.represent(
-                                img_path=ruta_imagen,
-                                model_name=Config.MODELO_FACIAL,
-                                detector_backend=Config.DETECTOR_BACKEND,
-                                enforce_detection=False,
-                            )
-                            imagenes_procesadas += 1
-                        except Exception:
-                            errores += 1
-
-                    print("[OK]")
+            resumen = entrenar_galeria()
 
             print("\n" + "-" * 70)
-            print("ENTRENAMIENTO COMPLETADO")
+            print("ENTRENAMIENTO INTERRUMPIDO" if resumen["interrumpido"] else "ENTRENAMIENTO COMPLETADO")
             print("-" * 70)
-            print(f"\nImagenes procesadas exitosamente: {imagenes_procesadas}")
-            print(f"Errores: {errores}")
+            print(f"\nImagenes procesadas exitosamente: {resumen['procesadas']}")
+            print(f"Reutilizadas del cache: {resumen['desde_cache']}")
+            print(f"Errores: {resumen['errores']}")
+            print(f"Tiempo: {formatear_duracion(resumen['duracion'])}")
+
+            if resumen["errores"]:
+                print("\nCausas de error:")
+                for causa, cantidad in resumen["causas"].most_common():
+                    print(f"  - {causa}: {cantidad} (p.ej. {os.path.relpath(resumen['ejemplos'][causa], Config.DATABASE_DIR)})")
 
-            if imagenes_procesadas > 0:
+            if resumen["procesadas"] + resumen["desde_cache"] > 0:
                 print("\nEl modelo esta listo para usar en reconocimiento en tiempo real")
             else:
                 print("\nADVERTENCIA: No se pudo procesar ninguna imagen")
@@ -13,6 +13,7 @@ class Config:
     DATABASE_DIR = os.path.join(BASE_DIR, "backend", "database")
     LOGS_DIR = os.path.join(BASE_DIR, "backend", "logs")
     TEMP_DIR = os.path.join(BASE_DIR, "backend", "temp")
+    EVENTOS_DIR = os.path.join(BASE_DIR, "backend", "eventos")
 
     # Camara
     CAMERA_INDEX = 0
@@ -21,14 +22,117 @@ class Config:
     CAMERA_FPS = 30
 
     # Reconocimiento Facial
+    # "Facenet" usa DeepFace/TensorFlow; "Facenet-onnx" usa ONNX Runtime en CPU (sin TensorFlow solo con DETECTOR_BACKEND = "yunet")
     MODELO_FACIAL = "Facenet"
+    # "opencv" usa el wrapper de DeepFace; "yunet" usa cv2.FaceDetectorYN con alineacion por landmarks
     DETECTOR_BACKEND = "opencv"
     UMBRAL_CONFIANZA = 50
+    # Distancia coseno maxima aceptada (equivale al filtro que aplicaba DeepFace.find para Facenet)
+    UMBRAL_DISTANCIA = 0.40
+    # Edad/genero/etnia de los desconocidos con DeepFace.analyze (carga TensorFlow; nunca con un modelo -onnx)
+    ANALIZAR_DESCONOCIDOS = True
+
+    # ONNX Runtime
+    ONNX_MODELOS_DIR = os.path.join(BASE_DIR, "models")
+    ONNX_HILOS_INTRA = 2
+    ONNX_HILOS_INTER = 1
+
+    # Detector YuNet (DETECTOR_BACKEND = "yunet")
+    YUNET_MODELO = os.path.join(BASE_DIR, "models", "face_detection_yunet_2023mar.onnx")
+    YUNET_UMBRAL_SCORE = 0.8
+    YUNET_UMBRAL_NMS = 0.3
+    YUNET_TOP_K = 50
+
+    # Galeria: "completa" compara contra todas las fotos; "prototipos" busca en dos etapas
+    # (medir antes con scripts/evaluar_prototipos.py que no pierde aciertos en la base propia)
+    GALERIA_MODO = "completa"
+    GALERIA_PROTOTIPOS_POR_PERSONA = 1
+    GALERIA_CANDIDATOS = 3
+    # Precision en memoria: "float32", "float16" o "int8" (ver scripts/evaluar_cuantizacion.py)
+    GALERIA_PRECISION = "float32"
+
+    # Entrenamiento en paralelo (un modelo cargado por proceso)
+    ENTRENAMIENTO_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+    ENTRENAMIENTO_CHECKPOINT_SEGUNDOS = 30
+
+    # Indice de integridad de la base de datos (scripts/indexar_database.py)
+    # Distancia de Hamming maxima entre dHash de 64 bits para considerar dos fotos casi iguales
+    INDICE_DISTANCIA_HAMMING = 6
+    # Las fotos podadas se mueven aqui (fuera de la base de datos), no se borran
+    INDICE_PODADAS_DIR = os.path.join(BASE_DIR, "backend", "podadas")
 
     # Procesamiento
     PROCESAR_CADA_N_FRAMES = 10
+    # Edad maxima (segundos desde la captura) de un frame al empezar a procesarlo: si es mayor se descarta
+    LATENCIA_MAX_EDAD_FRAME = 0.5
+    # Edad maxima de un resultado para dibujarlo y alertar; los mas viejos se descartan
+    LATENCIA_MAX_EDAD_RESULTADO = 1.5
+    # Rostros identificados (inferencias del modelo) por frame como maximo
     MAX_DETECCIONES = 1
 
+    # Planificador de identificaciones (modules/planificador.py)
+    # Rostros que se siguen y muestran por frame; MAX_DETECCIONES limita cuantos pasan por el modelo
+    PLANIFICADOR_MAX_ROSTROS = 10
+    # Tiempo de identificacion por frame (la primera inferencia siempre se hace)
+    PLANIFICADOR_PRESUPUESTO_MS = 120
+    PLANIFICADOR_COSTO_INICIAL_MS = 60
+    # "pendiente" favorece a las pistas sin ninguna decision sobre las que re-verifican (ver VOTACION_REVERIFICAR_SEGUNDOS)
+    PLANIFICADOR_PESOS = {"nueva": 4.0, "pendiente": 2.0, "tamano": 1.0, "zona_puerta": 2.0, "espera": 1.5}
+    # Zona de la puerta (x0, y0, x1, y1) relativa al frame, ej. (0.3, 0.0, 0.7, 1.0); None la desactiva
+    PLANIFICADOR_ZONA_PUERTA = None
+    # Alto del rostro (fraccion del frame) a partir del cual el criterio de tamano da el maximo
+    PLANIFICADOR_ALTO_REFERENCIA = 0.4
+    # Segundos sin identificar a partir de los cuales el criterio de espera da el maximo
+    PLANIFICADOR_ESPERA_MAX = 2.0
+
+    # Filtro de calidad antes del embedding (utils.calidad, mismas metricas que la captura)
+    CALIDAD_LADO_MIN = 60
+    CALIDAD_BRILLO_MIN = 40
+    CALIDAD_BRILLO_MAX = 220
+    CALIDAD_NITIDEZ_MIN = 20
+    # Frames procesados que se aplaza un rostro de mala calidad antes de identificar su mejor recorte
+    CALIDAD_MAX_APLAZAMIENTOS = 3
+
+    # Seguimiento de rostros entre frames procesados
+    SEGUIMIENTO_UMBRAL_IOU = 0.3
+    SEGUIMIENTO_MAX_PERDIDOS = 3
+
+    # Votacion temporal de identidad por pista (media de embeddings)
+    VOTACION_VENTANA = 5
+    VOTACION_MIN_MUESTRAS = 2
+    # Distancia de la media por debajo de la cual un match se da por final
+    VOTACION_DISTANCIA_FINAL = 0.25
+    # Margen sobre UMBRAL_DISTANCIA a partir del cual un desconocido se da por final
+    VOTACION_MARGEN_DESCONOCIDO = 0.10
+    # Segundos tras los cuales una pista finalizada vuelve a votar (puede haber cambiado de persona)
+    VOTACION_REVERIFICAR_SEGUNDOS = 10.0
+
+    # Deduplicacion de desconocidos
+    DEDUP_UMBRAL_DISTANCIA = 0.40
+    DEDUP_VENTANA_SEGUNDOS = 300
+    DEDUP_MAX_ENTRADAS = 64
+
+    # Agrupamiento offline de desconocidos guardados (scripts/agrupar_desconocidos.py)
+    DESCONOCIDOS_GRUPOS_DIR = os.path.join(BASE_DIR, "backend", "desconocidos")
+    # Mas estricto que DEDUP_UMBRAL_DISTANCIA: la union por vecinos encadena pares cercanos
+    AGRUPAMIENTO_UMBRAL_DISTANCIA = 0.30
+    AGRUPAMIENTO_MIN_TAMANO = 3
+
+    # Sesion
+    HISTORIAL_SESION_MAX = 200
+
+    # Captura automatica de dataset
+    CAPTURA_ESCALA = 0.5
+    CAPTURA_PUNTUACION_MIN = 70
+    # Similitud de miniaturas (0-1) a partir de la cual dos fotos se consideran repetidas
+    CAPTURA_SIMILITUD_MAX = 0.92
+    CAPTURA_INTERVALO_MIN = 0.3
+    CAPTURA_TIEMPO_MAX = 60
+    # Embeber y agregar a la galeria cada foto al capturarla (sin "Entrenar modelo")
+    REGISTRO_INSTANTANEO = True
+    # Cada cuantos segundos una sesion en curso revisa si el cache de la galeria cambio
+    GALERIA_REVISION_SEGUNDOS = 2
+
     # Categorias y Roles
     ROLES = {
         "empleados": {"nombre": "Empleado", "nivel_acceso": 2, "genera_alerta": False},
@@ -44,6 +148,15 @@ class Config:
         "critico": {"color": "red", "prioridad": 4},
     }
 
+    # Limpieza de temporales
+    TEMP_MAX_EDAD_MINUTOS = 24 * 60
+    TEMP_MAX_MB = 500
+    TEMP_INTERVALO_LIMPIEZA = 60
+
+    # Registro binario de eventos
+    EVENTOS_TAMANO_SEGMENTO = 4096
+    EVENTOS_VACIAR_SEGUNDOS = 30
+
     # Logs
     LOG_LEVEL = "DEBUG"
     LOG_FILE = os.path.join(LOGS_DIR, "sistema.log")
@@ -56,6 +169,7 @@ class Config:
         os.makedirs(cls.DATABASE_DIR, exist_ok=True)
         os.makedirs(cls.LOGS_DIR, exist_ok=True)
         os.makedirs(cls.TEMP_DIR, exist_ok=True)
+        os.makedirs(cls.EVENTOS_DIR, exist_ok=True)
 
         # Crear subdirectorios de roles
         for rol in cls.ROLES.keys():
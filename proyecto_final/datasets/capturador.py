@@ -4,82 +4,72 @@ Modulo para captura de dataset de rostros
 
 import os
 import sys
+import threading
+import time
 from datetime import datetime
 
 import cv2
+import numpy as np
 from config import Config
+from modules.detector_yunet import DetectorYuNet
+from modules.enrolamiento import EnroladorInstantaneo
+from utils.calidad import evaluar_calidad_foto
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 
-def evaluar_calidad_foto(frame, bbox):
+def crear_detector_rostros():
     """
-    Evalua la calidad de una foto de rostro
-
-    Args:
-        frame: Frame de OpenCV
-        bbox: Tupla (x, y, w, h)
+    Crea el detector de rostros configurado para la captura de dataset
 
     Returns:
-        tuple: (puntuacion, mensaje)
+        callable: Funcion frame -> lista de cajas (x, y, w, h)
     """
-    x, y, w, h = bbox
-
-    # Extraer region del rostro
-    rostro = frame[y: y + h, x: x + w]
+    if Config.DETECTOR_BACKEND == "yunet":
+        return DetectorYuNet().detectar_cajas
 
-    # 1. Verificar tamano
-    if w < 150 or h < 150:
-        return 0, "Rostro muy pequeno - acercate mas"
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
 
-    if w > 500 or h > 500:
-        return 0, "Rostro muy grande - alejate un poco"
+    def detectar(frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return face_cascade.detectMultiScale(gray, 1.3, 5)
 
-    # 2. Verificar brillo
-    gray = cv2.cvtColor(rostro, cv2.COLOR_BGR2GRAY)
-    brillo = gray.mean()
+    return detectar
 
-    if brillo < 60:
-        return 0, "Muy oscuro - mejora la iluminacion"
-    if brillo > 200:
-        return 0, "Muy brillante - reduce la luz"
 
-    # 3. Verificar nitidez (desenfoque)
-    laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-    nitidez = laplacian.var()
-
-    if nitidez < 100:
-        return 0, "Desenfocado - manten quieta la camara"
+def recortar_con_margen(frame, bbox, margen=30):
+    """
+    Recorta el rostro con margen, como se guarda en la base de datos
 
-    # 4. Verificar posicion (centrado)
-    frame_h, frame_w = frame.shape[:2]
-    centro_x = x + w / 2
-    centro_y = y + h / 2
+    Args:
+        frame: Frame de OpenCV
+        bbox: Tupla (x, y, w, h)
+        margen (int): Pixeles de margen alrededor de la caja
 
-    if abs(centro_x - frame_w / 2) > frame_w / 4:
-        return 0, "No centrado horizontalmente"
+    Returns:
+        tuple: (recorte, bbox relativa al recorte)
+    """
+    x, y, w, h = bbox
+    x_min = max(0, x - margen)
+    y_min = max(0, y - margen)
+    x_max = min(frame.shape[1], x + w + margen)
+    y_max = min(frame.shape[0], y + h + margen)
 
-    if abs(centro_y - frame_h / 2) > frame_h / 4:
-        return 0, "No centrado verticalmente"
+    return frame[y_min:y_max, x_min:x_max], (x - x_min, y - y_min, w, h)
 
-    # Calcular puntuacion (0-100)
-    puntuacion_brillo = max(0, 100 - abs(brillo - 130))
-    puntuacion_nitidez = min(100, (nitidez / 500) * 100)
-    puntuacion_tamano = 100 if 200 <= w <= 400 else 50
 
-    puntuacion = (puntuacion_brillo + puntuacion_nitidez + puntuacion_tamano) / 3
+def nombre_archivo_foto(nombre):
+    """
+    Nombre de archivo de una foto de la base de datos: <nombre>_<timestamp>.jpg
 
-    mensaje = "Calidad: "
-    if puntuacion >= 80:
-        mensaje += "EXCELENTE"
-    elif puntuacion >= 60:
-        mensaje += "BUENA"
-    elif puntuacion >= 40:
-        mensaje += "ACEPTABLE"
-    else:
-        mensaje += "REGULAR"
+    Args:
+        nombre (str): Nombre de la persona
 
-    return puntuacion, mensaje
+    Returns:
+        str: Nombre de archivo
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return f"{nombre}_{timestamp}.jpg"
 
 
 class CapturadorDataset:
@@ -89,10 +79,12 @@ class CapturadorDataset:
 
     def __init__(self):
         """Inicializar capturador"""
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        # Mismo detector que el reconocimiento cuando se usa YuNet
+        self._detectar_rostros = crear_detector_rostros()
         Config.init_app()
+        self.enrolador = None
 
-    def capturar_dataset_persona(self, nombre, categoria, objetivo=10):
+    def capturar_dataset_persona(self, nombre, categoria, objetivo=10, automatico=False):
         """
         Captura multiples fotos de una persona para dataset
 
@@ -100,6 +92,7 @@ class CapturadorDataset:
             nombre: Nombre de la persona
             categoria: Categoria (empleados, vip, visitantes)
             objetivo: Cantidad de fotos a capturar
+            automatico: Si True, las fotos se eligen solas (sin presionar ESPACIO)
 
         Returns:
             bool: True si se completo exitosamente
@@ -115,11 +108,18 @@ class CapturadorDataset:
         print("  - Buena iluminacion frontal")
         print("  - No muevas la cabeza bruscamente")
         print("  - Variaciones: con/sin sonrisa, ligeros angulos")
-        print("\nPresiona ESPACIO cuando veas EXCELENTE")
+        if automatico:
+            print("\nLas fotos se capturan solas: mueve levemente la cabeza entre tomas")
+        else:
+            print("\nPresiona ESPACIO cuando veas EXCELENTE")
         print("Presiona Q para cancelar\n")
 
         input("Presiona ENTER para comenzar...")
 
+        # Cada foto aceptada se embebe y se agrega a la galeria mientras se captura
+        if Config.REGISTRO_INSTANTANEO:
+            self.enrolador = EnroladorInstantaneo()
+
         # Iniciar camara
         # cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
         cap = cv2.VideoCapture(0)
@@ -128,10 +128,72 @@ class CapturadorDataset:
             print("Error: No se pudo abrir la camara")
             return False
 
-        fotos_capturadas = 0
-
         print(f"\nCamara iniciada - Capturando {objetivo} fotos...\n")
 
+        if automatico:
+            fotos_capturadas = self._captura_automatica(cap, nombre, carpeta_destino, objetivo)
+        else:
+            fotos_capturadas = self._captura_manual(cap, nombre, carpeta_destino, objetivo)
+
+        cap.release()
+        cv2.destroyAllWindows()
+
+        if self.enrolador is not None:
+            print("\nRegistrando fotos en la galeria...")
+            self.enrolador.cerrar()
+            print(f"{self.enrolador.agregadas} foto(s) disponibles para el reconocimiento")
+            self.enrolador = None
+
+        if fotos_capturadas == objetivo:
+            print("\nDataset completo!")
+            print(f"{fotos_capturadas} fotos guardadas en: {carpeta_destino}")
+            return True
+        else:
+            print(f"\nSolo se capturaron {fotos_capturadas}/{objetivo} fotos")
+            return False
+
+    def _guardar_rostro(self, frame, bbox, carpeta_destino, nombre, filepath=None):
+        """
+        Guarda el recorte del rostro con margen
+
+        Args:
+            frame: Frame original (sin dibujos)
+            bbox: Tupla (x, y, w, h)
+            carpeta_destino: Carpeta de la persona
+            nombre: Nombre de la persona
+            filepath: Ruta a sobrescribir (por defecto una nueva con timestamp)
+
+        Returns:
+            str: Ruta del archivo guardado
+        """
+        rostro, _ = recortar_con_margen(frame, bbox)
+
+        # Guardar
+        if filepath is None:
+            filepath = os.path.join(carpeta_destino, nombre_archivo_foto(nombre))
+
+        cv2.imwrite(filepath, rostro)
+
+        if self.enrolador is not None:
+            self.enrolador.encolar(filepath)
+
+        return filepath
+
+    def _captura_manual(self, cap, nombre, carpeta_destino, objetivo):
+        """
+        Captura con ESPACIO: el operador decide cada foto
+
+        Args:
+            cap: cv2.VideoCapture abierta
+            nombre: Nombre de la persona
+            carpeta_destino: Carpeta de la persona
+            objetivo: Cantidad de fotos a capturar
+
+        Returns:
+            int: Fotos capturadas
+        """
+        fotos_capturadas = 0
+
         while fotos_capturadas < objetivo:
             ret, frame = cap.read()
 
@@ -142,8 +204,7 @@ class CapturadorDataset:
             raw_frame = frame.copy()
 
             # Detectar rostros
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+            faces = self._detectar_rostros(frame)
 
             mensaje_calidad = "No se detecta rostro"
             color_mensaje = (0, 0, 255)
@@ -195,23 +256,7 @@ class CapturadorDataset:
 
             elif key == ord(" ") and puntuacion >= 50 and bbox_valido is not None:
                 # Capturar foto de alta calidad
-                x, y, w, h = bbox_valido
-
-                # Agregar margen
-                margen = 30
-                x_min = max(0, x - margen)
-                y_min = max(0, y - margen)
-                x_max = min(frame.shape[1], x + w + margen)
-                y_max = min(frame.shape[0], y + h + margen)
-
-                rostro = raw_frame[y_min:y_max, x_min:x_max]
-
-                # Guardar
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                filename = f"{nombre}_{timestamp}.jpg"
-                filepath = os.path.join(carpeta_destino, filename)
-
-                cv2.imwrite(filepath, rostro)
+                self._guardar_rostro(raw_frame, bbox_valido, carpeta_destino, nombre)
                 fotos_capturadas += 1
 
                 print(f"  Foto {fotos_capturadas}/{objetivo} capturada - Calidad: {puntuacion:.0f}/100")
@@ -219,13 +264,215 @@ class CapturadorDataset:
                 # Pausa breve
                 cv2.waitKey(500)
 
-        cap.release()
-        cv2.destroyAllWindows()
+        return fotos_capturadas
 
-        if fotos_capturadas == objetivo:
-            print("\nDataset completo!")
-            print(f"{fotos_capturadas} fotos guardadas en: {carpeta_destino}")
-            return True
-        else:
-            print(f"\nSolo se capturaron {fotos_capturadas}/{objetivo} fotos")
-            return False
+    def _captura_automatica(self, cap, nombre, carpeta_destino, objetivo):
+        """
+        Captura sin operador: un hilo evalua los frames y conserva las mejores fotos distintas
+
+        La interfaz solo muestra la camara y el ultimo resultado del evaluador, asi
+        la deteccion y la calidad nunca frenan la vista previa.
+
+        Args:
+            cap: cv2.VideoCapture abierta
+            nombre: Nombre de la persona
+            carpeta_destino: Carpeta de la persona
+            objetivo: Cantidad de fotos a capturar
+
+        Returns:
+            int: Fotos capturadas
+        """
+        seleccion = SeleccionFotos(objetivo)
+        estado = {"frame": None, "evaluacion": None}
+        lock = threading.Lock()
+        terminar = threading.Event()
+
+        def evaluar():
+            while not terminar.is_set():
+                with lock:
+                    frame = estado["frame"]
+                    estado["frame"] = None
+
+                if frame is None:
+                    terminar.wait(0.01)
+                    continue
+
+                bbox, puntuacion, mensaje = self._evaluar_frame_reducido(frame)
+                if bbox is not None and puntuacion >= Config.CAPTURA_PUNTUACION_MIN:
+                    resultado = seleccion.proponer(frame, bbox, puntuacion)
+                    if resultado is not None:
+                        accion, foto = resultado
+                        foto["ruta"] = self._guardar_rostro(frame, bbox, carpeta_destino, nombre, foto.get("ruta"))
+                        if accion == "nueva":
+                            print(f"  Foto {len(seleccion)}/{objetivo} capturada - Calidad: {puntuacion:.0f}/100")
+                        else:
+                            print(f"  Foto reemplazada por una mejor - Calidad: {puntuacion:.0f}/100")
+
+                with lock:
+                    estado["evaluacion"] = (bbox, puntuacion, mensaje)
+
+                if seleccion.completa():
+                    terminar.set()
+
+        hilo = threading.Thread(target=evaluar, daemon=True)
+        hilo.start()
+        inicio = time.time()
+
+        try:
+            while not terminar.is_set():
+                ret, frame = cap.read()
+
+                if not ret:
+                    print("Error capturando frame")
+                    break
+
+                with lock:
+                    estado["frame"] = frame
+                    evaluacion = estado["evaluacion"]
+
+                # Se dibuja sobre una copia: el evaluador puede estar guardando este frame
+                vista = frame.copy()
+                mensaje_calidad, color_mensaje = "No se detecta rostro", (0, 0, 255)
+
+                if evaluacion is not None and evaluacion[0] is not None:
+                    (x, y, w, h), puntuacion, mensaje_calidad = evaluacion
+                    color_mensaje = (0, 255, 0) if puntuacion >= Config.CAPTURA_PUNTUACION_MIN else (0, 165, 255)
+                    cv2.rectangle(vista, (x, y), (x + w, y + h), color_mensaje, 3)
+                    cv2.putText(vista, f"Calidad: {puntuacion:.0f}/100", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color_mensaje, 2)
+
+                cv2.putText(vista, f"Fotos: {len(seleccion)}/{objetivo} (AUTO)", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+                cv2.putText(vista, mensaje_calidad, (20, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color_mensaje, 2)
+
+                cv2.imshow("Captura de Dataset - FACEGUARD", vista)
+
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord("q") or key == ord("Q"):
+                    print("\nCaptura cancelada")
+                    break
+
+                if time.time() - inicio > Config.CAPTURA_TIEMPO_MAX:
+                    print("\nTiempo de captura agotado")
+                    break
+        finally:
+            terminar.set()
+            hilo.join(timeout=2)
+
+        return len(seleccion)
+
+    def _evaluar_frame_reducido(self, frame):
+        """
+        Detecta sobre el frame reducido y mide la calidad del rostro en resolucion completa
+
+        La deteccion es lo costoso y se hace a Config.CAPTURA_ESCALA; la calidad se
+        mide sobre el recorte original para que los umbrales de evaluar_calidad_foto
+        (tamano en pixeles, nitidez) sigan valiendo.
+
+        Args:
+            frame: Frame de OpenCV
+
+        Returns:
+            tuple: (bbox o None, puntuacion, mensaje)
+        """
+        escala = Config.CAPTURA_ESCALA
+        reducido = cv2.resize(frame, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+        faces = self._detectar_rostros(reducido)
+
+        if len(faces) == 0:
+            return None, 0, "No se detecta rostro"
+
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        bbox = (int(x / escala), int(y / escala), int(w / escala), int(h / escala))
+
+        puntuacion, mensaje = evaluar_calidad_foto(frame, bbox)
+        return bbox, puntuacion, mensaje
+
+
+class SeleccionFotos:
+    """
+    Conjunto de las mejores fotos distintas de una captura automatica
+
+    Cada foto se describe con una miniatura en gris normalizada; una foto demasiado
+    parecida a otra ya elegida solo entra si la reemplaza con mejor calidad.
+    """
+
+    def __init__(self, objetivo, similitud_max=None, intervalo_min=None):
+        """
+        Inicializa la seleccion
+
+        Args:
+            objetivo (int): Cantidad de fotos buscadas
+            similitud_max (float): Similitud de miniaturas a partir de la cual se considera duplicada
+            intervalo_min (float): Segundos minimos entre fotos nuevas
+        """
+        self.objetivo = objetivo
+        self.similitud_max = similitud_max if similitud_max is not None else Config.CAPTURA_SIMILITUD_MAX
+        self.intervalo_min = intervalo_min if intervalo_min is not None else Config.CAPTURA_INTERVALO_MIN
+        self.fotos = []
+        self.ultima_nueva = 0.0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.fotos)
+
+    def completa(self):
+        """
+        Returns:
+            bool: True si ya se alcanzo el objetivo
+        """
+        return len(self.fotos) >= self.objetivo
+
+    @staticmethod
+    def descriptor(frame, bbox):
+        """
+        Miniatura 24x24 en gris, centrada y con norma 1
+
+        Args:
+            frame: Frame de OpenCV
+            bbox: Tupla (x, y, w, h)
+
+        Returns:
+            numpy.ndarray: Vector float32
+        """
+        x, y, w, h = bbox
+        gray = cv2.cvtColor(frame[y: y + h, x: x + w], cv2.COLOR_BGR2GRAY)
+        vector = cv2.resize(gray, (24, 24), interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+        vector -= vector.mean()
+        norma = np.linalg.norm(vector)
+        return vector / norma if norma > 0 else vector
+
+    def proponer(self, frame, bbox, puntuacion, ahora=None):
+        """
+        Propone una foto para la seleccion
+
+        Args:
+            frame: Frame de OpenCV
+            bbox: Tupla (x, y, w, h)
+            puntuacion (float): Calidad de la foto
+            ahora (float): Tiempo actual (por defecto time.time())
+
+        Returns:
+            tuple: ("nueva" | "reemplazo", foto) o None si se descarta
+        """
+        ahora = ahora if ahora is not None else time.time()
+        descriptor = self.descriptor(frame, bbox)
+
+        with self.lock:
+            if self.fotos:
+                similitudes = np.stack([f["descriptor"] for f in self.fotos]) @ descriptor
+                idx = int(np.argmax(similitudes))
+
+                if similitudes[idx] >= self.similitud_max:
+                    # Casi igual a una ya elegida: solo la reemplaza si es mejor
+                    foto = self.fotos[idx]
+                    if puntuacion <= foto["puntuacion"]:
+                        return None
+                    foto.update(descriptor=descriptor, puntuacion=puntuacion)
+                    return "reemplazo", foto
+
+            if self.completa() or ahora - self.ultima_nueva < self.intervalo_min:
+                return None
+
+            foto = {"descriptor": descriptor, "puntuacion": puntuacion}
+            self.fotos.append(foto)
+            self.ultima_nueva = ahora
+            return "nueva", foto
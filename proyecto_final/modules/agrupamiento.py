@@ -0,0 +1,108 @@
+"""
+Agrupamiento de rostros desconocidos por similitud de embeddings
+
+Las similitudes se calculan por bloques (nunca la matriz n x n completa) y los
+pares por debajo del umbral de distancia se unen con union-find: cada grupo es
+una componente conexa del grafo de vecinos.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+from config import Config
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+
+def _raiz(padre, i):
+    """Raiz de i en el union-find (con compresion de camino a la mitad)"""
+    while padre[i] != i:
+        padre[i] = padre[padre[i]]
+        i = padre[i]
+    return i
+
+
+def _raices(padre):
+    """Raiz de todos los elementos a la vez (saltos de puntero vectorizados)"""
+    raices = padre.copy()
+    while True:
+        siguientes = raices[raices]
+        if np.array_equal(siguientes, raices):
+            return raices
+        raices = siguientes
+
+
+def agrupar_embeddings(embeddings, umbral_distancia=None, tamano_bloque=2048):
+    """
+    Agrupa embeddings L2-normalizados uniendo todo par a distancia coseno <= umbral
+
+    Primero se procesan los bloques diagonales; en los demas, las aristas se
+    reducen a un par por combinacion de componentes ya unidas, asi un grupo grande
+    repartido en muchos bloques no recorre sus millones de pares en Python.
+
+    Args:
+        embeddings: Matriz (n, d) float32 normalizada
+        umbral_distancia (float): Distancia maxima entre vecinos (por defecto Config.AGRUPAMIENTO_UMBRAL_DISTANCIA)
+        tamano_bloque (int): Filas por bloque (memoria ~ tamano_bloque^2 floats)
+
+    Returns:
+        numpy.ndarray: Etiqueta de grupo por fila; 0 es el grupo mas grande
+    """
+    umbral_distancia = umbral_distancia if umbral_distancia is not None else Config.AGRUPAMIENTO_UMBRAL_DISTANCIA
+    similitud_min = 1.0 - umbral_distancia
+    n = len(embeddings)
+    padre = np.arange(n)
+
+    if n == 0:
+        return padre
+
+    inicios = range(0, n, tamano_bloque)
+    bloques = [(i0, i0) for i0 in inicios] + [(i0, j0) for i0 in inicios for j0 in inicios if j0 > i0]
+
+    for i0, j0 in bloques:
+        i1, j1 = min(i0 + tamano_bloque, n), min(j0 + tamano_bloque, n)
+        vecinos = embeddings[i0:i1] @ embeddings[j0:j1].T >= similitud_min
+
+        if j0 == i0:
+            # Bloque diagonal: solo pares i < j
+            vecinos = np.triu(vecinos, k=1)
+
+        filas, columnas = np.nonzero(vecinos)
+        if len(filas) == 0:
+            continue
+
+        raices = _raices(padre)
+        raiz_i, raiz_j = raices[filas + i0], raices[columnas + j0]
+        distintas = raiz_i != raiz_j
+        pares = np.unique(raiz_i[distintas] * n + raiz_j[distintas])
+
+        for a, b in zip(*np.divmod(pares, n)):
+            raiz_a, raiz_b = _raiz(padre, a), _raiz(padre, b)
+            if raiz_a != raiz_b:
+                padre[raiz_b] = raiz_a
+
+    # Etiquetas consecutivas ordenadas por tamano de grupo
+    unicas, inversa, tamanos = np.unique(_raices(padre), return_inverse=True, return_counts=True)
+    orden = np.argsort(-tamanos, kind="stable")
+    etiquetas = np.empty(len(unicas), dtype=np.int64)
+    etiquetas[orden] = np.arange(len(unicas))
+    return etiquetas[inversa]
+
+
+def fecha_desconocido(ruta):
+    """
+    Fecha en que se vio por primera vez un desconocido guardado
+
+    Args:
+        ruta (str): Archivo desconocido_<AAAAMMDD_HHMMSS_ffffff>.jpg
+
+    Returns:
+        datetime: Fecha del nombre del archivo, o su fecha de modificacion si no la tiene
+    """
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    try:
+        return datetime.strptime(nombre.split("_", 1)[1], "%Y%m%d_%H%M%S_%f")
+    except (IndexError, ValueError):
+        return datetime.fromtimestamp(os.path.getmtime(ruta))
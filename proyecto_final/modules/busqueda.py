@@ -0,0 +1,191 @@
+"""
+Busqueda retroactiva de personas sobre el registro de eventos
+"""
+
+import heapq
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from config import Config
+from modules.detector_yunet import DetectorYuNet, alinear_rostro
+from modules.embeddings import calcular_embedding
+from utils.registro_eventos import RegistroEventos, abrir_segmento, listar_segmentos
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+logger = logging.getLogger(__name__)
+
+# Filas convertidas a float32 por bloque (acota la memoria temporal por hilo)
+FILAS_POR_BLOQUE = 16384
+
+
+def _buscar_en_segmento(ruta, consulta, umbral_distancia, top_k, desde=None, hasta=None):
+    """
+    Busca la consulta dentro de un segmento mapeado en memoria
+
+    Args:
+        ruta (str): Ruta del segmento
+        consulta: Embedding float32 normalizado
+        umbral_distancia (float): Distancia coseno maxima
+        top_k (int): Resultados maximos a devolver
+        desde (float): Epoch minimo (opcional)
+        hasta (float): Epoch maximo (opcional)
+
+    Returns:
+        list: Tuplas (distancia, ruta, indice)
+    """
+    eventos = abrir_segmento(ruta)
+
+    if len(eventos) == 0 or eventos.dtype["embedding"].shape[0] != consulta.shape[0]:
+        return []
+
+    embeddings = eventos["embedding"]
+    distancias = np.empty(len(eventos), dtype=np.float32)
+
+    for inicio in range(0, len(eventos), FILAS_POR_BLOQUE):
+        fin = inicio + FILAS_POR_BLOQUE
+        distancias[inicio:fin] = 1.0 - embeddings[inicio:fin].astype(np.float32) @ consulta
+
+    mascara = distancias <= umbral_distancia
+    if desde is not None or hasta is not None:
+        timestamps = eventos["timestamp"]
+        if desde is not None:
+            mascara &= timestamps >= desde
+        if hasta is not None:
+            mascara &= timestamps <= hasta
+
+    candidatos = np.flatnonzero(mascara)
+    if len(candidatos) > top_k:
+        candidatos = candidatos[np.argpartition(distancias[candidatos], top_k)[:top_k]]
+
+    return [(float(distancias[i]), ruta, int(i)) for i in candidatos]
+
+
+def buscar_persona(embedding, directorio=None, umbral_distancia=None, top_k=50, workers=None, desde=None, hasta=None):
+    """
+    Busca en todos los eventos registrados los rostros parecidos a un embedding
+
+    Cada segmento se procesa en paralelo (las multiplicaciones de NumPy liberan el GIL)
+    y solo se decodifican los campos de los mejores resultados.
+
+    Args:
+        embedding: Embedding normalizado de la persona buscada
+        directorio (str): Directorio del registro (por defecto Config.EVENTOS_DIR)
+        umbral_distancia (float): Distancia coseno maxima (por defecto Config.UMBRAL_DISTANCIA)
+        top_k (int): Cantidad de resultados
+        workers (int): Hilos de busqueda (por defecto os.cpu_count())
+        desde (float): Epoch minimo (opcional)
+        hasta (float): Epoch maximo (opcional)
+
+    Returns:
+        list: Resultados ordenados por distancia (dicts con timestamp, camara, identidad, distancia, bbox, track_id)
+    """
+    umbral_distancia = Config.UMBRAL_DISTANCIA if umbral_distancia is None else umbral_distancia
+    consulta = np.asarray(embedding, dtype=np.float32)
+    segmentos = listar_segmentos(directorio)
+
+    inicio = time.time()
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parciales = pool.map(lambda ruta: _buscar_en_segmento(ruta, consulta, umbral_distancia, top_k, desde, hasta), segmentos)
+        mejores = heapq.nsmallest(top_k, (c for parcial in parciales for c in parcial))
+
+    resultados = []
+    for distancia, ruta, indice in mejores:
+        evento = abrir_segmento(ruta)[indice]
+        resultados.append(
+            {
+                "timestamp": float(evento["timestamp"]),
+                "camara": int(evento["camara"]),
+                "identidad": evento["identidad"].decode("utf-8", errors="replace"),
+                "distancia": distancia,
+                "bbox": tuple(int(v) for v in evento["bbox"]),
+                "track_id": int(evento["track_id"]),
+            }
+        )
+
+    logger.info(f"Busqueda en {len(segmentos)} segmentos: {len(resultados)} resultados en {time.time() - inicio:.2f}s")
+    return resultados
+
+
+def indexar_grabacion(ruta_video, camara=-1, inicio=None, cada_n_frames=None, directorio=None):
+    """
+    Reprocesa una grabacion y agrega sus rostros al registro de eventos
+
+    Los rostros se detectan y embeben igual que en el reconocimiento en vivo (con
+    Config.DETECTOR_BACKEND), asi los eventos de grabaciones y de camara son comparables.
+
+    Args:
+        ruta_video (str): Ruta del video
+        camara (int): Identificador de camara a registrar
+        inicio (float): Epoch del primer frame (por defecto se estima con la fecha del archivo)
+        cada_n_frames (int): Procesar un frame cada N (por defecto Config.PROCESAR_CADA_N_FRAMES)
+        directorio (str): Directorio del registro (por defecto Config.EVENTOS_DIR)
+
+    Returns:
+        int: Cantidad de rostros registrados
+    """
+    cada_n_frames = cada_n_frames or Config.PROCESAR_CADA_N_FRAMES
+
+    if Config.DETECTOR_BACKEND == "yunet":
+        detector_yunet = DetectorYuNet()
+    else:
+        detector_yunet = None
+        from deepface import DeepFace
+
+    cap = cv2.VideoCapture(ruta_video)
+    if not cap.isOpened():
+        logger.error(f"No se pudo abrir el video: {ruta_video}")
+        return 0
+
+    if inicio is None:
+        fps = cap.get(cv2.CAP_PROP_FPS) or Config.CAMERA_FPS
+        duracion = cap.get(cv2.CAP_PROP_FRAME_COUNT) / fps
+        inicio = os.path.getmtime(ruta_video) - duracion
+
+    registro = RegistroEventos(directorio, camara=camara)
+    registrados = 0
+    frame_num = 0
+
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            if frame_num % cada_n_frames == 0:
+                timestamp = inicio + cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                if detector_yunet is not None:
+                    rostros = detector_yunet.detectar(frame)
+                else:
+                    rostros = DeepFace.extract_faces(img_path=frame, detector_backend=Config.DETECTOR_BACKEND, enforce_detection=False)
+
+                for rostro in rostros:
+                    area = rostro["facial_area"]
+                    if rostro.get("confidence", 0) == 0 or area["w"] == 0 or area["h"] == 0:
+                        continue
+
+                    x, y, w, h = area["x"], area["y"], area["w"], area["h"]
+                    if detector_yunet is not None:
+                        # Recorte alineado por landmarks, sin volver a detectar (como SistemaReconocimiento)
+                        embedding = calcular_embedding(alinear_rostro(frame, rostro), detector_backend="skip")
+                    else:
+                        embedding = calcular_embedding(frame[y: y + h, x: x + w])
+                    if embedding is None:
+                        continue
+
+                    deteccion = {"bbox": {"x": x, "y": y, "w": w, "h": h}, "nombre": "", "embedding": embedding}
+                    registro.registrar(deteccion, timestamp)
+                    registrados += 1
+
+            frame_num += 1
+    finally:
+        cap.release()
+        registro.cerrar()
+
+    logger.info(f"{ruta_video}: {registrados} rostros indexados")
+    return registrados
@@ -0,0 +1,178 @@
+"""
+Detector de rostros nativo de OpenCV (YuNet, cv2.FaceDetectorYN)
+
+Se activa con Config.DETECTOR_BACKEND = "yunet". Devuelve las detecciones con el
+mismo formato que DeepFace.extract_faces y usa los landmarks de los ojos para
+alinear el recorte sin pasar por DeepFace.
+"""
+
+import logging
+import math
+import os
+import sys
+import threading
+
+import cv2
+from config import Config
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+logger = logging.getLogger(__name__)
+
+_detector_compartido = None
+_lock = threading.Lock()
+
+
+class DetectorYuNet:
+    """
+    Detector YuNet con tamano de entrada reutilizado entre frames
+    """
+
+    def __init__(self, ruta_modelo=None, umbral_score=None, umbral_nms=None, top_k=None):
+        """
+        Carga el modelo YuNet
+
+        Args:
+            ruta_modelo (str): Archivo .onnx de YuNet (por defecto Config.YUNET_MODELO)
+            umbral_score (float): Confianza minima de una deteccion
+            umbral_nms (float): Umbral de supresion de no maximos
+            top_k (int): Maximo de candidatos antes de NMS
+        """
+        ruta_modelo = ruta_modelo or Config.YUNET_MODELO
+
+        if not os.path.exists(ruta_modelo):
+            raise FileNotFoundError(f"No existe el modelo YuNet: {ruta_modelo} (descargalo de opencv_zoo)")
+
+        self.umbral_score = umbral_score if umbral_score is not None else Config.YUNET_UMBRAL_SCORE
+        self.tamano_entrada = (320, 320)
+        self.detector = cv2.FaceDetectorYN.create(
+            ruta_modelo,
+            "",
+            self.tamano_entrada,
+            self.umbral_score,
+            umbral_nms if umbral_nms is not None else Config.YUNET_UMBRAL_NMS,
+            top_k or Config.YUNET_TOP_K,
+        )
+
+        logger.info(f"Detector YuNet cargado: {ruta_modelo}")
+
+    def detectar(self, frame):
+        """
+        Detecta rostros en un frame
+
+        Args:
+            frame: Frame BGR de OpenCV
+
+        Returns:
+            list: Detecciones con "facial_area", "confidence" y "landmarks", como DeepFace.extract_faces
+        """
+        alto, ancho = frame.shape[:2]
+
+        # setInputSize reconstruye las anclas: solo se llama cuando cambia la resolucion
+        if (ancho, alto) != self.tamano_entrada:
+            self.tamano_entrada = (ancho, alto)
+            self.detector.setInputSize(self.tamano_entrada)
+
+        _, resultados = self.detector.detect(frame)
+        if resultados is None:
+            return []
+
+        detecciones = []
+        for fila in resultados:
+            x0, y0 = max(0, int(fila[0])), max(0, int(fila[1]))
+            x1, y1 = min(ancho, int(fila[0] + fila[2])), min(alto, int(fila[1] + fila[3]))
+            if x1 <= x0 or y1 <= y0:
+                continue
+
+            # Landmarks: ojo derecho, ojo izquierdo, nariz, comisura derecha, comisura izquierda
+            landmarks = fila[4:14].reshape(5, 2)
+            detecciones.append(
+                {
+                    "facial_area": {
+                        "x": x0,
+                        "y": y0,
+                        "w": x1 - x0,
+                        "h": y1 - y0,
+                        "left_eye": (int(landmarks[1][0]), int(landmarks[1][1])),
+                        "right_eye": (int(landmarks[0][0]), int(landmarks[0][1])),
+                    },
+                    "confidence": float(fila[14]),
+                    "landmarks": landmarks,
+                }
+            )
+
+        return detecciones
+
+    def detectar_cajas(self, frame):
+        """
+        Detecta rostros y devuelve solo las cajas, como CascadeClassifier.detectMultiScale
+
+        Args:
+            frame: Frame BGR de OpenCV
+
+        Returns:
+            list: Tuplas (x, y, w, h)
+        """
+        return [(d["facial_area"]["x"], d["facial_area"]["y"], d["facial_area"]["w"], d["facial_area"]["h"]) for d in self.detectar(frame)]
+
+
+def alinear_rostro(frame, deteccion):
+    """
+    Recorta el rostro rotado para que los ojos queden horizontales
+
+    El giro y el recorte se hacen con un solo warpAffine sobre el frame completo,
+    asi las esquinas rotadas se rellenan con pixeles reales en lugar de negro.
+
+    Args:
+        frame: Frame BGR de OpenCV
+        deteccion (dict): Deteccion de DetectorYuNet.detectar
+
+    Returns:
+        numpy.ndarray: Rostro alineado del tamano de la caja
+    """
+    area = deteccion["facial_area"]
+    x, y, w, h = area["x"], area["y"], area["w"], area["h"]
+    landmarks = deteccion.get("landmarks")
+
+    if landmarks is None:
+        return frame[y: y + h, x: x + w]
+
+    (ojo_x0, ojo_y0), (ojo_x1, ojo_y1) = landmarks[0], landmarks[1]
+    angulo = math.degrees(math.atan2(ojo_y1 - ojo_y0, ojo_x1 - ojo_x0))
+
+    # Giro alrededor del centro de la caja y traslacion al origen del recorte
+    matriz = cv2.getRotationMatrix2D((x + w / 2.0, y + h / 2.0), angulo, 1.0)
+    matriz[0, 2] -= x
+    matriz[1, 2] -= y
+
+    return cv2.warpAffine(frame, matriz, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def recortar_rostro_principal(img):
+    """
+    Detecta y alinea el rostro mas grande de una imagen con el detector compartido
+
+    Args:
+        img: Imagen de OpenCV o ruta al archivo
+
+    Returns:
+        numpy.ndarray: Rostro alineado o None si no hay rostro
+    """
+    if isinstance(img, str):
+        img = cv2.imread(img)
+
+    if img is None or img.size == 0:
+        return None
+
+    global _detector_compartido
+    with _lock:
+        if _detector_compartido is None:
+            _detector_compartido = DetectorYuNet()
+        detecciones = _detector_compartido.detectar(img)
+
+    if not detecciones:
+        return None
+
+    principal = max(detecciones, key=lambda d: d["facial_area"]["w"] * d["facial_area"]["h"])
+    return alinear_rostro(img, principal)
+
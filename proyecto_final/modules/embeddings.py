@@ -0,0 +1,156 @@
+"""
+Calculo de embeddings faciales
+"""
+
+import logging
+import os
+import sys
+
+import cv2
+import numpy as np
+from config import Config
+from modules.detector_yunet import recortar_rostro_principal
+from modules.inferencia_onnx import es_modelo_onnx, obtener_embedder_onnx
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+logger = logging.getLogger(__name__)
+
+
+def normalizar_embedding(embedding):
+    """
+    Normaliza un embedding a norma L2 unitaria
+
+    Args:
+        embedding: Vector o lista de floats
+
+    Returns:
+        numpy.ndarray: Vector float32 normalizado o None si la norma es cero
+    """
+    embedding = np.asarray(embedding, dtype=np.float32)
+    norma = np.linalg.norm(embedding)
+
+    if norma == 0:
+        return None
+
+    return embedding / norma
+
+
+def calcular_embedding(img, model_name=None, detector_backend=None, lanzar_errores=False):
+    """
+    Calcula el embedding normalizado de una imagen de rostro
+
+    Con detector "yunet" el rostro se detecta y alinea con OpenCV antes del modelo.
+    Con un modelo "<modelo>-onnx" la inferencia se hace con ONNX Runtime sobre el
+    rostro detectado y alineado por el mismo detector que usaria DeepFace, asi los
+    embeddings de ambos backends son comparables.
+
+    Args:
+        img: Imagen de OpenCV o ruta al archivo
+        model_name (str): Modelo de DeepFace (por defecto Config.MODELO_FACIAL)
+        detector_backend (str): Detector de DeepFace (por defecto Config.DETECTOR_BACKEND)
+        lanzar_errores (bool): Si True, las excepciones se propagan en lugar de registrarse
+
+    Returns:
+        numpy.ndarray: Embedding normalizado o None si fallo
+    """
+    model_name = model_name or Config.MODELO_FACIAL
+    detector_backend = detector_backend or Config.DETECTOR_BACKEND
+
+    # YuNet se ejecuta aqui mismo: se detecta y alinea, y el modelo recibe el rostro recortado
+    if detector_backend == "yunet":
+        try:
+            img = recortar_rostro_principal(img)
+        except Exception as e:
+            if lanzar_errores:
+                raise
+            logger.error(f"Error detectando rostro con YuNet: {e}")
+            return None
+
+        if img is None:
+            return None
+        detector_backend = "skip"
+
+    if es_modelo_onnx(model_name):
+        if detector_backend != "skip":
+            try:
+                img = _recortar_con_deepface(img, detector_backend)
+            except Exception as e:
+                if lanzar_errores:
+                    raise
+                logger.error(f"Error detectando rostro con {detector_backend}: {e}")
+                return None
+
+            if img is None:
+                return None
+
+        return _calcular_embedding_onnx(img, model_name, lanzar_errores)
+
+    from deepface import DeepFace
+
+    try:
+        representaciones = DeepFace.represent(
+            img_path=img,
+            model_name=model_name,
+            detector_backend=detector_backend,
+            enforce_detection=False,
+        )
+    except Exception as e:
+        if lanzar_errores:
+            raise
+        logger.error(f"Error calculando embedding: {e}")
+        return None
+
+    if not representaciones:
+        return None
+
+    return normalizar_embedding(representaciones[0]["embedding"])
+
+
+def _recortar_con_deepface(img, detector_backend):
+    """
+    Detecta y alinea el rostro con un detector de DeepFace, como lo hace DeepFace.represent
+
+    Args:
+        img: Imagen de OpenCV o ruta al archivo
+        detector_backend (str): Detector de DeepFace
+
+    Returns:
+        numpy.ndarray: Rostro BGR uint8, o None si no hay rostro
+    """
+    from deepface import DeepFace
+
+    rostros = DeepFace.extract_faces(img_path=img, detector_backend=detector_backend, enforce_detection=False, align=True)
+    if not rostros:
+        return None
+
+    # extract_faces devuelve RGB en [0, 1]; el embedder ONNX recibe BGR uint8
+    rostro = np.asarray(rostros[0]["face"], dtype=np.float32)
+    return np.clip(rostro[:, :, ::-1] * 255.0, 0, 255).round().astype(np.uint8)
+
+
+def _calcular_embedding_onnx(img, model_name, lanzar_errores=False):
+    """
+    Calcula el embedding con el backend ONNX Runtime
+
+    Args:
+        img: Imagen de OpenCV o ruta al archivo
+        model_name (str): Modelo con sufijo "-onnx"
+        lanzar_errores (bool): Si True, las excepciones se propagan
+
+    Returns:
+        numpy.ndarray: Embedding normalizado o None si fallo
+    """
+    if isinstance(img, str):
+        img = cv2.imread(img)
+
+    if img is None or img.size == 0:
+        return None
+
+    try:
+        return normalizar_embedding(obtener_embedder_onnx(model_name).representar(img))
+    except Exception as e:
+        if lanzar_errores:
+            raise
+        logger.error(f"Error calculando embedding ONNX: {e}")
+        return None
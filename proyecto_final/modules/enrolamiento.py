@@ -0,0 +1,144 @@
+"""
+Registro instantaneo: las fotos capturadas se embeben y se agregan a la galeria al momento
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+
+from modules.embeddings import calcular_embedding
+from modules.galeria import GaleriaRostros
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+logger = logging.getLogger(__name__)
+
+
+class EnroladorInstantaneo:
+    """
+    Embebe fotos nuevas en un hilo aparte y las agrega a la galeria y a su cache en disco
+
+    Las sesiones de reconocimiento en curso detectan el cambio del cache y recargan
+    la galeria, asi la persona se reconoce sin pasar por "Entrenar modelo". Solo se
+    embeben las fotos encoladas: las que falten en el cache las calcula el entrenamiento.
+    """
+
+    def __init__(self, db_path=None, model_name=None, detector_backend=None):
+        """
+        Inicia el hilo de embeddings, que primero carga la galeria (solo desde el cache)
+
+        Args:
+            db_path (str): Directorio de la base de datos
+            model_name (str): Modelo de embeddings
+            detector_backend (str): Detector usado al calcular embeddings
+        """
+        self.galeria = GaleriaRostros(db_path, model_name, detector_backend)
+        # El cache en disco se escribe en float32
+        self.galeria.precision = "float32"
+        self.cargada = False
+        self.mtime_cache = None
+
+        self.cola = queue.Queue()
+        self.agregadas = 0
+        self.fallidas = 0
+
+        self.hilo = threading.Thread(target=self._procesar, daemon=True)
+        self.hilo.start()
+
+    def encolar(self, ruta):
+        """
+        Agrega una foto recien guardada a la cola de embeddings
+
+        Args:
+            ruta (str): Ruta de la foto dentro de la base de datos
+        """
+        self.cola.put(ruta)
+
+    def _procesar(self):
+        """Hilo: carga la galeria y luego embebe las fotos encoladas, agregandolas por tandas"""
+        try:
+            # Sin calcular embeddings: con una base sin cachear la primera foto esperaria a toda la base
+            self._cargar_cache()
+            self.cargada = True
+        except Exception as e:
+            logger.error(f"Error cargando la galeria, no se registrara al instante: {e}")
+
+        while True:
+            rutas = [self.cola.get()]
+
+            # Lo que ya espera en la cola va en la misma tanda: una sola reconstruccion y escritura del cache
+            while True:
+                try:
+                    rutas.append(self.cola.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._agregar_tanda([r for r in rutas if r is not None])
+            finally:
+                for _ in rutas:
+                    self.cola.task_done()
+
+            if None in rutas:
+                return
+
+    def _cargar_cache(self):
+        """Carga la galeria solo con los embeddings del cache y recuerda su fecha"""
+        self.mtime_cache = self.galeria.mtime_cache()
+        self.galeria.cargar(solo_cache=True)
+
+    def _agregar_tanda(self, rutas):
+        """
+        Embebe una tanda de fotos y las agrega juntas a la galeria
+
+        Args:
+            rutas: Rutas de las fotos
+        """
+        if not rutas:
+            return
+
+        if not self.cargada:
+            self.fallidas += len(rutas)
+            return
+
+        fotos = []
+        for ruta in rutas:
+            try:
+                embedding = calcular_embedding(ruta, self.galeria.model_name, self.galeria.detector_backend)
+            except Exception as e:
+                self.fallidas += 1
+                logger.error(f"Error registrando {ruta}: {e}")
+                continue
+
+            if embedding is None:
+                self.fallidas += 1
+                logger.warning(f"No se pudo calcular el embedding de {ruta}")
+                continue
+
+            fotos.append((ruta, embedding, None))
+
+        try:
+            # Otro proceso (p.ej. un entrenamiento) reescribio el cache: no pisar sus embeddings
+            if self.galeria.mtime_cache() != self.mtime_cache:
+                self._cargar_cache()
+
+            self.galeria.agregar_lote(fotos)
+            self.mtime_cache = self.galeria.mtime_cache()
+        except Exception as e:
+            self.fallidas += len(fotos)
+            logger.error(f"Error agregando {len(fotos)} foto(s) a la galeria: {e}")
+            return
+
+        self.agregadas += len(fotos)
+        for ruta, _, _ in fotos:
+            logger.info(f"Registrada al instante: {os.path.relpath(ruta, self.galeria.db_path)}")
+
+    def cerrar(self):
+        """Espera a que se procesen las fotos pendientes y detiene el hilo"""
+        self.cola.join()
+        self.cola.put(None)
+        self.hilo.join(timeout=5)
+
+        logger.info(f"Registro instantaneo: {self.agregadas} foto(s) agregadas, {self.fallidas} fallida(s)")
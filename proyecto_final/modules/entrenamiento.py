@@ -0,0 +1,238 @@
+"""
+Entrenamiento (calculo de embeddings de la base de datos) en paralelo y reanudable
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+from config import Config
+from modules.embeddings import calcular_embedding
+from modules.galeria import GaleriaRostros, listar_imagenes_database
+from modules.inferencia_onnx import es_modelo_onnx, obtener_embedder_onnx
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+logger = logging.getLogger(__name__)
+
+# Modelo y detector del proceso worker (se fijan una vez en _inicializar_worker)
+_modelo_worker = None
+_detector_worker = None
+
+
+def _inicializar_worker(model_name, detector_backend):
+    """
+    Carga el modelo una sola vez por proceso worker
+
+    Args:
+        model_name (str): Modelo de embeddings
+        detector_backend (str): Detector de rostros
+    """
+    global _modelo_worker, _detector_worker
+    _modelo_worker = model_name
+    _detector_worker = detector_backend
+
+    # Cada worker usa un hilo de inferencia: el paralelismo lo dan los procesos
+    cv2.setNumThreads(1)
+
+    if es_modelo_onnx(model_name):
+        obtener_embedder_onnx(model_name)
+    else:
+        from deepface import DeepFace
+
+        DeepFace.build_model(model_name)
+
+
+def _embeber_imagen(ruta, mtime):
+    """
+    Calcula el embedding de una foto en el worker
+
+    Args:
+        ruta (str): Ruta de la foto
+        mtime (float): Fecha de modificacion listada
+
+    Returns:
+        tuple: (ruta, mtime, embedding o None, causa del error o None)
+    """
+    img = cv2.imread(ruta)
+    if img is None:
+        return ruta, mtime, None, "Imagen ilegible o corrupta"
+
+    try:
+        embedding = calcular_embedding(img, _modelo_worker, _detector_worker, lanzar_errores=True)
+    except Exception as e:
+        mensaje = str(e).splitlines()[0][:80] if str(e) else ""
+        return ruta, mtime, None, f"{type(e).__name__}: {mensaje}"
+
+    if embedding is None:
+        return ruta, mtime, None, "Sin rostro detectado o embedding vacio"
+
+    return ruta, mtime, embedding, None
+
+
+def formatear_duracion(segundos):
+    """
+    Formatea segundos como "1h02m", "3m05s" o "12s"
+
+    Args:
+        segundos (float): Duracion
+
+    Returns:
+        str: Duracion legible
+    """
+    segundos = int(max(segundos, 0))
+    horas, resto = divmod(segundos, 3600)
+    minutos, segundos = divmod(resto, 60)
+
+    if horas:
+        return f"{horas}h{minutos:02d}m"
+    if minutos:
+        return f"{minutos}m{segundos:02d}s"
+    return f"{segundos}s"
+
+
+def embeber_en_paralelo(pendientes, workers=None, model_name=None, detector_backend=None):
+    """
+    Calcula embeddings en un pool de procesos, entregandolos a medida que terminan
+
+    Si el consumidor deja de iterar (o se interrumpe), las tareas pendientes se
+    cancelan sin esperar a los workers.
+
+    Args:
+        pendientes: Lista de (ruta, mtime)
+        workers (int): Procesos worker (por defecto Config.ENTRENAMIENTO_WORKERS)
+        model_name (str): Modelo de embeddings
+        detector_backend (str): Detector de rostros
+
+    Yields:
+        tuple: (ruta, mtime, embedding o None, causa del error o None)
+    """
+    # "spawn": TensorFlow no tolera fork despues de haberse inicializado
+    contexto = multiprocessing.get_context("spawn")
+    executor = ProcessPoolExecutor(
+        max_workers=workers or Config.ENTRENAMIENTO_WORKERS,
+        mp_context=contexto,
+        initializer=_inicializar_worker,
+        initargs=(model_name or Config.MODELO_FACIAL, detector_backend or Config.DETECTOR_BACKEND),
+    )
+    completo = False
+
+    try:
+        futuros = [executor.submit(_embeber_imagen, ruta, mtime) for ruta, mtime in pendientes]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+        completo = True
+
+    finally:
+        executor.shutdown(wait=completo, cancel_futures=not completo)
+
+
+def entrenar_galeria(workers=None, db_path=None, model_name=None, detector_backend=None):
+    """
+    Calcula en paralelo los embeddings que faltan en el cache de la galeria
+
+    Las fotos que ya estan en el cache con el mismo mtime se saltean, y el cache
+    se reescribe periodicamente con lo ya calculado: si el proceso se interrumpe,
+    la siguiente corrida continua desde ahi.
+
+    Args:
+        workers (int): Procesos worker (por defecto Config.ENTRENAMIENTO_WORKERS)
+        db_path (str): Directorio de la base de datos
+        model_name (str): Modelo de embeddings
+        detector_backend (str): Detector de rostros
+
+    Returns:
+        dict: total, desde_cache, procesadas, errores, causas (Counter), ejemplos, duracion, interrumpido
+    """
+    galeria = GaleriaRostros(db_path, model_name, detector_backend)
+    workers = workers or Config.ENTRENAMIENTO_WORKERS
+
+    imagenes = listar_imagenes_database(galeria.db_path)
+    cache = galeria.leer_cache()
+
+    # Entradas validas del cache (mismo mtime) y fotos pendientes
+    completadas = {}
+    pendientes = []
+    for ruta, mtime, _, _ in imagenes:
+        en_cache = cache.get(ruta)
+        if en_cache is not None and en_cache[0] == mtime:
+            completadas[ruta] = en_cache
+        else:
+            pendientes.append((ruta, mtime))
+
+    resumen = {
+        "total": len(imagenes),
+        "desde_cache": len(completadas),
+        "procesadas": 0,
+        "errores": 0,
+        "causas": Counter(),
+        "ejemplos": {},
+        "duracion": 0.0,
+        "interrumpido": False,
+    }
+
+    print(f"Fotos: {len(imagenes)} | En cache: {len(completadas)} | Pendientes: {len(pendientes)} | Workers: {workers}")
+
+    def checkpoint():
+        if completadas:
+            rutas = list(completadas)
+            galeria.escribir_cache(
+                rutas,
+                np.array([completadas[r][0] for r in rutas], dtype=np.float64),
+                np.stack([completadas[r][1] for r in rutas]).astype(np.float32),
+            )
+
+    if not pendientes:
+        if len(completadas) != len(cache):
+            checkpoint()
+        return resumen
+
+    inicio = time.time()
+    ultimo_checkpoint = inicio
+    hechas = 0
+
+    resultados = embeber_en_paralelo(pendientes, workers, galeria.model_name, galeria.detector_backend)
+
+    try:
+        for ruta, mtime, embedding, causa in resultados:
+            hechas += 1
+
+            if embedding is not None:
+                completadas[ruta] = (mtime, embedding)
+                resumen["procesadas"] += 1
+            else:
+                resumen["errores"] += 1
+                resumen["causas"][causa] += 1
+                resumen["ejemplos"].setdefault(causa, ruta)
+
+            ahora = time.time()
+            velocidad = hechas / max(ahora - inicio, 1e-9)
+            eta = (len(pendientes) - hechas) / velocidad
+            print(
+                f"\r  {hechas}/{len(pendientes)} ({hechas * 100 // len(pendientes)}%) - {velocidad:.1f} img/s - ETA {formatear_duracion(eta)} - errores: {resumen['errores']}   ",
+                end="",
+                flush=True,
+            )
+
+            if ahora - ultimo_checkpoint >= Config.ENTRENAMIENTO_CHECKPOINT_SEGUNDOS:
+                checkpoint()
+                ultimo_checkpoint = ahora
+
+        print()
+
+    except KeyboardInterrupt:
+        resumen["interrumpido"] = True
+        print("\n\nInterrumpido: se guarda lo calculado y la proxima corrida continua desde aqui")
+
+    finally:
+        resultados.close()
+        checkpoint()
+        resumen["duracion"] = time.time() - inicio
+
+    return resumen
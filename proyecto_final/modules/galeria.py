@@ -0,0 +1,559 @@
+"""
+Galeria en memoria de embeddings de la base de datos de rostros
+"""
+
+import logging
+import os
+import sys
+import uuid
+
+import numpy as np
+from config import Config
+from modules.embeddings import calcular_embedding
+from utils.helpers import extraer_nombre_archivo
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONES_IMAGEN = (".jpg", ".jpeg", ".png")
+
+# Filas convertidas a float32 por bloque al buscar en una galeria cuantizada
+FILAS_POR_BLOQUE = 8192
+
+
+def listar_imagenes_database(db_path=None):
+    """
+    Lista las imagenes de la base de datos con su fecha de modificacion
+    Estructura esperada: database/categoria/persona/foto.jpg
+
+    Args:
+        db_path (str): Directorio de la base de datos
+
+    Returns:
+        list: Tuplas (ruta, mtime, categoria, carpeta_persona) ordenadas por ruta
+    """
+    db_path = db_path or Config.DATABASE_DIR
+    imagenes = []
+
+    for categoria in Config.ROLES.keys():
+        carpeta_categoria = os.path.join(db_path, categoria)
+        if not os.path.isdir(carpeta_categoria):
+            continue
+
+        with os.scandir(carpeta_categoria) as personas:
+            for persona in personas:
+                if not persona.is_dir():
+                    continue
+
+                with os.scandir(persona.path) as fotos:
+                    for foto in fotos:
+                        if foto.is_file() and foto.name.lower().endswith(EXTENSIONES_IMAGEN):
+                            imagenes.append((foto.path, foto.stat().st_mtime, categoria, persona.name))
+
+    imagenes.sort()
+    return imagenes
+
+
+def cuantizar_embeddings(matriz, precision):
+    """
+    Convierte embeddings float32 a la precision de almacenamiento
+
+    Args:
+        matriz: Matriz (n, d) float32 de embeddings normalizados
+        precision (str): "float32", "float16" o "int8" (escala por vector)
+
+    Returns:
+        tuple: (datos, escalas) donde escalas es None salvo para int8
+    """
+    if precision == "float16":
+        return matriz.astype(np.float16), None
+
+    if precision == "int8":
+        escalas = np.abs(matriz).max(axis=1) / 127.0
+        escalas[escalas == 0] = 1.0
+        datos = np.round(matriz / escalas[:, np.newaxis]).astype(np.int8)
+        return datos, escalas.astype(np.float32)
+
+    return np.ascontiguousarray(matriz, dtype=np.float32), None
+
+
+def calcular_similitudes(datos, escalas, consulta):
+    """
+    Similitud coseno entre una galeria (posiblemente cuantizada) y una o varias consultas
+
+    En int8 la consulta tambien se cuantiza y el producto se hace entre enteros
+    (exacto en float32); las escalas se aplican al final. Los datos cuantizados
+    se convierten por bloques para no duplicar la galeria en memoria.
+
+    Args:
+        datos: Matriz (n, d) float32, float16 o int8
+        escalas: Escalas por fila (solo int8)
+        consulta: Vector (d,) o matriz (d, m) float32 normalizados
+
+    Returns:
+        numpy.ndarray: Similitudes (n,) o (n, m)
+    """
+    if datos.dtype == np.float32:
+        return datos @ consulta
+
+    consulta = np.asarray(consulta, dtype=np.float32)
+    escala_consulta = None
+
+    if datos.dtype == np.int8:
+        escala_consulta = np.abs(consulta).max(axis=0) / 127.0
+        escala_consulta = np.where(escala_consulta == 0, 1.0, escala_consulta).astype(np.float32)
+        consulta = np.round(consulta / escala_consulta)
+
+    salida = np.empty((len(datos),) + consulta.shape[1:], dtype=np.float32)
+    for inicio in range(0, len(datos), FILAS_POR_BLOQUE):
+        fin = inicio + FILAS_POR_BLOQUE
+        salida[inicio:fin] = datos[inicio:fin].astype(np.float32) @ consulta
+
+    if escala_consulta is not None:
+        salida *= escalas.reshape((-1,) + (1,) * (consulta.ndim - 1))
+        salida *= escala_consulta
+
+    return salida
+
+
+def _kmeans_esferico(vectores, k, iteraciones=10):
+    """
+    Centros de un k-means sobre la esfera unitaria (similitud coseno)
+
+    Args:
+        vectores: Matriz (n, d) de embeddings normalizados
+        k (int): Cantidad de centros
+        iteraciones (int): Iteraciones maximas
+
+    Returns:
+        numpy.ndarray: Matriz (min(k, n), d) de centros normalizados
+    """
+    if k <= 1 or len(vectores) <= k:
+        if k <= 1:
+            vectores = vectores.mean(axis=0, keepdims=True)
+        return vectores / np.linalg.norm(vectores, axis=1, keepdims=True)
+
+    # Inicializacion determinista: fotos equiespaciadas
+    centros = vectores[np.linspace(0, len(vectores) - 1, k).astype(int)].copy()
+
+    for _ in range(iteraciones):
+        asignacion = np.argmax(vectores @ centros.T, axis=1)
+        nuevos = np.stack([vectores[asignacion == c].sum(axis=0) if np.any(asignacion == c) else centros[c] for c in range(k)])
+        nuevos /= np.linalg.norm(nuevos, axis=1, keepdims=True)
+
+        if np.allclose(nuevos, centros):
+            break
+        centros = nuevos
+
+    return centros
+
+
+class GaleriaRostros:
+    """
+    Embeddings L2-normalizados de todas las fotos de la base de datos
+
+    Reemplaza a DeepFace.find: los embeddings se calculan una sola vez, se
+    cachean en disco junto a la base de datos y la busqueda es un producto
+    matricial contra el embedding de la consulta.
+    """
+
+    def __init__(self, db_path=None, model_name=None, detector_backend=None):
+        """
+        Inicializa la galeria (vacia hasta llamar a cargar)
+
+        Args:
+            db_path (str): Directorio de la base de datos
+            model_name (str): Modelo de embeddings
+            detector_backend (str): Detector usado al calcular embeddings
+        """
+        self.db_path = db_path or Config.DATABASE_DIR
+        self.model_name = model_name or Config.MODELO_FACIAL
+        self.detector_backend = detector_backend or Config.DETECTOR_BACKEND
+        self.archivo_cache = os.path.join(self.db_path, f"representaciones_{self.model_name.lower()}.npz")
+
+        self.rutas = []
+        self.fila_por_ruta = {}
+        self.claves_persona = []
+        self.mtimes = np.empty(0, dtype=np.float64)
+        self.embeddings = None
+
+        # Precision de almacenamiento en memoria (el cache en disco es siempre float32)
+        self.precision = Config.GALERIA_PRECISION
+        self.escalas = None
+
+        # Tabla de identidades: fila de embedding -> indice de persona -> metadatos
+        self.personas = []
+        self.persona_por_fila = np.empty(0, dtype=np.int32)
+
+        # Prototipos por persona para la busqueda en dos etapas
+        self.modo = Config.GALERIA_MODO
+        self.prototipos_por_persona = Config.GALERIA_PROTOTIPOS_POR_PERSONA
+        self.candidatos = Config.GALERIA_CANDIDATOS
+        self.prototipos = None
+        self.persona_por_prototipo = np.empty(0, dtype=np.int32)
+        self.filas_por_persona = []
+
+    def __len__(self):
+        return len(self.rutas)
+
+    def leer_cache(self):
+        """
+        Lee el cache de embeddings desde disco
+
+        Returns:
+            dict: ruta -> (mtime, embedding)
+        """
+        if not os.path.exists(self.archivo_cache):
+            return {}
+
+        try:
+            with np.load(self.archivo_cache, allow_pickle=False) as datos:
+                # Los embeddings dependen del detector (recorte y alineacion)
+                if "detector" in datos.files and str(datos["detector"]) != self.detector_backend:
+                    logger.info(f"Cache calculado con detector {datos['detector']}, se recalcula con {self.detector_backend}")
+                    return {}
+
+                rutas = [os.path.join(self.db_path, r) for r in datos["rutas"]]
+                return {r: (m, e) for r, m, e in zip(rutas, datos["mtimes"], datos["embeddings"])}
+        except Exception as e:
+            logger.warning(f"Cache de embeddings invalido, se recalcula: {e}")
+            return {}
+
+    def guardar(self):
+        """Escribe el cache de embeddings a disco de forma atomica (requiere la galeria en float32)"""
+        if self.embeddings is None:
+            return
+
+        if self.embeddings.dtype != np.float32:
+            logger.warning("La galeria ya esta cuantizada: no se sobrescribe el cache float32")
+            return
+
+        self.escribir_cache(self.rutas, self.mtimes, self.embeddings)
+
+    def escribir_cache(self, rutas, mtimes, embeddings):
+        """
+        Escribe un cache de embeddings de forma atomica (tambien usado como checkpoint)
+
+        Args:
+            rutas: Rutas absolutas de las fotos
+            mtimes: Fecha de modificacion de cada foto
+            embeddings: Matriz (n, d) float32
+        """
+        rutas_relativas = np.array([os.path.relpath(r, self.db_path) for r in rutas])
+        # Nombre temporal unico: varios procesos o hilos pueden escribir el mismo cache a la vez
+        temporal = f"{self.archivo_cache}.{os.getpid()}.{uuid.uuid4().hex}.tmp.npz"
+        np.savez(temporal, rutas=rutas_relativas, mtimes=mtimes, embeddings=embeddings, detector=np.array(self.detector_backend))
+        os.replace(temporal, self.archivo_cache)
+
+    def cargar(self, solo_cache=False):
+        """
+        Carga la galeria reutilizando el cache y calculando solo las fotos nuevas o modificadas
+
+        Con solo_cache=True la carga es de solo lectura: las fotos sin embedding en
+        el cache se omiten (las calcula quien escribe el cache) y el cache no se
+        reescribe. Es la recarga que usan las sesiones de reconocimiento en curso.
+
+        Args:
+            solo_cache (bool): Si True, no se calcula ningun embedding ni se escribe el cache
+
+        Returns:
+            int: Cantidad de embeddings en la galeria
+        """
+        cache = self.leer_cache()
+        imagenes = listar_imagenes_database(self.db_path)
+
+        rutas = []
+        mtimes = []
+        embeddings = []
+        claves_persona = []
+        calculados = 0
+        omitidos = 0
+
+        for ruta, mtime, categoria, carpeta_persona in imagenes:
+            en_cache = cache.get(ruta)
+
+            if en_cache is not None and en_cache[0] == mtime:
+                embedding = en_cache[1]
+            elif solo_cache:
+                omitidos += 1
+                continue
+            else:
+                embedding = calcular_embedding(ruta, self.model_name, self.detector_backend)
+                calculados += 1
+
+                if embedding is None:
+                    logger.warning(f"No se pudo calcular el embedding de {ruta}")
+                    continue
+
+            rutas.append(ruta)
+            mtimes.append(mtime)
+            embeddings.append(embedding)
+            claves_persona.append((categoria, carpeta_persona))
+
+        self._construir_tabla(claves_persona)
+        self.rutas = rutas
+        self.fila_por_ruta = {r: fila for fila, r in enumerate(rutas)}
+        self.mtimes = np.asarray(mtimes, dtype=np.float64)
+        self.embeddings = np.stack(embeddings).astype(np.float32) if embeddings else None
+        self.escalas = None
+        self._construir_prototipos()
+
+        if not solo_cache and (calculados > 0 or len(cache) != len(rutas)):
+            self.guardar()
+
+        if self.embeddings is not None and self.precision != "float32":
+            self.embeddings, self.escalas = cuantizar_embeddings(self.embeddings, self.precision)
+
+        logger.info(
+            f"Galeria cargada: {len(self.personas)} personas, {len(rutas)} embeddings en {self.precision} "
+            f"({calculados} calculados, {len(rutas) - calculados} desde cache, {omitidos} sin embedding en cache, {self.bytes_en_memoria() / 1024:.0f} KB)"
+        )
+        return len(rutas)
+
+    def mtime_cache(self):
+        """
+        Fecha de modificacion del cache en disco
+
+        Returns:
+            float: mtime del archivo, o None si no existe
+        """
+        try:
+            return os.stat(self.archivo_cache).st_mtime
+        except OSError:
+            return None
+
+    def agregar(self, ruta, embedding, mtime=None):
+        """
+        Agrega (o reemplaza) una foto ya embebida y actualiza el cache en disco
+
+        Args:
+            ruta (str): Ruta de la foto dentro de db_path/<categoria>/<persona>/
+            embedding: Embedding normalizado de la foto
+            mtime (float): Fecha de modificacion (por defecto la del archivo)
+
+        Returns:
+            int: Fila de la foto en la galeria
+        """
+        return self.agregar_lote([(ruta, embedding, mtime)])[0]
+
+    def agregar_lote(self, fotos):
+        """
+        Agrega (o reemplaza) varias fotos ya embebidas y actualiza el cache en disco
+
+        Permite registrar personas al instante, sin recalcular la base completa.
+        La tabla de identidades, los prototipos y el cache se rehacen una sola vez
+        por lote, no por foto.
+
+        Args:
+            fotos: Lista de tuplas (ruta, embedding, mtime); mtime None usa la del archivo
+
+        Returns:
+            list: Fila de cada foto en la galeria
+        """
+        if self.embeddings is not None and self.embeddings.dtype != np.float32:
+            raise ValueError("Solo se puede agregar a una galeria float32")
+
+        filas = []
+        primera_nueva = len(self.rutas)
+        nuevas_rutas = []
+        nuevos_mtimes = []
+        nuevos_embeddings = []
+
+        for ruta, embedding, mtime in fotos:
+            mtime = mtime if mtime is not None else os.stat(ruta).st_mtime
+            embedding = np.asarray(embedding, dtype=np.float32)
+            fila = self.fila_por_ruta.get(ruta)
+
+            if fila is not None and fila >= primera_nueva:
+                # Repetida dentro del mismo lote
+                nuevos_mtimes[fila - primera_nueva] = mtime
+                nuevos_embeddings[fila - primera_nueva] = embedding
+            elif fila is not None:
+                self.embeddings[fila] = embedding
+                self.mtimes[fila] = mtime
+            else:
+                fila = len(self.rutas)
+                self.rutas.append(ruta)
+                self.fila_por_ruta[ruta] = fila
+                self.claves_persona.append(tuple(os.path.relpath(ruta, self.db_path).split(os.sep)[:2]))
+                nuevas_rutas.append(ruta)
+                nuevos_mtimes.append(mtime)
+                nuevos_embeddings.append(embedding)
+
+            filas.append(fila)
+
+        if nuevas_rutas:
+            self.mtimes = np.concatenate([self.mtimes, nuevos_mtimes])
+            nuevos = np.stack(nuevos_embeddings)
+            self.embeddings = nuevos if self.embeddings is None else np.vstack([self.embeddings, nuevos])
+            self._construir_tabla(self.claves_persona)
+
+        if filas:
+            self._construir_prototipos()
+            self.guardar()
+
+        return filas
+
+    def _construir_tabla(self, claves_persona):
+        """
+        Construye la tabla de identidades a partir de (categoria, carpeta) de cada fila
+
+        Args:
+            claves_persona: Lista de tuplas (categoria, carpeta_persona), una por fila
+        """
+        indices = {}
+        personas = []
+        persona_por_fila = np.empty(len(claves_persona), dtype=np.int32)
+
+        for fila, (categoria, carpeta_persona) in enumerate(claves_persona):
+            idx = indices.get((categoria, carpeta_persona))
+
+            if idx is None:
+                info_rol = Config.ROLES[categoria]
+                idx = len(personas)
+                indices[(categoria, carpeta_persona)] = idx
+                personas.append(
+                    {
+                        "nombre": extraer_nombre_archivo(carpeta_persona),
+                        "categoria": categoria,
+                        "rol": info_rol["nombre"],
+                        "nivel_acceso": info_rol["nivel_acceso"],
+                        "genera_alerta": info_rol.get("genera_alerta", False),
+                        "tipo_alerta": info_rol.get("tipo_alerta", "bajo"),
+                        "num_fotos": 0,
+                    }
+                )
+
+            personas[idx]["num_fotos"] += 1
+            persona_por_fila[fila] = idx
+
+        self.claves_persona = list(claves_persona)
+        self.personas = personas
+        self.persona_por_fila = persona_por_fila
+
+    def _construir_prototipos(self):
+        """
+        Condensa las fotos de cada persona en uno o pocos embeddings prototipo
+
+        Con un prototipo por persona se usa la media normalizada; con mas, los
+        centros de un k-means esferico (util cuando hay poses variadas).
+        """
+        if self.embeddings is None:
+            self.prototipos = None
+            self.persona_por_prototipo = np.empty(0, dtype=np.int32)
+            self.filas_por_persona = []
+            return
+
+        orden = np.argsort(self.persona_por_fila, kind="stable")
+        cortes = np.flatnonzero(np.diff(self.persona_por_fila[orden])) + 1
+        self.filas_por_persona = np.split(orden, cortes)
+
+        prototipos = []
+        persona_por_prototipo = []
+
+        for idx_persona, filas in enumerate(self.filas_por_persona):
+            for centro in _kmeans_esferico(self.embeddings[filas], self.prototipos_por_persona):
+                prototipos.append(centro)
+                persona_por_prototipo.append(idx_persona)
+
+        self.prototipos = np.stack(prototipos).astype(np.float32)
+        self.persona_por_prototipo = np.asarray(persona_por_prototipo, dtype=np.int32)
+
+    def bytes_en_memoria(self):
+        """Memoria ocupada por los embeddings (y escalas) de la galeria"""
+        if self.embeddings is None:
+            return 0
+        return self.embeddings.nbytes + (self.escalas.nbytes if self.escalas is not None else 0)
+
+    def persona(self, fila):
+        """
+        Metadatos de la persona a la que pertenece una fila de la galeria
+
+        Args:
+            fila (int): Indice de fila devuelto por buscar
+
+        Returns:
+            dict: nombre, categoria, rol, nivel_acceso, genera_alerta, tipo_alerta, num_fotos
+        """
+        return self.personas[self.persona_por_fila[fila]]
+
+    def roles_cache(self):
+        """
+        Vista nombre -> informacion de rol derivada de la tabla de identidades
+
+        Returns:
+            dict: Diccionario con informacion de cada persona (nombre -> info)
+        """
+        return {
+            p["nombre"]: {"rol": p["rol"], "nivel_acceso": p["nivel_acceso"], "categoria": p["categoria"], "num_fotos": p["num_fotos"]}
+            for p in self.personas
+        }
+
+    def buscar(self, embedding):
+        """
+        Busca la foto mas parecida a un embedding
+
+        En modo "prototipos" primero compara contra los prototipos y luego
+        re-rankea solo las fotos individuales de las personas candidatas.
+
+        Args:
+            embedding: Embedding L2-normalizado de la consulta
+
+        Returns:
+            tuple: (indice, distancia coseno) o (None, None) si la galeria esta vacia
+        """
+        if self.embeddings is None:
+            return None, None
+
+        if self.modo == "prototipos" and self.prototipos is not None and len(self.personas) > self.candidatos:
+            return self._buscar_dos_etapas(embedding)
+
+        similitudes = calcular_similitudes(self.embeddings, self.escalas, embedding)
+        idx = int(np.argmax(similitudes))
+
+        return idx, float(1.0 - similitudes[idx])
+
+    def personas_candidatas(self, similitudes):
+        """
+        Las personas distintas con los prototipos mas parecidos a la consulta
+
+        Recorre los prototipos de mayor a menor similitud hasta reunir
+        self.candidatos personas (varios prototipos pueden ser de la misma).
+
+        Args:
+            similitudes: Similitud de la consulta con cada prototipo
+
+        Returns:
+            list: Indices de persona, de la mas a la menos parecida
+        """
+        k = min(len(similitudes), self.candidatos * self.prototipos_por_persona)
+
+        while True:
+            mejores = np.argpartition(-similitudes, k - 1)[:k]
+            mejores = mejores[np.argsort(-similitudes[mejores])]
+            candidatas = list(dict.fromkeys(self.persona_por_prototipo[mejores].tolist()))
+
+            if len(candidatas) >= self.candidatos or k == len(similitudes):
+                return candidatas[: self.candidatos]
+            k = min(len(similitudes), 2 * k)
+
+    def _buscar_dos_etapas(self, embedding):
+        """
+        Etapa 1: prototipos -> personas candidatas. Etapa 2: fotos de esas personas.
+
+        Args:
+            embedding: Embedding L2-normalizado de la consulta
+
+        Returns:
+            tuple: (indice, distancia coseno)
+        """
+        candidatas = self.personas_candidatas(self.prototipos @ embedding)
+
+        filas = np.concatenate([self.filas_por_persona[p] for p in candidatas])
+        escalas = self.escalas[filas] if self.escalas is not None else None
+        similitudes_filas = calcular_similitudes(self.embeddings[filas], escalas, embedding)
+        mejor = int(np.argmax(similitudes_filas))
+
+        return int(filas[mejor]), float(1.0 - similitudes_filas[mejor])
+
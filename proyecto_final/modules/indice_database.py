@@ -0,0 +1,283 @@
+"""
+Indice de integridad de la base de datos: hash de contenido y hash perceptual de cada foto
+
+El indice se guarda junto a la base de datos y se actualiza de forma incremental:
+solo se vuelven a leer las fotos cuyo tamano o fecha de modificacion cambio.
+Con el se detectan duplicados exactos (mismo SHA-256), casi duplicados de una
+misma persona (dHash a poca distancia de Hamming) y archivos ilegibles.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from config import Config
+from modules.galeria import listar_imagenes_database
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+logger = logging.getLogger(__name__)
+
+ARCHIVO_INDICE = "indice_imagenes.npz"
+
+# Bits en 1 de cada byte, para contar bits de los XOR de dHash sin np.bitwise_count (numpy >= 2)
+_BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def calcular_dhash(gray):
+    """
+    Hash perceptual por diferencias (dHash) de 64 bits
+
+    Args:
+        gray: Imagen en escala de grises
+
+    Returns:
+        int: Hash de 64 bits
+    """
+    miniatura = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (miniatura[:, 1:] > miniatura[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def distancias_hamming(hashes):
+    """
+    Distancias de Hamming entre todos los pares de un conjunto de dHash
+
+    Args:
+        hashes: Array uint64 de largo n
+
+    Returns:
+        numpy.ndarray: Matriz (n, n) de distancias (0-64)
+    """
+    xor = np.bitwise_xor(hashes[:, None], hashes[None, :])
+    return _BITS_POR_BYTE[xor.view(np.uint8)].reshape(len(hashes), len(hashes), 8).sum(axis=2)
+
+
+def analizar_imagen(ruta):
+    """
+    Lee una foto una sola vez y calcula su SHA-256, dHash y nitidez
+
+    Args:
+        ruta (str): Ruta de la foto
+
+    Returns:
+        dict: tamano, sha256, dhash, nitidez, legible
+    """
+    with open(ruta, "rb") as f:
+        datos = f.read()
+
+    gray = cv2.imdecode(np.frombuffer(datos, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    entrada = {"tamano": len(datos), "sha256": hashlib.sha256(datos).hexdigest(), "dhash": 0, "nitidez": 0.0, "legible": gray is not None and gray.size > 0}
+
+    if entrada["legible"]:
+        entrada["dhash"] = calcular_dhash(gray)
+        _, desvio = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_32F))
+        entrada["nitidez"] = float(desvio[0, 0] ** 2)
+
+    return entrada
+
+
+class IndiceDatabase:
+    """
+    Indice incremental de las fotos de la base de datos (ruta -> tamano, mtime, hashes)
+    """
+
+    def __init__(self, db_path=None):
+        """
+        Inicializa el indice (vacio hasta llamar a actualizar)
+
+        Args:
+            db_path (str): Directorio de la base de datos
+        """
+        self.db_path = db_path or Config.DATABASE_DIR
+        self.archivo = os.path.join(self.db_path, ARCHIVO_INDICE)
+        self.entradas = {}
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def leer(self):
+        """
+        Lee el indice desde disco
+
+        Returns:
+            dict: ruta -> entrada (vacio si no existe o esta danado)
+        """
+        if not os.path.exists(self.archivo):
+            return {}
+
+        try:
+            with np.load(self.archivo, allow_pickle=False) as datos:
+                return {
+                    os.path.join(self.db_path, r): {
+                        "tamano": int(t),
+                        "mtime": float(m),
+                        "sha256": str(s),
+                        "dhash": int(d),
+                        "nitidez": float(n),
+                        "legible": bool(leg),
+                    }
+                    for r, t, m, s, d, n, leg in zip(
+                        datos["rutas"], datos["tamanos"], datos["mtimes"], datos["sha256"], datos["dhash"], datos["nitidez"], datos["legible"]
+                    )
+                }
+        except Exception as e:
+            logger.warning(f"Indice de imagenes invalido, se reconstruye: {e}")
+            return {}
+
+    def escribir(self):
+        """Escribe el indice a disco de forma atomica"""
+        rutas = sorted(self.entradas)
+        entradas = [self.entradas[r] for r in rutas]
+
+        temporal = self.archivo + ".tmp.npz"
+        np.savez(
+            temporal,
+            rutas=np.array([os.path.relpath(r, self.db_path) for r in rutas], dtype=str),
+            tamanos=np.array([e["tamano"] for e in entradas], dtype=np.int64),
+            mtimes=np.array([e["mtime"] for e in entradas], dtype=np.float64),
+            sha256=np.array([e["sha256"] for e in entradas], dtype="U64"),
+            dhash=np.array([e["dhash"] for e in entradas], dtype=np.uint64),
+            nitidez=np.array([e["nitidez"] for e in entradas], dtype=np.float32),
+            legible=np.array([e["legible"] for e in entradas], dtype=bool),
+        )
+        os.replace(temporal, self.archivo)
+
+    def actualizar(self, workers=None):
+        """
+        Sincroniza el indice con la base de datos, leyendo solo las fotos nuevas o modificadas
+
+        Args:
+            workers (int): Hilos de lectura (la lectura y el decodificado liberan el GIL)
+
+        Returns:
+            dict: total, reutilizadas, analizadas, eliminadas
+        """
+        anteriores = self.leer()
+        self.entradas = {}
+        pendientes = []
+
+        for ruta, mtime, _, _ in listar_imagenes_database(self.db_path):
+            anterior = anteriores.get(ruta)
+            tamano = os.path.getsize(ruta)
+
+            if anterior is not None and anterior["mtime"] == mtime and anterior["tamano"] == tamano:
+                self.entradas[ruta] = anterior
+            else:
+                pendientes.append((ruta, mtime))
+
+        resumen = {
+            "total": len(self.entradas) + len(pendientes),
+            "reutilizadas": len(self.entradas),
+            "analizadas": len(pendientes),
+            "eliminadas": len(set(anteriores) - set(self.entradas) - {r for r, _ in pendientes}),
+        }
+
+        if pendientes:
+            with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+                for (ruta, mtime), entrada in zip(pendientes, executor.map(analizar_imagen, [r for r, _ in pendientes])):
+                    entrada["mtime"] = mtime
+                    self.entradas[ruta] = entrada
+
+        if pendientes or resumen["eliminadas"] or not os.path.exists(self.archivo):
+            self.escribir()
+
+        return resumen
+
+    def ilegibles(self):
+        """
+        Fotos que no se pueden decodificar
+
+        Returns:
+            list: Rutas
+        """
+        return sorted(r for r, e in self.entradas.items() if not e["legible"])
+
+    def duplicados_exactos(self):
+        """
+        Grupos de fotos con el mismo contenido (SHA-256)
+
+        Returns:
+            list: Listas de rutas ordenadas; la primera es la que se conserva
+        """
+        por_hash = defaultdict(list)
+        for ruta, entrada in self.entradas.items():
+            por_hash[entrada["sha256"]].append(ruta)
+
+        return sorted(sorted(rutas) for rutas in por_hash.values() if len(rutas) > 1)
+
+    def casi_duplicados(self, distancia_max=None):
+        """
+        Fotos casi iguales a otra de la misma persona (dHash a distancia <= distancia_max)
+
+        Dentro de cada carpeta de persona se recorren las fotos de mayor a menor
+        nitidez: cada foto se conserva salvo que se parezca a una ya conservada.
+        Los duplicados exactos de la misma carpeta tambien aparecen aqui.
+
+        Args:
+            distancia_max (int): Distancia de Hamming maxima (por defecto Config.INDICE_DISTANCIA_HAMMING)
+
+        Returns:
+            list: Tuplas (ruta_duplicada, ruta_conservada, distancia)
+        """
+        distancia_max = distancia_max if distancia_max is not None else Config.INDICE_DISTANCIA_HAMMING
+
+        por_persona = defaultdict(list)
+        for ruta, entrada in self.entradas.items():
+            if entrada["legible"]:
+                por_persona[os.path.dirname(ruta)].append(ruta)
+
+        resultado = []
+        for rutas in por_persona.values():
+            if len(rutas) < 2:
+                continue
+
+            rutas.sort(key=lambda r: (-self.entradas[r]["nitidez"], r))
+            distancias = distancias_hamming(np.array([self.entradas[r]["dhash"] for r in rutas], dtype=np.uint64))
+
+            conservadas = []
+            for i, ruta in enumerate(rutas):
+                if conservadas:
+                    cercanas = distancias[i, conservadas]
+                    j = int(np.argmin(cercanas))
+                    if cercanas[j] <= distancia_max:
+                        resultado.append((ruta, rutas[conservadas[j]], int(cercanas[j])))
+                        continue
+                conservadas.append(i)
+
+        return sorted(resultado)
+
+    def podar(self, rutas, destino=None):
+        """
+        Mueve fotos fuera de la base de datos (conservando categoria/persona) y las quita del indice
+
+        Args:
+            rutas: Rutas a podar
+            destino (str): Carpeta de podadas (por defecto Config.INDICE_PODADAS_DIR)
+
+        Returns:
+            int: Fotos movidas
+        """
+        destino = destino or Config.INDICE_PODADAS_DIR
+        movidas = 0
+
+        for ruta in rutas:
+            if not os.path.exists(ruta):
+                continue
+
+            nueva_ruta = os.path.join(destino, os.path.relpath(ruta, self.db_path))
+            os.makedirs(os.path.dirname(nueva_ruta), exist_ok=True)
+            shutil.move(ruta, nueva_ruta)
+            self.entradas.pop(ruta, None)
+            movidas += 1
+
+        if movidas:
+            self.escribir()
+
+        return movidas
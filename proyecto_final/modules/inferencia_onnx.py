@@ -0,0 +1,168 @@
+"""
+Backend de inferencia con ONNX Runtime (CPU) para el modelo de embeddings
+
+Se selecciona con Config.MODELO_FACIAL = "<modelo>-onnx" (p.ej. "Facenet-onnx").
+El modelo se exporta una vez con scripts/exportar_onnx.py.
+"""
+
+import logging
+import os
+import sys
+import threading
+
+import cv2
+import numpy as np
+from config import Config
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+logger = logging.getLogger(__name__)
+
+SUFIJO_ONNX = "-onnx"
+
+_embedders = {}
+_lock = threading.Lock()
+
+
+def es_modelo_onnx(model_name):
+    """
+    Indica si un nombre de modelo selecciona el backend ONNX
+
+    Args:
+        model_name (str): Nombre del modelo (p.ej. "Facenet" o "Facenet-onnx")
+
+    Returns:
+        bool: True si termina en "-onnx"
+    """
+    return model_name.lower().endswith(SUFIJO_ONNX)
+
+
+def ruta_modelo_onnx(model_name):
+    """
+    Ruta del archivo .onnx para un modelo
+
+    Args:
+        model_name (str): Nombre del modelo, con o sin sufijo "-onnx"
+
+    Returns:
+        str: Ruta dentro de Config.ONNX_MODELOS_DIR
+    """
+    base = model_name[: -len(SUFIJO_ONNX)] if es_modelo_onnx(model_name) else model_name
+    return os.path.join(Config.ONNX_MODELOS_DIR, f"{base.lower()}.onnx")
+
+
+def redimensionar_con_relleno(img, alto, ancho):
+    """
+    Redimensiona manteniendo la relacion de aspecto y rellena con negro (como DeepFace)
+
+    Args:
+        img: Imagen BGR
+        alto (int): Alto destino
+        ancho (int): Ancho destino
+
+    Returns:
+        numpy.ndarray: Imagen (alto, ancho, 3)
+    """
+    h, w = img.shape[:2]
+    factor = min(alto / h, ancho / w)
+    nuevo_w, nuevo_h = max(1, int(w * factor)), max(1, int(h * factor))
+    img = cv2.resize(img, (nuevo_w, nuevo_h))
+
+    diff_h, diff_w = alto - nuevo_h, ancho - nuevo_w
+    return cv2.copyMakeBorder(
+        img, diff_h // 2, diff_h - diff_h // 2, diff_w // 2, diff_w - diff_w // 2, cv2.BORDER_CONSTANT, value=(0, 0, 0)
+    )
+
+
+class EmbedderONNX:
+    """
+    Modelo de embeddings ejecutado con ONNX Runtime en CPU
+    """
+
+    def __init__(self, ruta_modelo, hilos_intra=None, hilos_inter=None):
+        """
+        Carga la sesion de inferencia
+
+        Args:
+            ruta_modelo (str): Archivo .onnx exportado
+            hilos_intra (int): Hilos dentro de cada operador
+            hilos_inter (int): Hilos entre operadores
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("El backend ONNX requiere onnxruntime (pip install onnxruntime)") from e
+
+        if not os.path.exists(ruta_modelo):
+            raise FileNotFoundError(f"No existe {ruta_modelo}; exportalo con scripts/exportar_onnx.py")
+
+        opciones = ort.SessionOptions()
+        opciones.intra_op_num_threads = hilos_intra or Config.ONNX_HILOS_INTRA
+        opciones.inter_op_num_threads = hilos_inter or Config.ONNX_HILOS_INTER
+        opciones.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opciones.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.sesion = ort.InferenceSession(ruta_modelo, sess_options=opciones, providers=["CPUExecutionProvider"])
+
+        entrada = self.sesion.get_inputs()[0]
+        self.nombre_entrada = entrada.name
+        # Modelos exportados desde Keras: NHWC (lote, alto, ancho, canales)
+        self.alto, self.ancho = int(entrada.shape[1]), int(entrada.shape[2])
+
+        logger.info(f"Modelo ONNX cargado: {ruta_modelo} ({self.alto}x{self.ancho}, hilos {opciones.intra_op_num_threads}/{opciones.inter_op_num_threads})")
+
+    def preprocesar(self, img):
+        """
+        Prepara un rostro recortado igual que DeepFace (BGR, relleno, escala 0-1)
+
+        Args:
+            img: Imagen BGR uint8
+
+        Returns:
+            numpy.ndarray: Tensor (alto, ancho, 3) float32
+        """
+        img = redimensionar_con_relleno(img, self.alto, self.ancho)
+        return img.astype(np.float32) / 255.0
+
+    def representar_lote(self, imagenes):
+        """
+        Calcula los embeddings (sin normalizar) de varios rostros en una sola corrida
+
+        Args:
+            imagenes: Lista de imagenes BGR
+
+        Returns:
+            numpy.ndarray: Matriz (n, d) float32
+        """
+        lote = np.stack([self.preprocesar(img) for img in imagenes])
+        return self.sesion.run(None, {self.nombre_entrada: lote})[0].astype(np.float32)
+
+    def representar(self, img):
+        """
+        Calcula el embedding (sin normalizar) de un rostro
+
+        Args:
+            img: Imagen BGR
+
+        Returns:
+            numpy.ndarray: Vector float32
+        """
+        return self.representar_lote([img])[0]
+
+
+def obtener_embedder_onnx(model_name):
+    """
+    Devuelve el embedder ONNX de un modelo, creandolo una sola vez por proceso
+
+    Args:
+        model_name (str): Nombre del modelo con sufijo "-onnx"
+
+    Returns:
+        EmbedderONNX: Instancia compartida
+    """
+    with _lock:
+        embedder = _embedders.get(model_name)
+        if embedder is None:
+            embedder = EmbedderONNX(ruta_modelo_onnx(model_name))
+            _embedders[model_name] = embedder
+        return embedder
@@ -0,0 +1,123 @@
+"""
+Planificador de identificaciones: que rostros pasan por el modelo en cada frame
+"""
+
+import os
+import sys
+
+import numpy as np
+from config import Config
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+
+class PlanificadorRostros:
+    """
+    Ordena las pistas de un frame por prioridad y reparte un presupuesto de tiempo
+
+    La prioridad es una suma ponderada de: pista nueva (nunca identificada), pista
+    sin ninguna decision todavia (las que re-verifican ya muestran la anterior),
+    tamano del rostro (mas grande = mas cerca), rostro dentro de la zona de la
+    puerta y tiempo desde la ultima identificacion (evita que una pista quede
+    postergada para siempre). Las pistas finalizadas no cuestan inferencia ni
+    consumen presupuesto; al vencer Config.VOTACION_REVERIFICAR_SEGUNDOS vuelven a
+    competir, con el criterio de espera ya al maximo.
+    """
+
+    def __init__(self, pesos=None, presupuesto_ms=None, max_inferencias=None, zona_puerta=None):
+        """
+        Inicializa el planificador
+
+        Args:
+            pesos (dict): Peso de cada criterio (nueva, pendiente, tamano, zona_puerta, espera)
+            presupuesto_ms (float): Tiempo de identificacion por frame
+            max_inferencias (int): Inferencias por frame como maximo
+            zona_puerta (tuple): (x0, y0, x1, y1) relativos al frame, o None
+        """
+        self.pesos = {**Config.PLANIFICADOR_PESOS, **(pesos or {})}
+        self.presupuesto_ms = presupuesto_ms if presupuesto_ms is not None else Config.PLANIFICADOR_PRESUPUESTO_MS
+        self.max_inferencias = max_inferencias if max_inferencias is not None else Config.MAX_DETECCIONES
+        self.zona_puerta = zona_puerta if zona_puerta is not None else Config.PLANIFICADOR_ZONA_PUERTA
+
+        # Costo medio de una inferencia (media movil exponencial de lo medido)
+        self.costo_ms = Config.PLANIFICADOR_COSTO_INICIAL_MS
+
+    def prioridades(self, pistas, forma_frame, ahora):
+        """
+        Puntaje de prioridad de cada pista
+
+        Args:
+            pistas: Pistas del SeguidorRostros (con "bbox" en coordenadas del frame)
+            forma_frame: frame.shape
+            ahora (float): Tiempo actual en segundos
+
+        Returns:
+            numpy.ndarray: Puntaje por pista (-inf para las finalizadas)
+        """
+        if not pistas:
+            return np.empty(0)
+
+        alto_frame, ancho_frame = forma_frame[:2]
+        bboxes = np.array([p["bbox"] for p in pistas], dtype=np.float64)
+        finalizadas = np.array([bool(p.get("finalizado")) for p in pistas])
+        nuevas = np.array(["identificado" not in p for p in pistas])
+        sin_decision = np.array([not p.get("finalizado") and not p.get("reverificando") for p in pistas])
+        ultima = np.array([p.get("identificado", p["creado"]) for p in pistas], dtype=np.float64)
+
+        tamano = np.minimum(bboxes[:, 3] / (alto_frame * Config.PLANIFICADOR_ALTO_REFERENCIA), 1.0)
+        espera = np.clip((ahora - ultima) / Config.PLANIFICADOR_ESPERA_MAX, 0.0, 1.0)
+
+        en_zona = np.zeros(len(pistas))
+        if self.zona_puerta is not None:
+            x0, y0, x1, y1 = self.zona_puerta
+            centro_x = (bboxes[:, 0] + bboxes[:, 2] / 2) / ancho_frame
+            centro_y = (bboxes[:, 1] + bboxes[:, 3] / 2) / alto_frame
+            en_zona = ((centro_x >= x0) & (centro_x <= x1) & (centro_y >= y0) & (centro_y <= y1)).astype(np.float64)
+
+        puntaje = (
+            self.pesos["nueva"] * nuevas
+            + self.pesos["pendiente"] * sin_decision
+            + self.pesos["tamano"] * tamano
+            + self.pesos["zona_puerta"] * en_zona
+            + self.pesos["espera"] * espera
+        )
+        return np.where(finalizadas, -np.inf, puntaje)
+
+    def ordenar(self, pistas, forma_frame, ahora):
+        """
+        Indices de las pistas de mayor a menor prioridad
+
+        Args:
+            pistas: Pistas del SeguidorRostros
+            forma_frame: frame.shape
+            ahora (float): Tiempo actual en segundos
+
+        Returns:
+            numpy.ndarray: Indices ordenados
+        """
+        return np.argsort(-self.prioridades(pistas, forma_frame, ahora), kind="stable")
+
+    def hay_presupuesto(self, gastado_ms, inferencias):
+        """
+        Si entra otra inferencia en el frame (la primera siempre entra)
+
+        Args:
+            gastado_ms (float): Tiempo de identificacion ya usado en el frame
+            inferencias (int): Inferencias ya hechas en el frame
+
+        Returns:
+            bool: True si se puede identificar otro rostro
+        """
+        if inferencias >= self.max_inferencias:
+            return False
+
+        return inferencias == 0 or gastado_ms + self.costo_ms <= self.presupuesto_ms
+
+    def registrar_costo(self, duracion_ms):
+        """
+        Actualiza el costo estimado de una inferencia
+
+        Args:
+            duracion_ms (float): Duracion medida
+        """
+        self.costo_ms += 0.2 * (duracion_ms - self.costo_ms)
@@ -5,18 +5,19 @@ Sistema de Reconocimiento Facial usando DeepFace
 import logging
 import os
 import sys
+import time
 from datetime import datetime
 
 import cv2
 from config import Config
-from deepface import DeepFace
-from utils.helpers import (
-    debe_generar_alerta,
-    extraer_nombre_archivo,
-    extraer_rol_ruta,
-    generar_id_deteccion,
-    obtener_nivel_acceso,
-)
+from modules.detector_yunet import DetectorYuNet, alinear_rostro
+from modules.embeddings import calcular_embedding, normalizar_embedding
+from modules.galeria import GaleriaRostros
+from modules.inferencia_onnx import es_modelo_onnx
+from modules.planificador import PlanificadorRostros
+from modules.seguimiento import SeguidorRostros
+from utils.calidad import evaluar_rostros
+from utils.helpers import generar_id_deteccion
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
@@ -38,15 +39,43 @@ class SistemaReconocimiento:
         self.model_name = Config.MODELO_FACIAL
         self.detector_backend = Config.DETECTOR_BACKEND
         self.umbral_confianza = Config.UMBRAL_CONFIANZA
+        self.umbral_distancia = Config.UMBRAL_DISTANCIA
+
+        # Detector nativo de OpenCV (None: se usa el wrapper de DeepFace)
+        self.detector_yunet = DetectorYuNet() if self.detector_backend == "yunet" else None
 
         # Camara
         self.camera = None
         self.camera_activa = False
 
-        # Cache de roles
-        self.roles_cache = self._cargar_roles()
+        # Galeria de embeddings y tabla de identidades
+        self.galeria = GaleriaRostros(self.db_path, self.model_name, self.detector_backend)
+        self.galeria.cargar()
+        self.mtime_galeria = self.galeria.mtime_cache()
+        self.ultima_revision_galeria = time.time()
+
+        # Cache de roles (derivado de la tabla de identidades de la galeria)
+        self.roles_cache = self.galeria.roles_cache()
+        for nombre, info in self.roles_cache.items():
+            logger.debug(f"  - {nombre}: {info['num_fotos']} foto(s)")
+
+        # Filtro de calidad en vivo (sin limite de tamano maximo ni centrado)
+        self.umbrales_calidad = {
+            "lado_min": Config.CALIDAD_LADO_MIN,
+            "lado_max": None,
+            "brillo_min": Config.CALIDAD_BRILLO_MIN,
+            "brillo_max": Config.CALIDAD_BRILLO_MAX,
+            "nitidez_min": Config.CALIDAD_NITIDEZ_MIN,
+        }
+
+        # Pistas de rostros entre frames procesados y prioridad de identificacion
+        self.seguidor = SeguidorRostros()
+        self.planificador = PlanificadorRostros()
 
         # Estadisticas
+        self.inferencias = 0
+        self.inferencias_evitadas = 0
+        self.rostros_postergados = 0
         self.total_detecciones = 0
         self.detecciones_exitosas = 0
         self.alertas_generadas = 0
@@ -56,38 +85,6 @@ class SistemaReconocimiento:
         logger.info(f"Base de datos: {self.db_path}")
         logger.info(f"Personas registradas: {len(self.roles_cache)}")
 
-    def _cargar_roles(self):
-        """
-        Carga informacion de roles desde la estructura de carpetas
-
-        Returns:
-            dict: Diccionario con informacion de cada persona (nombre -> info)
-        """
-        roles = {}
-
-        for rol, info in Config.ROLES.items():
-            carpeta_rol = os.path.join(self.db_path, rol)
-            if os.path.exists(carpeta_rol):
-                # Iterar sobre cada carpeta de persona dentro de la categoria
-                for nombre_persona in os.listdir(carpeta_rol):
-                    carpeta_persona = os.path.join(carpeta_rol, nombre_persona)
-                    if os.path.isdir(carpeta_persona):
-                        # Contar imagenes de esta persona
-                        imagenes = [f for f in os.listdir(carpeta_persona) if f.endswith((".jpg", ".jpeg", ".png"))]
-                        num_fotos = len(imagenes)
-
-                        if num_fotos > 0:
-                            # Nombre limpio de la persona
-                            nombre = extraer_nombre_archivo(nombre_persona)
-
-                            roles[nombre] = {"rol": info["nombre"], "nivel_acceso": info["nivel_acceso"], "categoria": rol, "num_fotos": num_fotos}
-
-        logger.info(f"Cargados {len(roles)} perfiles")
-        for nombre, info in roles.items():
-            logger.debug(f"  - {nombre}: {info['num_fotos']} foto(s)")
-
-        return roles
-
     def iniciar_camara(self, camera_index=None):
         """
         Inicia la camara
@@ -147,6 +144,38 @@ class SistemaReconocimiento:
 
         return frame
 
+    def recargar_galeria_si_cambio(self):
+        """
+        Recarga la galeria si otro proceso actualizo su cache (p.ej. un registro instantaneo)
+
+        La revision es un stat del archivo cada Config.GALERIA_REVISION_SEGUNDOS; la
+        recarga es de solo lectura (no calcula embeddings ni reescribe el cache), asi
+        solo cuesta leer el archivo.
+
+        Returns:
+            bool: True si se recargo
+        """
+        ahora = time.time()
+        if ahora - self.ultima_revision_galeria < Config.GALERIA_REVISION_SEGUNDOS:
+            return False
+        self.ultima_revision_galeria = ahora
+
+        mtime = self.galeria.mtime_cache()
+        if mtime == self.mtime_galeria:
+            return False
+
+        logger.info("Cache de la galeria actualizado, recargando...")
+        self.galeria.cargar(solo_cache=True)
+        # mtime leido antes de cargar: si el cache cambia durante la carga se vuelve a recargar
+        self.mtime_galeria = mtime
+        self.roles_cache = self.galeria.roles_cache()
+
+        # Las decisiones de las pistas se tomaron con la galeria anterior
+        self.seguidor.reiniciar()
+
+        logger.info(f"Personas registradas: {len(self.roles_cache)}")
+        return True
+
     def detectar_rostros(self, frame):
         """
         Detecta todos los rostros en un frame
@@ -158,6 +187,13 @@ class SistemaReconocimiento:
             list: Lista de rostros detectados
         """
         try:
+            if self.detector_yunet is not None:
+                rostros = self.detector_yunet.detectar(frame)
+                logger.debug(f"Detectados {len(rostros)} rostros (YuNet)")
+                return rostros
+
+            from deepface import DeepFace
+
             rostros = DeepFace.extract_faces(img_path=frame, detector_backend=self.detector_backend, enforce_detection=False, align=True)
             logger.debug(f"Detectados {len(rostros)} rostros")
             return rostros
@@ -176,101 +212,187 @@ class SistemaReconocimiento:
             dict: Informacion de la persona identificada
         """
         try:
-            from deepface import DeepFace
+            if not self._validar_rostro(rostro_img):
+                logger.info("No se detectaron caras reales en la imagen — no se genera alerta.")
+                return self._sin_rostro()
 
-            detecciones = DeepFace.extract_faces(img_path=rostro_img, detector_backend=self.detector_backend, enforce_detection=False)
+            # 2) Si hay cara, calcular su embedding una sola vez y buscar en la galeria
+            embedding = self.calcular_embedding(rostro_img)
+            if embedding is None:
+                return self._persona_desconocida()
 
-            if len(detecciones) == 0:
-                # Casi nunca pasa, pero lo dejo por robustez
-                cara_valida = False
-            else:
-                d = detecciones[0]
-                area = d["facial_area"]
-                conf = d.get("confidence", 0)
+            idx, distancia = self.galeria.buscar(embedding)
+            return self._resultado_busqueda(rostro_img, embedding, idx, distancia)
 
-                # Si el detector no encontró nada, estas señales lo delatan:
-                if conf == 0 or area["w"] == 0 or area["h"] == 0:
-                    cara_valida = False
-                else:
-                    cara_valida = True
+        except Exception as e:
+            logger.error(f"Error identificando persona: {e}")
+            import traceback
+
+            traceback.print_exc()
+            return self._persona_desconocida()
+
+    def _validar_rostro(self, rostro_img):
+        """
+        Comprueba que el recorte contenga una cara real
+
+        Args:
+            rostro_img: Imagen del rostro
+
+        Returns:
+            bool: True si hay una cara valida
+        """
+        if self.detector_yunet is not None:
+            # YuNet ya filtro por score al detectar: el recorte alineado no se vuelve a validar
+            return rostro_img.size > 0
+
+        from deepface import DeepFace
+
+        detecciones = DeepFace.extract_faces(img_path=rostro_img, detector_backend=self.detector_backend, enforce_detection=False)
+
+        if len(detecciones) == 0:
+            # Casi nunca pasa, pero lo dejo por robustez
+            return False
+
+        d = detecciones[0]
+        area = d["facial_area"]
+        conf = d.get("confidence", 0)
+
+        # Si el detector no encontró nada, estas señales lo delatan:
+        return not (conf == 0 or area["w"] == 0 or area["h"] == 0)
+
+    def _es_reconocido(self, idx, distancia):
+        """
+        Indica si un resultado de busqueda pasa los umbrales de distancia y confianza
+
+        Args:
+            idx (int): Fila de la galeria o None
+            distancia (float): Distancia coseno al match
+
+        Returns:
+            bool: True si es un match aceptado
+        """
+        return idx is not None and distancia <= self.umbral_distancia and round((1 - distancia) * 100, 2) >= self.umbral_confianza
+
+    def _resultado_busqueda(self, rostro_img, embedding, idx, distancia):
+        """
+        Arma la informacion de la persona a partir del resultado de la galeria
+
+        Args:
+            rostro_img: Imagen del rostro (para el analisis de desconocidos)
+            embedding: Embedding usado en la busqueda
+            idx (int): Fila de la galeria o None
+            distancia (float): Distancia coseno al match
+
+        Returns:
+            dict: Informacion de la persona identificada o desconocida
+        """
+        # Analizar resultados
+        if idx is not None and distancia <= self.umbral_distancia:
+            identidad = self.galeria.rutas[idx]
+            confianza = round((1 - distancia) * 100, 2)
+
+            logger.info(f"Match encontrado: {identidad} - Distancia: {distancia:.4f} - Confianza: {confianza}%")
+
+            # Validar confianza
+            if confianza >= self.umbral_confianza:
+                persona = self.galeria.persona(idx)
+
+                self.detecciones_exitosas += 1
+
+                logger.info(f"Identificado: {persona['nombre']} ({confianza}%)")
 
-            if not cara_valida:
-                logger.info("No se detectaron caras reales en la imagen — no se genera alerta.")
                 return {
-                    "encontrado": False,
-                    "autorizado": False,
-                    "genera_alerta": False,
-                    "tipo_alerta": None,
-                    "nombre": "no_face_detected_or_no_match",
+                    "encontrado": True,
+                    "nombre": persona["nombre"],
+                    "rol": persona["rol"],
+                    "confianza": confianza,
+                    "nivel_acceso": persona["nivel_acceso"],
+                    "autorizado": True,
+                    "genera_alerta": persona["genera_alerta"],
+                    "tipo_alerta": persona["tipo_alerta"],
+                    "distancia": distancia,
+                    "embedding": embedding,
                 }
-
-            # 2) Si hay cara, usar la imagen completa o recortada
-            resultados = DeepFace.find(
-                img_path=rostro_img,
-                db_path=self.db_path,
-                model_name=self.model_name,
-                detector_backend=self.detector_backend,
-                enforce_detection=False,
-                silent=True,
-            )
-
-            # Analizar resultados
-            if len(resultados) > 0 and len(resultados[0]) > 0:
-                mejor_match = resultados[0].iloc[0]
-                identidad = mejor_match["identity"]
-                distancia = mejor_match["distance"]
-                confianza = round((1 - distancia) * 100, 2)
-
-                logger.info(f"Match encontrado: {identidad} - Distancia: {distancia:.4f} - Confianza: {confianza}%")
-
-                # Validar confianza
-                if confianza >= self.umbral_confianza:
-                    nombre = extraer_nombre_archivo(identidad)
-                    rol = extraer_rol_ruta(identidad)
-                    nivel_acceso = obtener_nivel_acceso(identidad)
-                    genera_alerta, tipo_alerta = debe_generar_alerta(identidad, False)
-
-                    self.detecciones_exitosas += 1
-
-                    logger.info(f"Identificado: {nombre} ({confianza}%)")
-
-                    return {
-                        "encontrado": True,
-                        "nombre": nombre,
-                        "rol": rol,
-                        "confianza": confianza,
-                        "nivel_acceso": nivel_acceso,
-                        "autorizado": True,
-                        "genera_alerta": genera_alerta,
-                        "tipo_alerta": tipo_alerta,
-                    }
-                else:
-                    logger.warning(f"Confianza baja: {confianza}% < {self.umbral_confianza}%")
             else:
-                logger.warning("No se encontraron matches en la base de datos")
+                logger.warning(f"Confianza baja: {confianza}% < {self.umbral_confianza}%")
+        else:
+            logger.warning("No se encontraron matches en la base de datos")
 
-            analysis = DeepFace.analyze(img_path=rostro_img, actions=["age", "gender", "race"])
-            analysis_str = ""
-            if analysis is not None:
-                age = analysis[0]["age"]
-                gender = analysis[0]["dominant_gender"]
-                race = analysis[0]["dominant_race"]
-                analysis_str = f"Edad: {age}, Genero: {gender}, Etnia: {race}"
+        # No se encontro o confianza baja
+        return self._persona_desconocida(self._analizar_rostro(rostro_img), embedding, distancia)
+
+    def _analizar_rostro(self, rostro_img):
+        """
+        Describe edad, genero y etnia de un rostro desconocido
 
-            # No se encontro o confianza baja
-            return self._persona_desconocida(analysis_str)
+        Se omite con Config.ANALIZAR_DESCONOCIDOS = False y con el backend ONNX, que
+        existe justamente para no cargar TensorFlow.
+
+        Args:
+            rostro_img: Imagen del rostro
 
+        Returns:
+            str: Descripcion, o cadena vacia si el analisis falla o esta desactivado
+        """
+        if not Config.ANALIZAR_DESCONOCIDOS or es_modelo_onnx(self.model_name):
+            return ""
+
+        from deepface import DeepFace
+
+        try:
+            analysis = DeepFace.analyze(img_path=rostro_img, actions=["age", "gender", "race"])
         except Exception as e:
-            logger.error(f"Error identificando persona: {e}")
-            import traceback
+            logger.warning(f"No se pudo analizar el rostro: {e}")
+            return ""
 
-            traceback.print_exc()
-            return self._persona_desconocida()
+        analysis_str = ""
+        if analysis is not None:
+            age = analysis[0]["age"]
+            gender = analysis[0]["dominant_gender"]
+            race = analysis[0]["dominant_race"]
+            analysis_str = f"Edad: {age}, Genero: {gender}, Etnia: {race}"
+
+        return analysis_str
+
+    def calcular_embedding(self, rostro_img):
+        """
+        Calcula el embedding L2-normalizado de un rostro
+
+        Args:
+            rostro_img: Imagen del rostro
+
+        Returns:
+            numpy.ndarray: Embedding normalizado o None si fallo
+        """
+        # Con YuNet el rostro llega recortado y alineado: no se vuelve a detectar
+        detector = "skip" if self.detector_yunet is not None else self.detector_backend
+        self.inferencias += 1
+        return calcular_embedding(rostro_img, self.model_name, detector)
+
+    def _sin_rostro(self):
+        """
+        Resultado para recortes sin una cara real (no genera alerta)
+
+        Returns:
+            dict: Marcador "no_face_detected_or_no_match"
+        """
+        return {
+            "encontrado": False,
+            "autorizado": False,
+            "genera_alerta": False,
+            "tipo_alerta": None,
+            "nombre": "no_face_detected_or_no_match",
+        }
 
-    def _persona_desconocida(self, analysis=""):
+    def _persona_desconocida(self, analysis="", embedding=None, distancia=None):
         """
         Retorna informacion de persona desconocida
 
+        Args:
+            analysis (str): Descripcion de edad/genero/etnia
+            embedding: Embedding del rostro, usado para deduplicar
+            distancia (float): Distancia al match mas cercano de la galeria
+
         Returns:
             dict: Informacion por defecto
         """
@@ -284,63 +406,277 @@ class SistemaReconocimiento:
             "genera_alerta": True,
             "tipo_alerta": "critico",
             "analysis": analysis,
+            "distancia": distancia,
+            "embedding": embedding,
         }
 
-    def procesar_frame(self, frame):
+    def procesar_frame(self, frame, capturado=None):
         """
         Procesa un frame completo: detecta e identifica personas
 
         Args:
             frame: Frame de OpenCV
+            capturado (float): time.monotonic() al capturar el frame (opcional)
 
         Returns:
-            dict: Detecciones encontradas
+            dict: Detecciones a mostrar y alertar, eventos (un embedding nuevo por rostro que paso
+                por el modelo, decidido o no) y la latencia captura -> resultado si se indico capturado
         """
         self.total_detecciones += 1
+        self.recargar_galeria_si_cambio()
 
-        # Detectar rostros
-        rostros = self.detectar_rostros(frame)
+        # Detectar y seguir rostros
+        rostros = self.detectar_rostros(frame)[: Config.PLANIFICADOR_MAX_ROSTROS]
+        ahora = time.time()
 
-        detecciones = []
+        bboxes = [(r["facial_area"]["x"], r["facial_area"]["y"], r["facial_area"]["w"], r["facial_area"]["h"]) for r in rostros]
+        pistas = self.seguidor.actualizar(bboxes, ahora)
+        self._reverificar_pistas(pistas, ahora)
 
-        # Procesar cada rostro
-        for i, rostro in enumerate(rostros[: Config.MAX_DETECCIONES]):
-            try:
-                facial_area = rostro["facial_area"]
-                x, y, w, h = facial_area["x"], facial_area["y"], facial_area["w"], facial_area["h"]
+        # Filtro de calidad de todos los rostros en una sola pasada
+        calidad = evaluar_rostros(frame, bboxes, umbrales=self.umbrales_calidad, verificar_centrado=False)
+        aceptados = calidad["aceptado"]
+
+        # Las pistas que se fueron sin decision se cierran como desconocidas (alertan)
+        detecciones = self._cerrar_pistas_descartadas()
+        eventos = []
+        inicio = time.perf_counter()
+        inferencias_frame = 0
 
-                rostro_img = frame[y: y + h, x: x + w]
+        # Identificar en orden de prioridad mientras alcance el presupuesto del frame
+        for i in self.planificador.ordenar(pistas, frame.shape, ahora):
+            pista = pistas[i]
+            try:
+                x, y, w, h = bboxes[i]
 
-                info_persona = self.identificar_persona(rostro_img)
-                if info_persona["nombre"] == "no_face_detected_or_no_match":
+                if self.detector_yunet is not None:
+                    rostro_img = alinear_rostro(frame, rostros[i])
+                else:
+                    rostro_img = frame[y: y + h, x: x + w]
+
+                pista["embedding_frame"] = None
+                gastado_ms = (time.perf_counter() - inicio) * 1000
+                if pista.get("finalizado") or self.planificador.hay_presupuesto(gastado_ms, inferencias_frame):
+                    inferencias_previas = self.inferencias
+                    t0 = time.perf_counter()
+                    info_persona = self._identificar_en_pista(pista, rostro_img, float(calidad["puntuacion"][i]), bool(aceptados[i]))
+
+                    if self.inferencias != inferencias_previas:
+                        inferencias_frame += 1
+                        pista["identificado"] = ahora
+                        self.planificador.registrar_costo((time.perf_counter() - t0) * 1000)
+                else:
+                    # Sin presupuesto: se muestra lo ultimo decidido para la pista
+                    info_persona = pista.get("resultado")
+                    self.rostros_postergados += 1
+
+                # Cada embedding nuevo va al registro de eventos, aunque la votacion no haya decidido
+                embedding_frame = pista.pop("embedding_frame", None)
+                if embedding_frame is not None:
+                    eventos.append(
+                        {
+                            "bbox": {"x": x, "y": y, "w": w, "h": h},
+                            "nombre": info_persona["nombre"] if info_persona is not None else "Desconocido",
+                            "distancia": pista.get("distancia"),
+                            "embedding": embedding_frame,
+                            "track_id": pista["id"],
+                        }
+                    )
+
+                if info_persona is None or info_persona["nombre"] == "no_face_detected_or_no_match":
                     continue
 
-                # Agregar informacion de ubicacion
-                deteccion = {
-                    "id": generar_id_deteccion(),
-                    "nombre": info_persona["nombre"],
-                    "rol": info_persona["rol"],
-                    "confianza": info_persona["confianza"],
-                    "autorizado": info_persona["autorizado"],
-                    "nivel_acceso": info_persona["nivel_acceso"],
-                    "bbox": {"x": x, "y": y, "w": w, "h": h},
-                    "timestamp": datetime.now().isoformat(),
-                    "genera_alerta": info_persona["genera_alerta"],
-                    "tipo_alerta": info_persona.get("tipo_alerta"),
-                    "analysis": info_persona.get("analysis"),
-                    "rostro_img": rostro_img
-                }
+                detecciones.append(self._crear_deteccion(info_persona, (x, y, w, h), rostro_img, pista["id"]))
+
+            except Exception as e:
+                logger.error(f"Error procesando rostro {i}: {e}")
+
+        return {
+            "detecciones": detecciones,
+            "eventos": eventos,
+            "total_detectados": len(detecciones),
+            "timestamp": datetime.now().isoformat(),
+            "capturado": capturado,
+            "latencia_ms": (time.monotonic() - capturado) * 1000 if capturado is not None else None,
+        }
 
-                detecciones.append(deteccion)
+    def _crear_deteccion(self, info_persona, bbox, rostro_img, track_id, pista_cerrada=False):
+        """
+        Arma una deteccion a partir de la decision de una pista
 
-                # Generar alerta si es necesario
-                if info_persona["genera_alerta"]:
-                    self.alertas_generadas += 1
+        Args:
+            info_persona (dict): Resultado de la identificacion
+            bbox (tuple): (x, y, w, h) en coordenadas del frame
+            rostro_img: Recorte del rostro
+            track_id (int): Id de la pista
+            pista_cerrada (bool): True si la pista ya salio de cuadro (no se dibuja)
 
+        Returns:
+            dict: Deteccion
+        """
+        x, y, w, h = (int(v) for v in bbox)
+
+        if info_persona["genera_alerta"]:
+            self.alertas_generadas += 1
+
+        return {
+            "id": generar_id_deteccion(),
+            "nombre": info_persona["nombre"],
+            "rol": info_persona["rol"],
+            "confianza": info_persona["confianza"],
+            "autorizado": info_persona["autorizado"],
+            "nivel_acceso": info_persona["nivel_acceso"],
+            "bbox": {"x": x, "y": y, "w": w, "h": h},
+            "timestamp": datetime.now().isoformat(),
+            "genera_alerta": info_persona["genera_alerta"],
+            "tipo_alerta": info_persona.get("tipo_alerta"),
+            "analysis": info_persona.get("analysis"),
+            "rostro_img": rostro_img,
+            "distancia": info_persona.get("distancia"),
+            "embedding": info_persona.get("embedding"),
+            "track_id": track_id,
+            "pista_cerrada": pista_cerrada,
+        }
+
+    def _cerrar_pistas_descartadas(self):
+        """
+        Finaliza las pistas que el seguidor descarto con la votacion todavia abierta
+
+        Un desconocido visto en pocos frames no llega a decision final; al irse la
+        pista se decide con la evidencia acumulada, asi no se pierde su alerta.
+
+        Returns:
+            list: Detecciones de las pistas cerradas (con pista_cerrada=True)
+        """
+        detecciones = []
+
+        for pista in self.seguidor.extraer_descartadas():
+            if pista.get("finalizado") or pista.get("resultado") is not None or not pista.get("muestras"):
+                continue
+
+            try:
+                media = normalizar_embedding(pista["suma"])
+                idx, distancia = self.galeria.buscar(media)
+                info_persona = self._resultado_busqueda(pista["recorte"], media, idx, distancia)
+                detecciones.append(self._crear_deteccion(info_persona, pista["bbox"], pista["recorte"], pista["id"], pista_cerrada=True))
+                logger.debug(f"Pista {pista['id']} cerrada sin decision tras {pista['muestras']} muestra(s): {info_persona['nombre']}")
             except Exception as e:
-                logger.error(f"Error procesando rostro {i}: {e}")
+                logger.error(f"Error cerrando la pista {pista['id']}: {e}")
+
+        return detecciones
+
+    def _reverificar_pistas(self, pistas, ahora):
+        """
+        Reabre la votacion de las pistas finalizadas hace mas de Config.VOTACION_REVERIFICAR_SEGUNDOS
+
+        Una pista puede cambiar de persona sin que el seguidor lo note (oclusion,
+        cruce de dos personas), asi que la decision final no es permanente. La
+        pista vuelve a votar desde cero mostrando la decision anterior mientras tanto.
+
+        Args:
+            pistas: Pistas del SeguidorRostros
+            ahora (float): Tiempo actual en segundos
+        """
+        for pista in pistas:
+            if pista.get("finalizado") and ahora - pista["identificado"] >= Config.VOTACION_REVERIFICAR_SEGUNDOS:
+                pista["finalizado"] = False
+                pista["reverificando"] = True
+                pista["suma"] = 0
+                pista["muestras"] = 0
+
+    def _identificar_en_pista(self, pista, rostro_img, puntuacion, aceptado):
+        """
+        Acumula evidencia de identidad en la pista y decide cuando hay suficiente
+
+        Los recortes que no pasan el filtro de calidad no se envian al modelo: se guarda
+        el mejor recorte de la pista y, si tras varios intentos ninguno pasa, se usa
+        ese mejor recorte para no ocultar a la persona indefinidamente.
+
+        Cada embedding se suma a la media de la pista y la decision se toma sobre la
+        media. Un match se muestra desde la primera muestra; un desconocido solo se
+        informa (y alerta) cuando la decision es final. La decision se finaliza antes
+        de llenar la ventana si la media ya es claramente un match o claramente
+        desconocida; desde ahi la pista no vuelve a pasar por el modelo hasta que
+        _reverificar_pistas reabre la votacion.
+
+        Args:
+            pista (dict): Pista del SeguidorRostros
+            rostro_img: Recorte del rostro actual
+            puntuacion (float): Puntuacion de calidad del recorte (0-100)
+            aceptado (bool): Si el recorte paso el filtro de calidad
+
+        Returns:
+            dict: Informacion de la persona, o None si todavia no hay decision
+        """
+        if pista.get("finalizado"):
+            self.inferencias_evitadas += 1
+            return pista["resultado"]
+
+        if aceptado:
+            candidato = rostro_img
+        else:
+            pendiente = pista.get("pendiente")
+            if pendiente is None or puntuacion > pendiente[0]:
+                pista["pendiente"] = (puntuacion, rostro_img.copy())
+            pista["aplazados"] = pista.get("aplazados", 0) + 1
+
+            if pista["aplazados"] < Config.CALIDAD_MAX_APLAZAMIENTOS:
+                self.inferencias_evitadas += 1
+                return pista.get("resultado")
+
+            candidato = pista["pendiente"][1]
+
+        pista["pendiente"] = None
+        pista["aplazados"] = 0
+
+        try:
+            if not self._validar_rostro(candidato):
+                return self._sin_rostro()
+
+            embedding = self.calcular_embedding(candidato)
+        except Exception as e:
+            logger.error(f"Error identificando persona: {e}")
+            return pista.get("resultado")
+
+        if embedding is None:
+            return pista.get("resultado")
+
+        pista["embedding_frame"] = embedding
+        pista["suma"] = pista.get("suma", 0) + embedding
+        pista["muestras"] = pista.get("muestras", 0) + 1
+        muestras = pista["muestras"]
+
+        media = normalizar_embedding(pista["suma"])
+        idx, distancia = self.galeria.buscar(media)
+        pista["distancia"] = distancia
+
+        if self._es_reconocido(idx, distancia):
+            finalizado = muestras >= Config.VOTACION_VENTANA or (muestras >= Config.VOTACION_MIN_MUESTRAS and distancia <= Config.VOTACION_DISTANCIA_FINAL)
+        else:
+            claramente_desconocido = distancia is None or distancia > self.umbral_distancia + Config.VOTACION_MARGEN_DESCONOCIDO
+            finalizado = muestras >= Config.VOTACION_VENTANA or (muestras >= Config.VOTACION_MIN_MUESTRAS and claramente_desconocido)
+
+            if not finalizado:
+                # Re-verificando: se sigue mostrando la decision anterior hasta tener una nueva
+                if pista.get("reverificando"):
+                    return pista.get("resultado")
+
+                # Sin evidencia suficiente: no se informa para evitar alertas que luego se desmienten;
+                # si la pista se va antes de decidir, _cerrar_pistas_descartadas la cierra con este recorte
+                pista["resultado"] = None
+                pista["recorte"] = candidato.copy()
+                return None
+
+        info_persona = self._resultado_busqueda(candidato, media, idx, distancia)
+        pista["resultado"] = info_persona
+        pista["finalizado"] = finalizado
+        pista.pop("recorte", None)
+
+        if finalizado:
+            pista["reverificando"] = False
+            logger.debug(f"Pista {pista['id']} finalizada tras {muestras} muestra(s): {info_persona['nombre']}")
 
-        return {"detecciones": detecciones, "total_detectados": len(detecciones), "timestamp": datetime.now().isoformat()}
+        return info_persona
 
     def obtener_estadisticas(self):
         """
@@ -353,6 +689,10 @@ class SistemaReconocimiento:
             "total_detecciones": self.total_detecciones,
             "detecciones_exitosas": self.detecciones_exitosas,
             "alertas_generadas": self.alertas_generadas,
+            "inferencias": self.inferencias,
+            "inferencias_evitadas": self.inferencias_evitadas,
+            "rostros_postergados": self.rostros_postergados,
+            "costo_inferencia_ms": round(self.planificador.costo_ms, 1),
             "personas_registradas": len(self.roles_cache),
             "tasa_exito": round((self.detecciones_exitosas / max(self.total_detecciones, 1)) * 100, 2),
             "modelo": self.model_name,
@@ -0,0 +1,131 @@
+"""
+Seguimiento de rostros entre frames procesados por solapamiento (IoU)
+"""
+
+import itertools
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+from config import Config
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+logger = logging.getLogger(__name__)
+
+
+def calcular_iou(cajas_a, cajas_b):
+    """
+    IoU entre todas las cajas de dos conjuntos
+
+    Args:
+        cajas_a: Array (m, 4) de cajas (x, y, w, h)
+        cajas_b: Array (n, 4) de cajas (x, y, w, h)
+
+    Returns:
+        numpy.ndarray: Matriz (m, n) de IoU
+    """
+    a = np.asarray(cajas_a, dtype=np.float64).reshape(-1, 1, 4)
+    b = np.asarray(cajas_b, dtype=np.float64).reshape(1, -1, 4)
+
+    ix0 = np.maximum(a[..., 0], b[..., 0])
+    iy0 = np.maximum(a[..., 1], b[..., 1])
+    ix1 = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2])
+    iy1 = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3])
+
+    interseccion = np.clip(ix1 - ix0, 0, None) * np.clip(iy1 - iy0, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - interseccion
+    return interseccion / np.maximum(union, 1e-9)
+
+
+class SeguidorRostros:
+    """
+    Asocia las detecciones de cada frame procesado con pistas (tracks) previas
+
+    Cada pista es un dict con "id", "bbox", "perdidos", "creado" y "actualizado";
+    el reconocimiento guarda en ella su propio estado (mejor recorte, resultado, ...).
+    """
+
+    def __init__(self, umbral_iou=None, max_perdidos=None):
+        """
+        Inicializa el seguidor
+
+        Args:
+            umbral_iou (float): IoU minimo para continuar una pista
+            max_perdidos (int): Frames procesados sin deteccion antes de descartar una pista
+        """
+        self.umbral_iou = umbral_iou if umbral_iou is not None else Config.SEGUIMIENTO_UMBRAL_IOU
+        self.max_perdidos = max_perdidos if max_perdidos is not None else Config.SEGUIMIENTO_MAX_PERDIDOS
+        self.pistas = {}
+        self._ids = itertools.count(1)
+        # Pistas descartadas que todavia no se entregaron con extraer_descartadas
+        self.descartadas = []
+
+    def reiniciar(self):
+        """Descarta todas las pistas"""
+        self.descartadas.extend(self.pistas.values())
+        self.pistas.clear()
+
+    def extraer_descartadas(self):
+        """
+        Entrega (una sola vez) las pistas descartadas desde la llamada anterior
+
+        Returns:
+            list: Pistas descartadas, con el estado que les dejo el reconocimiento
+        """
+        descartadas, self.descartadas = self.descartadas, []
+        return descartadas
+
+    def actualizar(self, bboxes, ahora=None):
+        """
+        Asocia las cajas del frame actual con las pistas (greedy por IoU descendente)
+
+        Args:
+            bboxes: Lista o array (n, 4) de cajas (x, y, w, h)
+            ahora (float): Tiempo actual en segundos (por defecto time.time())
+
+        Returns:
+            list: Pista asignada a cada caja, en el mismo orden
+        """
+        ahora = ahora if ahora is not None else time.time()
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        ids_previos = list(self.pistas)
+        asignadas = [None] * len(bboxes)
+
+        if ids_previos and len(bboxes):
+            previas = np.array([self.pistas[i]["bbox"] for i in ids_previos])
+            iou = calcular_iou(previas, bboxes)
+
+            while True:
+                fila, columna = np.unravel_index(np.argmax(iou), iou.shape)
+                if iou[fila, columna] < self.umbral_iou:
+                    break
+
+                asignadas[columna] = self.pistas[ids_previos[fila]]
+                iou[fila, :] = -1
+                iou[:, columna] = -1
+
+        usadas = set()
+        for j, pista in enumerate(asignadas):
+            if pista is None:
+                pista = {"id": next(self._ids), "creado": ahora}
+                self.pistas[pista["id"]] = pista
+                asignadas[j] = pista
+
+            pista["bbox"] = bboxes[j]
+            pista["perdidos"] = 0
+            pista["actualizado"] = ahora
+            usadas.add(pista["id"])
+
+        for id_pista in ids_previos:
+            if id_pista in usadas:
+                continue
+
+            pista = self.pistas[id_pista]
+            pista["perdidos"] += 1
+            if pista["perdidos"] > self.max_perdidos:
+                self.descartadas.append(self.pistas.pop(id_pista))
+
+        return asignadas
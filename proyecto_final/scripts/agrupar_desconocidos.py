@@ -0,0 +1,215 @@
+"""
+Agrupa los rostros desconocidos guardados en backend/temp en candidatos a registrar
+
+Calcula en paralelo los embeddings de los recortes desconocido_*.jpg (con cache:
+las corridas siguientes solo procesan los nuevos), los agrupa por similitud con
+modules.agrupamiento y copia cada grupo a una carpeta propia, con un resumen CSV
+de cantidad y primera/ultima vez visto. Para registrar a una persona basta con
+mover su carpeta a backend/database/<categoria>/<Nombre>/ y entrenar.
+
+La limpieza de temporales borra los recortes viejos (Config.TEMP_MAX_EDAD_MINUTOS):
+correrlo con esa frecuencia o sobre una copia con --entrada.
+
+Uso:
+    python scripts/agrupar_desconocidos.py [--umbral 0.30] [--min-tamano 3] [--workers 4]
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from modules.agrupamiento import agrupar_embeddings, fecha_desconocido  # noqa: E402
+from modules.entrenamiento import embeber_en_paralelo, formatear_duracion  # noqa: E402
+
+
+def leer_cache(archivo):
+    """
+    Lee el cache de embeddings de desconocidos
+
+    Args:
+        archivo (str): Archivo .npz
+
+    Returns:
+        dict: ruta -> (mtime, embedding)
+    """
+    if not os.path.exists(archivo):
+        return {}
+
+    try:
+        with np.load(archivo, allow_pickle=False) as datos:
+            return {str(r): (m, e) for r, m, e in zip(datos["rutas"], datos["mtimes"], datos["embeddings"])}
+    except Exception as e:
+        print(f"Cache invalido, se recalcula: {e}")
+        return {}
+
+
+def escribir_cache(archivo, embebidos):
+    """
+    Escribe el cache de embeddings de forma atomica
+
+    Args:
+        archivo (str): Archivo .npz
+        embebidos (dict): ruta -> (mtime, embedding)
+    """
+    if not embebidos:
+        return
+
+    rutas = sorted(embebidos)
+    temporal = archivo + ".tmp.npz"
+    np.savez(
+        temporal,
+        rutas=np.array(rutas),
+        mtimes=np.array([embebidos[r][0] for r in rutas], dtype=np.float64),
+        embeddings=np.stack([embebidos[r][1] for r in rutas]).astype(np.float32),
+    )
+    os.replace(temporal, archivo)
+
+
+def embeber_recortes(rutas, archivo_cache, workers):
+    """
+    Embeddings de los recortes, reutilizando el cache y calculando solo los nuevos
+
+    Args:
+        rutas: Rutas de los recortes
+        archivo_cache (str): Archivo .npz del cache
+        workers (int): Procesos worker
+
+    Returns:
+        tuple: (dict ruta -> (mtime, embedding), errores, interrumpido)
+    """
+    cache = leer_cache(archivo_cache)
+    embebidos = {}
+    pendientes = []
+
+    for ruta in rutas:
+        mtime = os.path.getmtime(ruta)
+        en_cache = cache.get(ruta)
+        if en_cache is not None and en_cache[0] == mtime:
+            embebidos[ruta] = en_cache
+        else:
+            pendientes.append((ruta, mtime))
+
+    print(f"Recortes: {len(rutas)} | En cache: {len(embebidos)} | Pendientes: {len(pendientes)} | Workers: {workers}")
+
+    # Con YuNet los recortes guardados ya estan alineados, igual que en el reconocimiento en vivo
+    detector = "skip" if Config.DETECTOR_BACKEND == "yunet" else Config.DETECTOR_BACKEND
+    errores = 0
+    interrumpido = False
+    inicio = time.time()
+    resultados = embeber_en_paralelo(pendientes, workers, Config.MODELO_FACIAL, detector)
+
+    try:
+        for hechos, (ruta, mtime, embedding, _) in enumerate(resultados, start=1):
+            if embedding is not None:
+                embebidos[ruta] = (mtime, embedding)
+            else:
+                errores += 1
+
+            velocidad = hechos / max(time.time() - inicio, 1e-9)
+            eta = (len(pendientes) - hechos) / velocidad
+            print(f"\r  {hechos}/{len(pendientes)} - {velocidad:.1f} img/s - ETA {formatear_duracion(eta)} - errores: {errores}   ", end="", flush=True)
+
+        if pendientes:
+            print()
+
+    except KeyboardInterrupt:
+        interrumpido = True
+        print("\n\nInterrumpido: se guarda lo calculado")
+
+    finally:
+        resultados.close()
+        escribir_cache(archivo_cache, embebidos)
+
+    return embebidos, errores, interrumpido
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agrupamiento de rostros desconocidos guardados")
+    parser.add_argument("--entrada", default=Config.TEMP_DIR, help="Carpeta con los recortes desconocidos")
+    parser.add_argument("--patron", default="desconocido_*.jpg", help="Patron de archivos a agrupar")
+    parser.add_argument("--salida", default=Config.DESCONOCIDOS_GRUPOS_DIR, help="Carpeta de resultados (y del cache de embeddings)")
+    parser.add_argument("--umbral", type=float, default=Config.AGRUPAMIENTO_UMBRAL_DISTANCIA, help="Distancia coseno maxima entre vecinos")
+    parser.add_argument("--min-tamano", type=int, default=Config.AGRUPAMIENTO_MIN_TAMANO, help="Recortes minimos para exportar un grupo")
+    parser.add_argument("--bloque", type=int, default=2048, help="Filas por bloque de similitudes")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de embeddings (por defecto Config.ENTRENAMIENTO_WORKERS)")
+    parser.add_argument("--mostrar", type=int, default=20, help="Grupos a listar")
+    args = parser.parse_args()
+
+    rutas = sorted(glob.glob(os.path.join(args.entrada, args.patron)))
+    if not rutas:
+        print(f"No hay recortes {args.patron} en {args.entrada}")
+        return 1
+
+    os.makedirs(args.salida, exist_ok=True)
+    archivo_cache = os.path.join(args.salida, f"embeddings_{Config.MODELO_FACIAL.lower()}.npz")
+    embebidos, errores, interrumpido = embeber_recortes(rutas, archivo_cache, args.workers or Config.ENTRENAMIENTO_WORKERS)
+
+    if interrumpido:
+        return 1
+
+    # Solo los recortes que siguen en la entrada (el cache puede tener de corridas anteriores)
+    rutas = [r for r in rutas if r in embebidos]
+    if not rutas:
+        print("Ningun recorte tiene embedding")
+        return 1
+
+    embeddings = np.stack([embebidos[r][1] for r in rutas]).astype(np.float32)
+
+    inicio = time.time()
+    etiquetas = agrupar_embeddings(embeddings, args.umbral, args.bloque)
+    tamanos = np.bincount(etiquetas)
+    exportables = int((tamanos >= args.min_tamano).sum())
+
+    print(
+        f"\nGrupos: {len(tamanos)} | Con {args.min_tamano} o mas recortes: {exportables} | "
+        f"Sueltos: {int((tamanos == 1).sum())} | Errores de embedding: {errores} | {time.time() - inicio:.1f}s"
+    )
+
+    if exportables == 0:
+        return 0
+
+    carpeta_corrida = os.path.join(args.salida, f"agrupamiento_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    filas_csv = []
+
+    print(f"\n{'Grupo':>8}  {'Recortes':>8}  {'Primera vez':>19}  {'Ultima vez':>19}")
+    for grupo in range(exportables):
+        indices = np.flatnonzero(etiquetas == grupo)
+        miembros = [rutas[i] for i in indices]
+
+        # Representante: el recorte mas parecido al promedio del grupo
+        media = embeddings[indices].mean(axis=0)
+        representante = miembros[int(np.argmax(embeddings[indices] @ media))]
+
+        primera = min(fecha_desconocido(r) for r in miembros)
+        ultima = datetime.fromtimestamp(max(embebidos[r][0] for r in miembros))
+
+        carpeta_grupo = os.path.join(carpeta_corrida, f"grupo_{grupo + 1:03d}")
+        os.makedirs(carpeta_grupo, exist_ok=True)
+        for ruta in miembros:
+            shutil.copy2(ruta, carpeta_grupo)
+
+        filas_csv.append((grupo + 1, len(miembros), primera, ultima, os.path.basename(representante), carpeta_grupo))
+        if grupo < args.mostrar:
+            print(f"{grupo + 1:>8}  {len(miembros):>8}  {primera:%Y-%m-%d %H:%M:%S}  {ultima:%Y-%m-%d %H:%M:%S}")
+
+    with open(os.path.join(carpeta_corrida, "resumen.csv"), "w", encoding="utf-8") as f:
+        f.write("grupo,recortes,primera_vez,ultima_vez,representante,carpeta\n")
+        for grupo, cantidad, primera, ultima, representante, carpeta in filas_csv:
+            f.write(f"{grupo},{cantidad},{primera:%Y-%m-%d %H:%M:%S},{ultima:%Y-%m-%d %H:%M:%S},{representante},{carpeta}\n")
+
+    print(f"\nGrupos exportados en {carpeta_corrida}")
+    print("Para registrar a una persona: mover su carpeta a backend/database/<categoria>/<Nombre>/ y entrenar")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: calidad por recorte (gris + Laplaciano de cada rostro) vs evaluar_rostros en lote
+
+Uso:
+    python scripts/benchmark_calidad.py --rostros 1 4 8 --iteraciones 300
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.calidad import evaluar_rostros  # noqa: E402
+
+
+def generar_bboxes(cantidad, ancho=1280, alto=720, semilla=0):
+    """Genera cajas sinteticas repartidas en el frame"""
+    rng = np.random.default_rng(semilla)
+    bboxes = []
+
+    for _ in range(cantidad):
+        w = int(rng.integers(120, 260))
+        h = int(w * 1.15)
+        bboxes.append((int(rng.integers(0, ancho - w)), int(rng.integers(0, alto - h)), w, h))
+
+    return bboxes
+
+
+def calidad_por_recorte(frame, bboxes):
+    """Referencia: la implementacion anterior, un cvtColor y un Laplaciano CV_64F por rostro"""
+    resultados = []
+    for x, y, w, h in bboxes:
+        gray = cv2.cvtColor(frame[y : y + h, x : x + w], cv2.COLOR_BGR2GRAY)
+        resultados.append((np.mean(gray), cv2.Laplacian(gray, cv2.CV_64F).var()))
+    return resultados
+
+
+def medir(funcion, iteraciones):
+    """Tiempo medio por llamada en microsegundos"""
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        funcion()
+    return (time.perf_counter() - inicio) / iteraciones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor de calidad de rostros")
+    parser.add_argument("--rostros", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--iteraciones", type=int, default=300)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(1).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+
+    print(f"{'Rostros':>7}  {'por recorte (us/rostro)':>23}  {'lote (us/rostro)':>16}  {'lote x0.5 (us/rostro)':>21}  {'Mejora':>7}")
+    for cantidad in args.rostros:
+        bboxes = generar_bboxes(cantidad)
+
+        # Mismo resultado que la referencia (salvo redondeo float32 del Laplaciano)
+        referencia = np.array(calidad_por_recorte(frame, bboxes))
+        lote = evaluar_rostros(frame, bboxes)
+        assert np.allclose(referencia[:, 0], lote["brillo"]) and np.allclose(referencia[:, 1], lote["nitidez"], rtol=1e-3)
+
+        t_original = medir(lambda: calidad_por_recorte(frame, bboxes), args.iteraciones) / cantidad
+        t_lote = medir(lambda: evaluar_rostros(frame, bboxes), args.iteraciones) / cantidad
+        t_reducido = medir(lambda: evaluar_rostros(frame, bboxes, escala=0.5), args.iteraciones) / cantidad
+        print(f"{cantidad:>7}  {t_original:>23.1f}  {t_lote:>16.1f}  {t_reducido:>21.1f}  {t_original / t_lote:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
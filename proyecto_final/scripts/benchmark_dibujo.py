@@ -0,0 +1,80 @@
+"""
+Micro-benchmark: dibujar_bbox (una deteccion por llamada) vs dibujar_detecciones_lote
+
+Uso:
+    python scripts/benchmark_dibujo.py --rostros 1 4 8 --iteraciones 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.draw_utils import dibujar_bbox, dibujar_detecciones_lote  # noqa: E402
+
+
+def generar_detecciones(cantidad, ancho=1280, alto=720, semilla=0):
+    """Genera detecciones sinteticas repartidas en el frame"""
+    rng = np.random.default_rng(semilla)
+    detecciones = []
+
+    for i in range(cantidad):
+        w = int(rng.integers(120, 220))
+        h = int(w * 1.15)
+        detecciones.append(
+            {
+                "bbox": {"x": int(rng.integers(0, ancho - w)), "y": int(rng.integers(0, alto - h)), "w": w, "h": h},
+                "nombre": f"Persona {i}",
+                "rol": "Empleado" if i % 2 == 0 else "No autorizado",
+                "confianza": float(rng.uniform(55, 95)) if i % 2 == 0 else 0,
+                "autorizado": i % 2 == 0,
+            }
+        )
+
+    return detecciones
+
+
+def medir(funcion, frame_base, iteraciones):
+    """Tiempo medio por frame en milisegundos (sin contar la copia del frame)"""
+    frame = frame_base.copy()
+    total = 0.0
+
+    for _ in range(iteraciones):
+        np.copyto(frame, frame_base)
+        inicio = time.perf_counter()
+        funcion(frame)
+        total += time.perf_counter() - inicio
+
+    return total / iteraciones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del dibujo de detecciones")
+    parser.add_argument("--rostros", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--iteraciones", type=int, default=500)
+    args = parser.parse_args()
+
+    frame_base = np.random.default_rng(1).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+
+    print(f"{'Rostros':>7}  {'dibujar_bbox (ms)':>18}  {'lote (ms)':>10}  {'Mejora':>7}")
+    for cantidad in args.rostros:
+        detecciones = generar_detecciones(cantidad)
+
+        def por_deteccion(frame):
+            for d in detecciones:
+                dibujar_bbox(frame, d["bbox"], d["nombre"], d["rol"], d["confianza"], d["autorizado"])
+
+        def en_lote(frame):
+            dibujar_detecciones_lote(frame, detecciones)
+
+        t_original = medir(por_deteccion, frame_base, args.iteraciones)
+        t_lote = medir(en_lote, frame_base, args.iteraciones)
+        print(f"{cantidad:>7}  {t_original:>18.3f}  {t_lote:>10.3f}  {t_original / t_lote:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
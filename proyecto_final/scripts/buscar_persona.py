@@ -0,0 +1,65 @@
+"""
+Busca en que momento y camara se vio a una persona
+
+Uso:
+    python scripts/buscar_persona.py foto_sospechoso.jpg --top 20
+    python scripts/buscar_persona.py foto.jpg --indexar grabacion.mp4 --camara 2
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from modules.busqueda import buscar_persona, indexar_grabacion  # noqa: E402
+from modules.embeddings import calcular_embedding  # noqa: E402
+
+
+def parsear_fecha(texto):
+    """Convierte 'YYYY-MM-DD' o 'YYYY-MM-DD HH:MM:SS' a epoch"""
+    formato = "%Y-%m-%d %H:%M:%S" if " " in texto else "%Y-%m-%d"
+    return datetime.strptime(texto, formato).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busqueda retroactiva de una persona en el registro de eventos")
+    parser.add_argument("imagen", help="Foto de la persona a buscar")
+    parser.add_argument("--top", type=int, default=20, help="Cantidad de resultados")
+    parser.add_argument("--umbral", type=float, default=Config.UMBRAL_DISTANCIA, help="Distancia coseno maxima")
+    parser.add_argument("--workers", type=int, default=None, help="Hilos de busqueda")
+    parser.add_argument("--desde", type=parsear_fecha, default=None, help="Fecha minima (YYYY-MM-DD [HH:MM:SS])")
+    parser.add_argument("--hasta", type=parsear_fecha, default=None, help="Fecha maxima (YYYY-MM-DD [HH:MM:SS])")
+    parser.add_argument("--indexar", nargs="*", default=[], help="Grabaciones a reprocesar antes de buscar")
+    parser.add_argument("--camara", type=int, default=-1, help="Camara asignada a las grabaciones indexadas")
+    args = parser.parse_args()
+
+    Config.init_app()
+
+    for ruta_video in args.indexar:
+        print(f"Indexando {ruta_video}...")
+        print(f"  {indexar_grabacion(ruta_video, camara=args.camara)} rostros registrados")
+
+    embedding = calcular_embedding(args.imagen)
+    if embedding is None:
+        print(f"No se pudo calcular el embedding de {args.imagen}")
+        return 1
+
+    resultados = buscar_persona(embedding, umbral_distancia=args.umbral, top_k=args.top, workers=args.workers, desde=args.desde, hasta=args.hasta)
+
+    if not resultados:
+        print("Sin coincidencias")
+        return 0
+
+    print(f"\n{'#':>3}  {'Fecha y hora':<19}  {'Camara':>6}  {'Distancia':>9}  {'Track':>5}  Identidad")
+    for i, r in enumerate(resultados, 1):
+        fecha = datetime.fromtimestamp(r["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{i:>3}  {fecha:<19}  {r['camara']:>6}  {r['distancia']:>9.4f}  {r['track_id']:>5}  {r['identidad'] or '-'}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Calibra el umbral de distancia sobre la galeria registrada en backend/database
+
+Calcula las distancias coseno de todos los pares de fotos (genuinos: misma
+persona; impostores: personas distintas) por bloques, sin construir nunca la
+matriz completa, y acumula histogramas para obtener las curvas FAR/FRR.
+
+Uso:
+    python scripts/calibrar_umbral.py [--modelos Facenet Facenet512] [--far 0.001] [--csv curvas.csv]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from modules.galeria import GaleriaRostros  # noqa: E402
+
+# Histograma de distancias coseno en [0, 2]
+NUM_BINS = 2000
+ANCHO_BIN = 2.0 / NUM_BINS
+
+
+def histogramas_distancias(embeddings, persona_por_fila, tamano_bloque):
+    """
+    Histogramas de distancias genuinas e impostoras sobre todos los pares i < j
+
+    Args:
+        embeddings: Matriz (n, d) float32 normalizada
+        persona_por_fila: Indice de persona por fila
+        tamano_bloque (int): Filas por bloque (memoria ~ tamano_bloque^2 floats)
+
+    Returns:
+        tuple: (conteos_genuinos, conteos_impostores) de largo NUM_BINS
+    """
+    n = len(embeddings)
+    genuinos = np.zeros(NUM_BINS, dtype=np.int64)
+    impostores = np.zeros(NUM_BINS, dtype=np.int64)
+
+    for i0 in range(0, n, tamano_bloque):
+        i1 = min(i0 + tamano_bloque, n)
+        filas = embeddings[i0:i1]
+        personas_filas = persona_por_fila[i0:i1, None]
+
+        for j0 in range(i0, n, tamano_bloque):
+            j1 = min(j0 + tamano_bloque, n)
+
+            distancias = 1.0 - filas @ embeddings[j0:j1].T
+            bins = np.clip((distancias / ANCHO_BIN).astype(np.int64), 0, NUM_BINS - 1)
+            mismas = personas_filas == persona_por_fila[None, j0:j1]
+
+            if j0 == i0:
+                # Bloque diagonal: solo pares i < j
+                superior = np.triu(np.ones(distancias.shape, dtype=bool), k=1)
+                genuinos += np.bincount(bins[mismas & superior], minlength=NUM_BINS)
+                impostores += np.bincount(bins[~mismas & superior], minlength=NUM_BINS)
+            else:
+                genuinos += np.bincount(bins[mismas], minlength=NUM_BINS)
+                impostores += np.bincount(bins[~mismas], minlength=NUM_BINS)
+
+    return genuinos, impostores
+
+
+def curvas_far_frr(genuinos, impostores):
+    """
+    Curvas FAR/FRR aceptando distancias <= umbral
+
+    Args:
+        genuinos: Conteos de distancias genuinas por bin
+        impostores: Conteos de distancias impostoras por bin
+
+    Returns:
+        tuple: (umbrales, far, frr)
+    """
+    umbrales = (np.arange(NUM_BINS) + 1) * ANCHO_BIN
+    far = np.cumsum(impostores) / max(impostores.sum(), 1)
+    frr = 1.0 - np.cumsum(genuinos) / max(genuinos.sum(), 1)
+    return umbrales, far, frr
+
+
+def recomendar_umbral(umbrales, far, frr, far_objetivo):
+    """
+    Umbral recomendado: el mayor con FAR <= objetivo, junto con el punto EER
+
+    Args:
+        umbrales: Umbrales de distancia
+        far: Tasa de falsa aceptacion por umbral
+        frr: Tasa de falso rechazo por umbral
+        far_objetivo (float): FAR maximo aceptado
+
+    Returns:
+        dict: Umbral recomendado y EER
+    """
+    validos = np.nonzero(far <= far_objetivo)[0]
+    idx = validos[-1] if len(validos) else 0
+    idx_eer = int(np.argmin(np.abs(far - frr)))
+
+    return {
+        "umbral": float(umbrales[idx]),
+        "far": float(far[idx]),
+        "frr": float(frr[idx]),
+        "umbral_eer": float(umbrales[idx_eer]),
+        "eer": float((far[idx_eer] + frr[idx_eer]) / 2),
+    }
+
+
+def calibrar_modelo(model_name, args):
+    """
+    Calibra un modelo e imprime el resumen
+
+    Args:
+        model_name (str): Modelo de reconocimiento
+        args: Argumentos de linea de comandos
+
+    Returns:
+        tuple: (umbrales, far, frr) o None si no hay datos suficientes
+    """
+    galeria = GaleriaRostros(model_name=model_name)
+    galeria.precision = "float32"
+    galeria.cargar()
+
+    if len(galeria) < 2 or len(galeria.personas) < 2:
+        print(f"\n{model_name}: se necesitan al menos 2 personas con fotos")
+        return None
+
+    inicio = time.perf_counter()
+    genuinos, impostores = histogramas_distancias(galeria.embeddings, galeria.persona_por_fila, args.bloque)
+    duracion = time.perf_counter() - inicio
+
+    umbrales, far, frr = curvas_far_frr(genuinos, impostores)
+    r = recomendar_umbral(umbrales, far, frr, args.far)
+
+    print(f"\n{'=' * 70}")
+    print(f"Modelo: {model_name} | Fotos: {len(galeria)} | Personas: {len(galeria.personas)}")
+    print(f"Pares genuinos: {genuinos.sum():,} | Pares impostores: {impostores.sum():,} | {duracion:.2f}s")
+
+    if genuinos.sum() == 0:
+        print("⚠️  Ninguna persona tiene 2 fotos: no se puede estimar el FRR")
+
+    print(f"\n{'Umbral':>7}  {'FAR':>9}  {'FRR':>9}")
+    for umbral in args.mostrar:
+        idx = min(int(round(umbral / ANCHO_BIN)) - 1, NUM_BINS - 1)
+        print(f"{umbrales[idx]:>7.3f}  {far[idx] * 100:>8.3f}%  {frr[idx] * 100:>8.3f}%")
+
+    print(f"\nEER: {r['eer'] * 100:.3f}% en distancia {r['umbral_eer']:.3f}")
+    print(f"Recomendado (FAR <= {args.far * 100:g}%): distancia {r['umbral']:.3f} -> FAR {r['far'] * 100:.3f}% | FRR {r['frr'] * 100:.3f}%")
+    print(f"  UMBRAL_DISTANCIA = {r['umbral']:.2f}  (actual: {Config.UMBRAL_DISTANCIA})")
+    print(f"  UMBRAL_CONFIANZA = {(1 - r['umbral']) * 100:.0f}  (actual: {Config.UMBRAL_CONFIANZA})")
+
+    return umbrales, far, frr
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibracion FAR/FRR del umbral de distancia")
+    parser.add_argument("--modelos", nargs="+", default=[Config.MODELO_FACIAL], help="Modelos a calibrar")
+    parser.add_argument("--far", type=float, default=0.001, help="FAR objetivo (fraccion)")
+    parser.add_argument("--bloque", type=int, default=2048, help="Filas por bloque")
+    parser.add_argument("--mostrar", type=float, nargs="+", default=[0.2, 0.3, 0.4, 0.5, 0.6], help="Umbrales a tabular")
+    parser.add_argument("--csv", default=None, help="Archivo CSV con las curvas completas")
+    args = parser.parse_args()
+
+    curvas = {}
+    for model_name in args.modelos:
+        resultado = calibrar_modelo(model_name, args)
+        if resultado is not None:
+            curvas[model_name] = resultado
+
+    if args.csv and curvas:
+        with open(args.csv, "w", encoding="utf-8") as f:
+            f.write("modelo,umbral,far,frr\n")
+            for model_name, (umbrales, far, frr) in curvas.items():
+                for u, a, r in zip(umbrales, far, frr):
+                    f.write(f"{model_name},{u:.4f},{a:.6f},{r:.6f}\n")
+        print(f"\nCurvas guardadas en {args.csv}")
+
+    return 0 if curvas else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,73 +1,12 @@
 import os
+import sys
 from datetime import datetime
 
 import cv2
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def evaluar_calidad_foto(frame, bbox):
-    """
-    Evalúa la calidad de una foto de rostro
-
-    Returns:
-        tuple: (puntuacion, mensaje)
-    """
-    x, y, w, h = bbox
-
-    # Extraer región del rostro
-    rostro = frame[y: y + h, x: x + w]
-
-    # 1. Verificar tamaño (mínimo 150x150)
-    if w < 150 or h < 150:
-        return 0, "Rostro muy pequeño - acércate más"
-
-    if w > 500 or h > 500:
-        return 0, "Rostro muy grande - aléjate un poco"
-
-    # 2. Verificar brillo
-    gray = cv2.cvtColor(rostro, cv2.COLOR_BGR2GRAY)
-    brillo = gray.mean()
-
-    if brillo < 60:
-        return 0, "Muy oscuro - mejora la iluminación"
-    if brillo > 200:
-        return 0, "Muy brillante - reduce la luz"
-
-    # 3. Verificar nitidez (desenfoque)
-    laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-    nitidez = laplacian.var()
-
-    if nitidez < 100:
-        return 0, "Desenfocado - mantén quieta la cámara"
-
-    # 4. Verificar posición (centrado)
-    frame_h, frame_w = frame.shape[:2]
-    centro_x = x + w / 2
-    centro_y = y + h / 2
-
-    if abs(centro_x - frame_w / 2) > frame_w / 4:
-        return 0, "No centrado horizontalmente"
-
-    if abs(centro_y - frame_h / 2) > frame_h / 4:
-        return 0, "No centrado verticalmente"
-
-    # Calcular puntuación (0-100)
-    puntuacion_brillo = max(0, 100 - abs(brillo - 130))
-    puntuacion_nitidez = min(100, (nitidez / 500) * 100)
-    puntuacion_tamano = 100 if 200 <= w <= 400 else 50
-
-    puntuacion = (puntuacion_brillo + puntuacion_nitidez + puntuacion_tamano) / 3
-
-    mensaje = "Calidad: "
-    if puntuacion >= 80:
-        mensaje += "EXCELENTE ✓✓✓"
-    elif puntuacion >= 60:
-        mensaje += "BUENA ✓✓"
-    elif puntuacion >= 40:
-        mensaje += "ACEPTABLE ✓"
-    else:
-        mensaje += "REGULAR"
-
-    return puntuacion, mensaje
+from utils.calidad import evaluar_calidad_foto  # noqa: E402
 
 
 def capturar_dataset_persona():
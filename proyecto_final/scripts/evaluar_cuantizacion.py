@@ -0,0 +1,109 @@
+"""
+Compara la galeria cuantizada (float16 / int8) contra float32 sobre backend/database
+
+Cada foto de la base se usa como consulta contra el resto (leave-one-out) y se
+reporta la concordancia del rank-1 y el error de distancia respecto de float32.
+
+Uso:
+    python scripts/evaluar_cuantizacion.py
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from modules.galeria import GaleriaRostros, calcular_similitudes, cuantizar_embeddings  # noqa: E402
+
+
+def evaluar(base, persona_por_fila, precision, tamano_bloque):
+    """
+    Evalua una precision contra la referencia float32
+
+    Args:
+        base: Matriz (n, d) float32 de la galeria
+        persona_por_fila: Indice de persona por fila
+        precision (str): "float16" o "int8"
+        tamano_bloque (int): Consultas por bloque
+
+    Returns:
+        dict: Metricas de la precision
+    """
+    datos, escalas = cuantizar_embeddings(base, precision)
+    n = len(base)
+
+    misma_foto = 0
+    misma_persona = 0
+    suma_error = 0.0
+    error_maximo = 0.0
+    suma_error_top1 = 0.0
+
+    for inicio in range(0, n, tamano_bloque):
+        fin = min(n, inicio + tamano_bloque)
+        consultas = base[inicio:fin].T
+
+        referencia = base @ consultas
+        cuantizada = calcular_similitudes(datos, escalas, consultas)
+
+        diferencia = np.abs(referencia - cuantizada)
+        suma_error += float(diferencia.sum())
+        error_maximo = max(error_maximo, float(diferencia.max()))
+
+        # Excluir la propia foto de la consulta
+        columnas = np.arange(fin - inicio)
+        referencia[inicio + columnas, columnas] = -np.inf
+        cuantizada[inicio + columnas, columnas] = -np.inf
+
+        top_referencia = np.argmax(referencia, axis=0)
+        top_cuantizada = np.argmax(cuantizada, axis=0)
+
+        misma_foto += int((top_referencia == top_cuantizada).sum())
+        misma_persona += int((persona_por_fila[top_referencia] == persona_por_fila[top_cuantizada]).sum())
+        suma_error_top1 += float(np.abs(referencia[top_referencia, columnas] - cuantizada[top_cuantizada, columnas]).sum())
+
+    return {
+        "precision": precision,
+        "bytes": datos.nbytes + (escalas.nbytes if escalas is not None else 0),
+        "misma_foto": misma_foto / n * 100,
+        "misma_persona": misma_persona / n * 100,
+        "error_medio": suma_error / (n * n),
+        "error_maximo": error_maximo,
+        "error_top1": suma_error_top1 / n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precision de la galeria cuantizada vs float32")
+    parser.add_argument("--bloque", type=int, default=512, help="Consultas por bloque")
+    args = parser.parse_args()
+
+    galeria = GaleriaRostros()
+    galeria.precision = "float32"
+    galeria.cargar()
+
+    if len(galeria) < 2:
+        print("Se necesitan al menos 2 fotos en la base de datos")
+        return 1
+
+    base = galeria.embeddings
+    print(f"\nModelo: {galeria.model_name} | Fotos: {len(base)} | Personas: {len(galeria.personas)} | Dimension: {base.shape[1]}")
+    print(f"float32: {base.nbytes / 1024:.1f} KB (referencia)\n")
+
+    print(f"{'Precision':<9}  {'Memoria':>10}  {'Rank-1 foto':>11}  {'Rank-1 persona':>14}  {'Err. medio':>10}  {'Err. max':>9}  {'Err. top-1':>10}")
+    for precision in ("float16", "int8"):
+        r = evaluar(base, galeria.persona_por_fila, precision, args.bloque)
+        print(
+            f"{r['precision']:<9}  {r['bytes'] / 1024:>7.1f} KB  {r['misma_foto']:>10.2f}%  {r['misma_persona']:>13.2f}%  "
+            f"{r['error_medio']:>10.5f}  {r['error_maximo']:>9.5f}  {r['error_top1']:>10.5f}"
+        )
+
+    print(f"\nLos errores son de distancia coseno; umbral actual: {Config.UMBRAL_DISTANCIA}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Compara la busqueda en dos etapas (prototipos) contra la busqueda completa sobre backend/database
+
+Cada foto de la base se usa como consulta contra el resto (leave-one-out): los
+prototipos de su persona se recalculan sin ella y la foto se excluye de ambas
+busquedas. Se reporta en cuantas consultas la persona del rank-1 completo queda
+entre las candidatas, y la concordancia del rank-1 de foto y de persona.
+
+Uso:
+    python scripts/evaluar_prototipos.py [--prototipos 1 2 4] [--candidatos 3]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from modules.galeria import GaleriaRostros, _kmeans_esferico  # noqa: E402
+
+
+def evaluar(galeria, prototipos_por_persona, candidatos):
+    """
+    Evalua una configuracion de prototipos contra la busqueda completa
+
+    Args:
+        galeria: GaleriaRostros cargada en float32
+        prototipos_por_persona (int): Prototipos por persona
+        candidatos (int): Personas candidatas de la etapa 1
+
+    Returns:
+        dict: Metricas de la configuracion
+    """
+    galeria.prototipos_por_persona = prototipos_por_persona
+    galeria.candidatos = candidatos
+    galeria._construir_prototipos()
+
+    base = galeria.embeddings
+    n = len(base)
+
+    cubiertas = 0
+    misma_foto = 0
+    misma_persona = 0
+    filas_comparadas = 0
+
+    for q in range(n):
+        consulta = base[q]
+        persona_q = galeria.persona_por_fila[q]
+
+        # Referencia: todas las fotos menos la consulta
+        similitudes = base @ consulta
+        similitudes[q] = -np.inf
+        top_completa = int(np.argmax(similitudes))
+
+        # Prototipos de la persona de la consulta recalculados sin ella
+        similitudes_prototipos = galeria.prototipos @ consulta
+        propios = np.flatnonzero(galeria.persona_por_prototipo == persona_q)
+        restantes = galeria.filas_por_persona[persona_q]
+        restantes = restantes[restantes != q]
+
+        if len(restantes) == 0:
+            similitudes_prototipos[propios] = -np.inf
+        else:
+            centros = _kmeans_esferico(base[restantes], prototipos_por_persona)
+            similitudes_prototipos[propios] = -np.inf
+            similitudes_prototipos[propios[: len(centros)]] = centros @ consulta
+
+        candidatas = galeria.personas_candidatas(similitudes_prototipos)
+        filas = np.concatenate([galeria.filas_por_persona[p] for p in candidatas])
+        filas = filas[filas != q]
+        filas_comparadas += len(filas)
+
+        top_prototipos = int(filas[np.argmax(similitudes[filas])]) if len(filas) else -1
+
+        cubiertas += int(galeria.persona_por_fila[top_completa] in candidatas)
+        misma_foto += int(top_prototipos == top_completa)
+        misma_persona += int(top_prototipos >= 0 and galeria.persona_por_fila[top_prototipos] == galeria.persona_por_fila[top_completa])
+
+    return {
+        "prototipos": prototipos_por_persona,
+        "cubiertas": cubiertas / n * 100,
+        "misma_foto": misma_foto / n * 100,
+        "misma_persona": misma_persona / n * 100,
+        "filas": filas_comparadas / n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall de la busqueda por prototipos vs la busqueda completa")
+    parser.add_argument("--prototipos", type=int, nargs="+", default=[1, 2, 4], help="Prototipos por persona a evaluar")
+    parser.add_argument("--candidatos", type=int, default=Config.GALERIA_CANDIDATOS, help="Personas candidatas de la etapa 1")
+    args = parser.parse_args()
+
+    galeria = GaleriaRostros()
+    galeria.precision = "float32"
+    galeria.cargar()
+
+    if len(galeria.personas) <= args.candidatos:
+        print(f"Se necesitan mas de {args.candidatos} personas en la base de datos")
+        return 1
+
+    print(f"\nModelo: {galeria.model_name} | Fotos: {len(galeria)} | Personas: {len(galeria.personas)} | Candidatos: {args.candidatos}\n")
+
+    print(f"{'Prototipos':>10}  {'Persona cubierta':>16}  {'Rank-1 foto':>11}  {'Rank-1 persona':>14}  {'Fotos comparadas':>16}")
+    for prototipos in args.prototipos:
+        r = evaluar(galeria, prototipos, args.candidatos)
+        print(f"{r['prototipos']:>10}  {r['cubiertas']:>15.2f}%  {r['misma_foto']:>10.2f}%  {r['misma_persona']:>13.2f}%  {r['filas']:>16.1f}")
+
+    print(f"\nBusqueda completa: {len(galeria) - 1} fotos comparadas por consulta")
+    print('Usar GALERIA_MODO = "prototipos" solo si el rank-1 de persona es 100% (o la perdida es aceptable)')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
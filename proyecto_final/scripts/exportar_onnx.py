@@ -0,0 +1,59 @@
+"""
+Exporta un modelo de embeddings de DeepFace a ONNX para el backend ONNX Runtime
+
+Requiere tf2onnx (solo para exportar): pip install tf2onnx
+
+Uso:
+    python scripts/exportar_onnx.py --modelo Facenet
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from modules.inferencia_onnx import ruta_modelo_onnx  # noqa: E402
+
+
+def exportar(modelo, ruta_salida, opset):
+    """
+    Convierte el modelo Keras de DeepFace a ONNX
+
+    Args:
+        modelo (str): Nombre del modelo en DeepFace
+        ruta_salida (str): Archivo .onnx destino
+        opset (int): Version de opset ONNX
+    """
+    import tensorflow as tf
+    import tf2onnx
+    from deepface import DeepFace
+
+    cliente = DeepFace.build_model(modelo)
+    # Versiones recientes de DeepFace envuelven el modelo Keras en un cliente
+    keras_model = getattr(cliente, "model", cliente)
+
+    forma = keras_model.input_shape
+    firma = (tf.TensorSpec((None,) + tuple(forma[1:]), tf.float32, name="entrada"),)
+
+    os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
+    tf2onnx.convert.from_keras(keras_model, input_signature=firma, opset=opset, output_path=ruta_salida)
+
+    print(f"✅ {modelo} exportado a {ruta_salida} (entrada {forma[1:]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta un modelo de DeepFace a ONNX")
+    parser.add_argument("--modelo", default=Config.MODELO_FACIAL.replace("-onnx", ""), help="Modelo de DeepFace (p.ej. Facenet)")
+    parser.add_argument("--salida", default=None, help="Archivo .onnx (por defecto models/<modelo>.onnx)")
+    parser.add_argument("--opset", type=int, default=13, help="Version de opset ONNX")
+    args = parser.parse_args()
+
+    exportar(args.modelo, args.salida or ruta_modelo_onnx(args.modelo), args.opset)
+    print(f'Para usarlo: Config.MODELO_FACIAL = "{args.modelo}-onnx"')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Importa en lote fotos y videos de personas a la base de datos
+
+Estructura de entrada:
+    entrada/<persona>/*.jpg|*.png|*.mp4|...   (una carpeta por persona)
+    entrada/<persona>.jpg                     (archivos sueltos: el nombre sale del archivo)
+
+Cada archivo se procesa en paralelo: se detectan los rostros (en videos, cada N
+frames), se puntuan con evaluar_calidad_foto y por persona se eligen los K
+mejores recortes distintos. Se guardan en backend/database/<categoria>/<persona>/
+con el mismo formato que la captura y luego se calculan sus embeddings.
+
+Uso:
+    python scripts/importar_fotos.py carpeta --categoria empleados [--k 10] [--workers 4]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from datasets.capturador import SeleccionFotos, crear_detector_rostros, nombre_archivo_foto, recortar_con_margen  # noqa: E402
+from modules.entrenamiento import entrenar_galeria, formatear_duracion  # noqa: E402
+from modules.galeria import EXTENSIONES_IMAGEN  # noqa: E402
+from utils.calidad import UMBRALES_IMPORTACION, evaluar_calidad_foto  # noqa: E402
+from utils.helpers import extraer_nombre_archivo  # noqa: E402
+
+EXTENSIONES_VIDEO = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# Detector del proceso worker
+_detectar_rostros = None
+
+
+def _inicializar_worker():
+    """Crea el detector una sola vez por proceso worker"""
+    global _detectar_rostros
+    cv2.setNumThreads(1)
+    _detectar_rostros = crear_detector_rostros()
+
+
+def listar_entrada(carpeta):
+    """
+    Agrupa los archivos de entrada por persona
+
+    Args:
+        carpeta (str): Carpeta de entrada
+
+    Returns:
+        dict: persona -> lista de rutas
+    """
+    extensiones = EXTENSIONES_IMAGEN + EXTENSIONES_VIDEO
+    archivos = defaultdict(list)
+
+    for entrada in sorted(os.scandir(carpeta), key=lambda e: e.name):
+        if entrada.is_dir():
+            for archivo in sorted(os.scandir(entrada.path), key=lambda e: e.name):
+                if archivo.is_file() and archivo.name.lower().endswith(extensiones):
+                    archivos[entrada.name].append(archivo.path)
+        elif entrada.is_file() and entrada.name.lower().endswith(extensiones):
+            archivos[extraer_nombre_archivo(entrada.name)].append(entrada.path)
+
+    return archivos
+
+
+def _frames_archivo(ruta, cada_n_frames):
+    """
+    Frames de una imagen o de un video muestreado
+
+    Args:
+        ruta (str): Archivo de imagen o video
+        cada_n_frames (int): Muestreo para videos
+
+    Yields:
+        numpy.ndarray: Frames BGR
+    """
+    if ruta.lower().endswith(EXTENSIONES_IMAGEN):
+        frame = cv2.imread(ruta)
+        if frame is not None:
+            yield frame
+        return
+
+    cap = cv2.VideoCapture(ruta)
+    indice = 0
+    try:
+        while True:
+            if not cap.grab():
+                break
+            if indice % cada_n_frames == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    yield frame
+            indice += 1
+    finally:
+        cap.release()
+
+
+def extraer_candidatos(ruta, cada_n_frames, max_candidatos):
+    """
+    Worker: detecta y puntua los rostros de un archivo
+
+    El rostro se evalua dentro de su propio recorte con margen, asi el criterio de
+    centrado de evaluar_calidad_foto no descarta rostros fuera del centro del video.
+    Se usan los umbrales de importacion: sin tamano maximo de rostro.
+
+    Args:
+        ruta (str): Archivo de imagen o video
+        cada_n_frames (int): Muestreo para videos
+        max_candidatos (int): Mejores recortes que se devuelven por archivo
+
+    Returns:
+        tuple: (ruta, candidatos [(puntuacion, recorte, bbox_en_recorte)], Counter de motivos de descarte)
+    """
+    candidatos = []
+    descartes = Counter()
+    frames = 0
+
+    for frame in _frames_archivo(ruta, cada_n_frames):
+        frames += 1
+        faces = _detectar_rostros(frame)
+
+        if len(faces) == 0:
+            descartes["Sin rostro"] += 1
+            continue
+
+        # Un archivo por persona: se toma el rostro mas grande de cada frame
+        bbox = tuple(int(v) for v in max(faces, key=lambda f: f[2] * f[3]))
+        recorte, bbox_recorte = recortar_con_margen(frame, bbox)
+        puntuacion, mensaje = evaluar_calidad_foto(recorte, bbox_recorte, UMBRALES_IMPORTACION)
+
+        if puntuacion <= 0:
+            descartes[mensaje] += 1
+            continue
+
+        candidatos.append((puntuacion, recorte.copy(), bbox_recorte))
+
+    if frames == 0:
+        descartes["Archivo ilegible"] += 1
+
+    candidatos.sort(key=lambda c: c[0], reverse=True)
+    return ruta, candidatos[:max_candidatos], descartes
+
+
+def elegir_mejores(candidatos, k):
+    """
+    Elige los K mejores recortes distintos (descarta casi duplicados)
+
+    Args:
+        candidatos: Lista de (puntuacion, recorte, bbox_en_recorte)
+        k (int): Cantidad de fotos por persona
+
+    Returns:
+        list: Candidatos elegidos
+    """
+    seleccion = SeleccionFotos(k, intervalo_min=0)
+    elegidos = []
+
+    for puntuacion, recorte, bbox in sorted(candidatos, key=lambda c: c[0], reverse=True):
+        resultado = seleccion.proponer(recorte, bbox, puntuacion)
+        if resultado is not None and resultado[0] == "nueva":
+            elegidos.append((puntuacion, recorte, bbox))
+        if seleccion.completa():
+            break
+
+    return elegidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importacion en lote de fotos y videos a la base de datos")
+    parser.add_argument("entrada", help="Carpeta con una subcarpeta (o archivo) por persona")
+    parser.add_argument("--categoria", required=True, choices=list(Config.ROLES), help="Categoria de las personas")
+    parser.add_argument("--k", type=int, default=10, help="Fotos por persona")
+    parser.add_argument("--minimo", type=float, default=50, help="Puntuacion minima de calidad")
+    parser.add_argument("--cada-n-frames", type=int, default=5, help="Muestreo de frames en videos")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de deteccion (por defecto Config.ENTRENAMIENTO_WORKERS)")
+    parser.add_argument("--sin-embeddings", action="store_true", help="Solo guardar las fotos, sin calcular embeddings")
+    args = parser.parse_args()
+
+    Config.init_app()
+    archivos = listar_entrada(args.entrada)
+    total_archivos = sum(len(rutas) for rutas in archivos.values())
+
+    if not archivos:
+        print("No se encontraron imagenes ni videos")
+        return 1
+
+    print(f"\nPersonas: {len(archivos)} | Archivos: {total_archivos} | Categoria: {args.categoria}\n")
+
+    persona_por_archivo = {ruta: persona for persona, rutas in archivos.items() for ruta in rutas}
+    candidatos = defaultdict(list)
+    descartes = Counter()
+    inicio = time.time()
+
+    workers = args.workers or Config.ENTRENAMIENTO_WORKERS
+    contexto = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto, initializer=_inicializar_worker) as executor:
+        futuros = [executor.submit(extraer_candidatos, ruta, args.cada_n_frames, args.k * 4) for ruta in persona_por_archivo]
+
+        for hechos, futuro in enumerate(as_completed(futuros), start=1):
+            ruta, encontrados, motivos = futuro.result()
+            candidatos[persona_por_archivo[ruta]].extend(c for c in encontrados if c[0] >= args.minimo)
+            descartes.update(motivos)
+
+            velocidad = hechos / max(time.time() - inicio, 1e-9)
+            eta = (total_archivos - hechos) / velocidad
+            print(f"\r  Deteccion: {hechos}/{total_archivos} archivos - ETA {formatear_duracion(eta)}   ", end="", flush=True)
+
+    print("\n")
+
+    fotos_guardadas = 0
+    incompletas = []
+
+    for persona in sorted(archivos):
+        elegidos = elegir_mejores(candidatos[persona], args.k)
+
+        carpeta_destino = os.path.join(Config.DATABASE_DIR, args.categoria, persona)
+        os.makedirs(carpeta_destino, exist_ok=True)
+
+        for _, recorte, _ in elegidos:
+            cv2.imwrite(os.path.join(carpeta_destino, nombre_archivo_foto(persona)), recorte)
+
+        fotos_guardadas += len(elegidos)
+        if len(elegidos) < args.k:
+            incompletas.append((persona, len(elegidos)))
+
+        calidad = f" - calidad media {sum(c[0] for c in elegidos) / len(elegidos):.0f}" if elegidos else ""
+        print(f"  {persona}: {len(elegidos)}/{args.k} fotos{calidad}")
+
+    print(f"\nFotos guardadas: {fotos_guardadas} en {formatear_duracion(time.time() - inicio)}")
+
+    if descartes:
+        print("\nRecortes descartados:")
+        for motivo, cantidad in descartes.most_common():
+            print(f"  - {motivo}: {cantidad}")
+
+    if incompletas:
+        print(f"\n⚠️  {len(incompletas)} persona(s) con menos de {args.k} fotos: {', '.join(p for p, _ in incompletas[:10])}")
+
+    if fotos_guardadas and not args.sin_embeddings:
+        print("\nCalculando embeddings...")
+        resumen = entrenar_galeria(workers=workers)
+        print(f"Embeddings calculados: {resumen['procesadas']} | Errores: {resumen['errores']}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Indexa la base de datos de rostros: duplicados exactos, casi duplicados y archivos ilegibles
+
+La primera corrida lee todas las fotos; las siguientes solo las nuevas o
+modificadas (el indice queda en backend/database/indice_imagenes.npz).
+Sin --podar solo informa. Con --podar mueve los ilegibles y los casi duplicados
+de cada persona a Config.INDICE_PODADAS_DIR; los duplicados exactos entre
+personas distintas solo se informan, porque indican una foto mal clasificada.
+
+Uso:
+    python scripts/indexar_database.py [--distancia 6] [--workers 8] [--podar]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from modules.indice_database import IndiceDatabase  # noqa: E402
+
+
+def relativa(ruta):
+    """Ruta relativa a la base de datos, para imprimir"""
+    return os.path.relpath(ruta, Config.DATABASE_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indice de integridad y duplicados de la base de datos")
+    parser.add_argument("--distancia", type=int, default=Config.INDICE_DISTANCIA_HAMMING, help="Distancia de Hamming maxima (dHash de 64 bits)")
+    parser.add_argument("--workers", type=int, default=None, help="Hilos de lectura")
+    parser.add_argument("--mostrar", type=int, default=10, help="Ejemplos por seccion")
+    parser.add_argument("--podar", action="store_true", help="Mover ilegibles y casi duplicados fuera de la base de datos")
+    args = parser.parse_args()
+
+    inicio = time.time()
+    indice = IndiceDatabase()
+    resumen = indice.actualizar(args.workers)
+
+    print(
+        f"\nFotos: {resumen['total']} | Reutilizadas del indice: {resumen['reutilizadas']} | "
+        f"Analizadas: {resumen['analizadas']} | Eliminadas del indice: {resumen['eliminadas']} | {time.time() - inicio:.1f}s"
+    )
+
+    ilegibles = indice.ilegibles()
+    exactos = indice.duplicados_exactos()
+    casi = indice.casi_duplicados(args.distancia)
+    entre_personas = [grupo for grupo in exactos if len({os.path.dirname(r) for r in grupo}) > 1]
+
+    print(f"\nIlegibles: {len(ilegibles)}")
+    for ruta in ilegibles[: args.mostrar]:
+        print(f"  - {relativa(ruta)}")
+
+    print(f"\nGrupos de duplicados exactos: {len(exactos)} ({sum(len(g) - 1 for g in exactos)} copias sobrantes)")
+    for grupo in exactos[: args.mostrar]:
+        print(f"  - {relativa(grupo[0])} = {', '.join(relativa(r) for r in grupo[1:])}")
+
+    if entre_personas:
+        print(f"\n⚠️  {len(entre_personas)} foto(s) repetidas en personas distintas (revisar a mano, no se podan):")
+        for grupo in entre_personas[: args.mostrar]:
+            print(f"  - {', '.join(relativa(r) for r in grupo)}")
+
+    print(f"\nCasi duplicados dentro de una persona (distancia <= {args.distancia}): {len(casi)}")
+    for ruta, conservada, distancia in casi[: args.mostrar]:
+        print(f"  - {relativa(ruta)} ~ {relativa(conservada)} (distancia {distancia})")
+
+    if not args.podar:
+        if ilegibles or casi:
+            print(f"\nUsar --podar para mover {len(ilegibles) + len(casi)} foto(s) a {Config.INDICE_PODADAS_DIR}")
+        return 0
+
+    movidas = indice.podar(ilegibles + [ruta for ruta, _, _ in casi])
+    print(f"\nFotos podadas: {movidas} -> {Config.INDICE_PODADAS_DIR}")
+    print("La galeria las descarta del cache de embeddings en la proxima carga")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Verifica que el backend ONNX Runtime produzca los mismos embeddings que DeepFace
+
+Cada imagen pasa por el camino completo de calcular_embedding (deteccion y
+alineacion con el detector configurado, luego el modelo) con ambos backends y se
+compara la similitud coseno de los embeddings. Termina con codigo 1 si alguna
+imagen queda por debajo de la tolerancia.
+
+Uso:
+    python scripts/verificar_paridad_onnx.py [--imagenes carpeta] [--max 50] [--detector opencv]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from modules.embeddings import calcular_embedding  # noqa: E402
+from modules.galeria import EXTENSIONES_IMAGEN, listar_imagenes_database  # noqa: E402
+
+
+def listar_imagenes(carpeta, maximo):
+    """
+    Lista las imagenes de prueba
+
+    Args:
+        carpeta (str): Carpeta con imagenes, o None para usar backend/database
+        maximo (int): Cantidad maxima de imagenes
+
+    Returns:
+        list: Rutas de imagenes
+    """
+    if carpeta:
+        rutas = sorted(
+            os.path.join(carpeta, nombre) for nombre in os.listdir(carpeta) if nombre.lower().endswith(EXTENSIONES_IMAGEN)
+        )
+    else:
+        rutas = [ruta for ruta, _, _, _ in listar_imagenes_database(Config.DATABASE_DIR)]
+
+    return rutas[:maximo]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridad de embeddings ONNX Runtime vs DeepFace")
+    parser.add_argument("--modelo", default=Config.MODELO_FACIAL.replace("-onnx", ""), help="Modelo de DeepFace (p.ej. Facenet)")
+    parser.add_argument("--imagenes", default=None, help="Carpeta de imagenes de rostros (por defecto backend/database)")
+    parser.add_argument("--detector", default=Config.DETECTOR_BACKEND, help="Detector usado por ambos backends")
+    parser.add_argument("--max", type=int, default=50, help="Cantidad maxima de imagenes")
+    parser.add_argument("--tolerancia", type=float, default=0.999, help="Similitud coseno minima aceptada")
+    args = parser.parse_args()
+
+    rutas = listar_imagenes(args.imagenes, args.max)
+    if not rutas:
+        print("No hay imagenes para comparar")
+        return 1
+
+    similitudes = []
+    tiempo_deepface = 0.0
+    tiempo_onnx = 0.0
+
+    for ruta in rutas:
+        inicio = time.perf_counter()
+        a = calcular_embedding(ruta, args.modelo, args.detector, lanzar_errores=True)
+        tiempo_deepface += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        b = calcular_embedding(ruta, f"{args.modelo}-onnx", args.detector, lanzar_errores=True)
+        tiempo_onnx += time.perf_counter() - inicio
+
+        if a is None or b is None:
+            print(f"⚠️  Sin embedding para {os.path.basename(ruta)} (DeepFace: {a is not None}, ONNX: {b is not None})")
+            continue
+
+        similitud = float(np.dot(a, b))
+        similitudes.append(similitud)
+
+        if similitud < args.tolerancia:
+            print(f"❌ {os.path.basename(ruta)}: similitud {similitud:.6f}")
+
+    if not similitudes:
+        print("No se pudo comparar ninguna imagen")
+        return 1
+
+    similitudes = np.array(similitudes)
+    n = len(similitudes)
+    print(f"\nModelo: {args.modelo} | Detector: {args.detector} | Imagenes: {n}")
+    print(f"Similitud coseno: min {similitudes.min():.6f} | media {similitudes.mean():.6f}")
+    print(f"Tiempo medio: DeepFace {tiempo_deepface / n * 1000:.1f} ms | ONNX {tiempo_onnx / n * 1000:.1f} ms")
+
+    if similitudes.min() < args.tolerancia:
+        print(f"\n❌ Paridad fallida (tolerancia {args.tolerancia})")
+        return 1
+
+    print("\n✅ Paridad OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
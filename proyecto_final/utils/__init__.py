@@ -1,7 +1,14 @@
 """
 Utilidades del sistema de reconocimiento facial
 """
-from .draw_utils import dibujar_bbox, dibujar_menu_seleccion, mostrar_mensaje_centro
+from .calidad import evaluar_calidad_foto, evaluar_rostros
+from .draw_utils import (
+    dibujar_bbox,
+    dibujar_detecciones_lote,
+    dibujar_menu_seleccion,
+    mostrar_mensaje_centro,
+    renderizar_menu,
+)
 from .file_utils import guardar_frame_temporal, limpiar_archivos_temporales
 from .helpers import (
     debe_generar_alerta,
@@ -22,6 +29,10 @@ __all__ = [
     'guardar_frame_temporal',
     'limpiar_archivos_temporales',
     'dibujar_bbox',
+    'dibujar_detecciones_lote',
     'dibujar_menu_seleccion',
-    'mostrar_mensaje_centro'
+    'mostrar_mensaje_centro',
+    'renderizar_menu',
+    'evaluar_calidad_foto',
+    'evaluar_rostros'
 ]
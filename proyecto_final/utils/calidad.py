@@ -0,0 +1,178 @@
+"""
+Motor de calidad de rostros: tamano, brillo y nitidez de muchos recortes por llamada
+
+Cada recorte se mide con primitivas de OpenCV (Laplaciano float32 y meanStdDev)
+y la puntuacion, los umbrales y los motivos de rechazo se calculan vectorizados
+para todos los rostros a la vez. Lo usan la captura, la importacion, el filtro
+de calidad en vivo del reconocimiento y la deduplicacion de desconocidos.
+"""
+
+import cv2
+import numpy as np
+
+# Umbrales de la captura de dataset (los de evaluar_calidad_foto)
+UMBRALES_CAPTURA = {
+    "lado_min": 150,
+    "lado_max": 500,
+    "brillo_min": 60,
+    "brillo_max": 200,
+    "nitidez_min": 100,
+}
+
+# Importacion en lote: fotos de credencial o de alta resolucion tienen rostros de mas de 500 px
+UMBRALES_IMPORTACION = {**UMBRALES_CAPTURA, "lado_max": None}
+
+MOTIVOS = {
+    "pequeno": "Rostro muy pequeno - acercate mas",
+    "grande": "Rostro muy grande - alejate un poco",
+    "oscuro": "Muy oscuro - mejora la iluminacion",
+    "brillante": "Muy brillante - reduce la luz",
+    "desenfocado": "Desenfocado - manten quieta la camara",
+    "centrado_x": "No centrado horizontalmente",
+    "centrado_y": "No centrado verticalmente",
+}
+
+
+def puntuar_calidad(brillo, nitidez, ancho):
+    """
+    Puntuacion de calidad (0-100) a partir de brillo, nitidez y tamano
+
+    Acepta escalares o arrays de numpy (un valor por rostro).
+
+    Args:
+        brillo: Brillo medio en gris
+        nitidez: Varianza del Laplaciano
+        ancho: Ancho del rostro en pixeles
+
+    Returns:
+        tuple: (puntuacion, puntuacion_brillo, puntuacion_nitidez, puntuacion_tamano)
+    """
+    puntuacion_brillo = np.maximum(0, 100 - np.abs(brillo - 130))
+    puntuacion_nitidez = np.minimum(100, (nitidez / 500) * 100)
+    puntuacion_tamano = np.where((ancho >= 200) & (ancho <= 400), 100, 50)
+
+    puntuacion = (puntuacion_brillo + puntuacion_nitidez + puntuacion_tamano) / 3
+    return puntuacion, puntuacion_brillo, puntuacion_nitidez, puntuacion_tamano
+
+
+def evaluar_rostros(frame, bboxes, umbrales=None, verificar_centrado=True, escala=1.0, gray=None):
+    """
+    Evalua la calidad de varios rostros de un frame en una sola llamada
+
+    Args:
+        frame: Frame BGR de OpenCV
+        bboxes: Lista o array (n, 4) de cajas (x, y, w, h) en coordenadas del frame
+        umbrales (dict): lado_min, lado_max, brillo_min, brillo_max, nitidez_min
+            (por defecto UMBRALES_CAPTURA; None en un valor lo desactiva)
+        verificar_centrado (bool): Rechazar rostros lejos del centro del frame
+        escala (float): Factor para reducir cada recorte antes de medir (1.0 = sin reducir).
+            Reducir abarata el Laplaciano pero sube la varianza medida: los umbrales
+            de nitidez estan pensados para escala 1
+        gray: Gris del frame ya calculado (opcional, se reutiliza tal cual)
+
+    Returns:
+        dict: Arrays por rostro: ancho, alto, brillo, nitidez, puntuacion,
+            puntuacion_brillo, puntuacion_nitidez, puntuacion_tamano, aceptado,
+            y la lista "motivo" (clave de MOTIVOS o None si se acepta)
+    """
+    umbrales = {**UMBRALES_CAPTURA, **(umbrales or {})}
+    bboxes = np.asarray(bboxes, dtype=np.int64).reshape(-1, 4)
+    alto_frame, ancho_frame = frame.shape[:2]
+
+    x0 = np.clip(bboxes[:, 0], 0, ancho_frame)
+    y0 = np.clip(bboxes[:, 1], 0, alto_frame)
+    x1 = np.clip(bboxes[:, 0] + bboxes[:, 2], 0, ancho_frame)
+    y1 = np.clip(bboxes[:, 1] + bboxes[:, 3], 0, alto_frame)
+    ancho, alto = x1 - x0, y1 - y0
+
+    brillo = np.zeros(len(bboxes))
+    nitidez = np.zeros(len(bboxes))
+    validos = (ancho > 0) & (alto > 0)
+
+    for i in np.flatnonzero(validos):
+        if gray is not None:
+            recorte = gray[y0[i] : y1[i], x0[i] : x1[i]]
+        else:
+            recorte = cv2.cvtColor(frame[y0[i] : y1[i], x0[i] : x1[i]], cv2.COLOR_BGR2GRAY)
+
+        if escala != 1.0:
+            recorte = cv2.resize(recorte, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+
+        # Laplaciano float32 y meanStdDev de OpenCV: sin la copia float64 ni el var() de numpy
+        _, desvio = cv2.meanStdDev(cv2.Laplacian(recorte, cv2.CV_32F))
+        brillo[i] = cv2.mean(recorte)[0]
+        nitidez[i] = desvio[0, 0] ** 2
+
+    puntuacion, puntuacion_brillo, puntuacion_nitidez, puntuacion_tamano = puntuar_calidad(brillo, nitidez, ancho)
+
+    # Motivo de rechazo: el primero que falla, en el mismo orden que evaluar_calidad_foto
+    lado_min = np.minimum(ancho, alto)
+    lado_max = np.maximum(ancho, alto)
+    centro_x = (x0 + x1) / 2
+    centro_y = (y0 + y1) / 2
+
+    condiciones = [
+        ("pequeno", lado_min, umbrales["lado_min"], np.less),
+        ("grande", lado_max, umbrales["lado_max"], np.greater),
+        ("oscuro", brillo, umbrales["brillo_min"], np.less),
+        ("brillante", brillo, umbrales["brillo_max"], np.greater),
+        ("desenfocado", nitidez, umbrales["nitidez_min"], np.less),
+    ]
+    if verificar_centrado:
+        condiciones += [
+            ("centrado_x", np.abs(centro_x - ancho_frame / 2), ancho_frame / 4, np.greater),
+            ("centrado_y", np.abs(centro_y - alto_frame / 2), alto_frame / 4, np.greater),
+        ]
+
+    motivo = [None if v else "pequeno" for v in validos]
+    for clave, valores, limite, fuera_de_rango in condiciones:
+        if limite is None:
+            continue
+        for i in np.flatnonzero(fuera_de_rango(valores, limite)):
+            if motivo[i] is None:
+                motivo[i] = clave
+
+    return {
+        "ancho": ancho,
+        "alto": alto,
+        "brillo": brillo,
+        "nitidez": nitidez,
+        "puntuacion": puntuacion,
+        "puntuacion_brillo": puntuacion_brillo,
+        "puntuacion_nitidez": puntuacion_nitidez,
+        "puntuacion_tamano": puntuacion_tamano,
+        "aceptado": np.array([m is None for m in motivo], dtype=bool),
+        "motivo": motivo,
+    }
+
+
+def evaluar_calidad_foto(frame, bbox, umbrales=None):
+    """
+    Evalua la calidad de una foto de rostro
+
+    Args:
+        frame: Frame de OpenCV
+        bbox: Tupla (x, y, w, h)
+        umbrales (dict): Umbrales de evaluar_rostros (por defecto UMBRALES_CAPTURA)
+
+    Returns:
+        tuple: (puntuacion, mensaje)
+    """
+    resultado = evaluar_rostros(frame, [bbox], umbrales=umbrales)
+
+    if not resultado["aceptado"][0]:
+        return 0, MOTIVOS[resultado["motivo"][0]]
+
+    puntuacion = float(resultado["puntuacion"][0])
+
+    mensaje = "Calidad: "
+    if puntuacion >= 80:
+        mensaje += "EXCELENTE"
+    elif puntuacion >= 60:
+        mensaje += "BUENA"
+    elif puntuacion >= 40:
+        mensaje += "ACEPTABLE"
+    else:
+        mensaje += "REGULAR"
+
+    return puntuacion, mensaje
@@ -0,0 +1,104 @@
+"""
+Deduplicacion de rostros desconocidos por similitud de embeddings
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from config import Config
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+
+class DeduplicadorDesconocidos:
+    """
+    Cache rotativo de desconocidos guardados recientemente
+
+    Cada entrada representa a una persona desconocida dentro de una ventana de
+    tiempo. Solo se guarda un recorte por entrada y se reemplaza unicamente si
+    llega uno de mejor calidad.
+    """
+
+    def __init__(self, umbral_distancia=None, ventana_segundos=None, max_entradas=None):
+        """
+        Inicializa el deduplicador
+
+        Args:
+            umbral_distancia (float): Distancia coseno maxima para considerar la misma persona
+            ventana_segundos (float): Duracion de la ventana de cada entrada
+            max_entradas (int): Tamano maximo del cache
+        """
+        self.umbral_distancia = umbral_distancia if umbral_distancia is not None else Config.DEDUP_UMBRAL_DISTANCIA
+        self.ventana_segundos = ventana_segundos if ventana_segundos is not None else Config.DEDUP_VENTANA_SEGUNDOS
+        self.max_entradas = max_entradas if max_entradas is not None else Config.DEDUP_MAX_ENTRADAS
+
+        self.entradas = []
+        self._matriz = None
+
+    def reiniciar(self):
+        """Vacia el cache"""
+        self.entradas = []
+        self._matriz = None
+
+    def _reconstruir_matriz(self):
+        """Apila los embeddings del cache para compararlos en una sola operacion"""
+        if self.entradas:
+            self._matriz = np.stack([e["embedding"] for e in self.entradas])
+        else:
+            self._matriz = None
+
+    def _purgar(self, ahora):
+        """Elimina las entradas cuya ventana ya vencio"""
+        vigentes = [e for e in self.entradas if ahora - e["creado"] <= self.ventana_segundos]
+
+        if len(vigentes) != len(self.entradas):
+            self.entradas = vigentes
+            self._reconstruir_matriz()
+
+    def registrar(self, embedding, calidad, ahora=None):
+        """
+        Registra un desconocido y decide si hay que escribir su recorte
+
+        Args:
+            embedding: Vector L2-normalizado del rostro (o None)
+            calidad (float): Calidad del recorte
+            ahora (float): Timestamp actual (por defecto time.time())
+
+        Returns:
+            tuple: (accion, entrada) donde accion es "nuevo", "reemplazar" o None
+        """
+        if ahora is None:
+            ahora = time.time()
+
+        self._purgar(ahora)
+
+        if embedding is not None and self._matriz is not None:
+            similitudes = self._matriz @ embedding
+            idx = int(np.argmax(similitudes))
+
+            if 1.0 - similitudes[idx] <= self.umbral_distancia:
+                entrada = self.entradas[idx]
+                entrada["ultimo_visto"] = ahora
+                entrada["apariciones"] += 1
+
+                if calidad > entrada["calidad"]:
+                    entrada["calidad"] = calidad
+                    return "reemplazar", entrada
+
+                return None, entrada
+
+        entrada = {"embedding": embedding, "calidad": calidad, "creado": ahora, "ultimo_visto": ahora, "apariciones": 1, "ruta": None}
+
+        # Sin embedding no se puede comparar: se guarda pero no entra al cache
+        if embedding is None:
+            return "nuevo", entrada
+
+        if len(self.entradas) >= self.max_entradas:
+            self.entradas.pop(0)
+
+        self.entradas.append(entrada)
+        self._reconstruir_matriz()
+
+        return "nuevo", entrada
@@ -2,7 +2,12 @@
 Utilidades para dibujar en frames de OpenCV
 """
 
+from functools import lru_cache
+
 import cv2
+import numpy as np
+
+from .overlay import oscurecer_region
 
 
 def dibujar_bbox(frame, bbox, nombre, rol, confianza, autorizado):
@@ -82,6 +87,181 @@ def dibujar_bbox(frame, bbox, nombre, rol, confianza, autorizado):
     return frame
 
 
+# Colores por estado de autorizacion: (trazo, fondo del panel)
+COLORES_AUTORIZACION = {True: ((0, 255, 0), (0, 200, 0)), False: ((0, 0, 255), (0, 0, 200))}
+
+
+@lru_cache(maxsize=512)
+def tamano_texto(texto, escala, grosor):
+    """
+    cv2.getTextSize cacheado
+
+    Returns:
+        tuple: ((ancho, alto), linea_base)
+    """
+    return cv2.getTextSize(texto, cv2.FONT_HERSHEY_SIMPLEX, escala, grosor)
+
+
+@lru_cache(maxsize=256)
+def _sprite_panel(nombre, rol, texto_confianza, autorizado):
+    """
+    Panel de informacion de una deteccion pre-renderizado
+
+    Se cachea por (nombre, rol, confianza redondeada, autorizado), que cambian
+    con mucha menos frecuencia que los frames.
+
+    Returns:
+        tuple: (imagen BGR del panel, mascara uint8)
+    """
+    color, color_fondo = COLORES_AUTORIZACION[autorizado]
+    (w_texto, _), _ = tamano_texto(nombre, 0.7, 2)
+    ancho = max(w_texto + 20, 200)
+
+    # El borde de grosor 2 sobresale 1 px del rectangulo: el sprite tiene ese margen
+    panel = np.empty((78, ancho + 3, 3), dtype=np.uint8)
+    panel[:] = color_fondo
+    cv2.rectangle(panel, (1, 1), (ancho + 1, 76), color, 2)
+
+    cv2.putText(panel, nombre, (11, 26), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    cv2.putText(panel, rol, (11, 51), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (230, 230, 230), 1)
+    cv2.putText(panel, texto_confianza, (11, 71), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (230, 230, 230), 1)
+
+    # Mascara: el relleno mas el borde (sus esquinas redondeadas no cubren el fondo)
+    mascara = np.zeros(panel.shape[:2], dtype=np.uint8)
+    cv2.rectangle(mascara, (1, 1), (ancho + 1, 76), 255, -1)
+    cv2.rectangle(mascara, (1, 1), (ancho + 1, 76), 255, 2)
+    panel.flags.writeable = False
+    mascara.flags.writeable = False
+    return panel, mascara
+
+
+@lru_cache(maxsize=2)
+def _sprite_icono(autorizado):
+    """
+    Icono de estado (OK / X) pre-renderizado con su mascara
+
+    Returns:
+        tuple: (imagen BGR 41x41, mascara uint8 41x41)
+    """
+    icono = np.zeros((41, 41, 3), dtype=np.uint8)
+    mascara = np.zeros((41, 41), dtype=np.uint8)
+    centro = (20, 20)
+
+    if autorizado:
+        cv2.circle(icono, centro, 20, (0, 255, 0), -1)
+        cv2.circle(mascara, centro, 20, 255, -1)
+        cv2.putText(icono, "OK", (centro[0] - 15, centro[1] + 8), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
+    else:
+        cv2.circle(icono, centro, 20, (0, 0, 255), -1)
+        cv2.circle(mascara, centro, 20, 255, -1)
+        cv2.line(icono, (centro[0] - 10, centro[1] - 10), (centro[0] + 10, centro[1] + 10), (255, 255, 255), 3)
+        cv2.line(icono, (centro[0] + 10, centro[1] - 10), (centro[0] - 10, centro[1] + 10), (255, 255, 255), 3)
+
+    icono.flags.writeable = False
+    mascara.flags.writeable = False
+    return icono, mascara
+
+
+def _pegar_sprite(frame, sprite, x, y, mascara=None):
+    """
+    Copia un sprite en (x, y) recortandolo a los limites del frame
+
+    Args:
+        frame: Frame de OpenCV (se modifica)
+        sprite: Imagen BGR
+        x, y: Esquina superior izquierda
+        mascara: Mascara uint8 opcional (h, w)
+    """
+    altura, ancho = frame.shape[:2]
+    alto_sprite, ancho_sprite = sprite.shape[:2]
+
+    sx0, sy0 = max(0, -x), max(0, -y)
+    sx1, sy1 = min(ancho_sprite, ancho - x), min(alto_sprite, altura - y)
+
+    if sx0 >= sx1 or sy0 >= sy1:
+        return
+
+    region = frame[y + sy0: y + sy1, x + sx0: x + sx1]
+
+    if mascara is None:
+        region[:] = sprite[sy0:sy1, sx0:sx1]
+    else:
+        cv2.copyTo(sprite[sy0:sy1, sx0:sx1], mascara[sy0:sy1, sx0:sx1], region)
+
+
+def dibujar_detecciones_lote(frame, detecciones):
+    """
+    Dibuja todas las detecciones de un frame en pocas pasadas
+
+    Los rectangulos y esquinas de un mismo color se dibujan con una sola llamada
+    a cv2.polylines; paneles e iconos son sprites cacheados. Sin solapamientos
+    el resultado es identico a llamar a dibujar_bbox por cada deteccion (con
+    solapamientos los paneles quedan siempre por encima de los rectangulos).
+
+    Args:
+        frame: Frame de OpenCV
+        detecciones: Lista de detecciones (bbox, nombre, rol, confianza, autorizado)
+
+    Returns:
+        frame: Frame con las detecciones dibujadas
+    """
+    if not detecciones:
+        return frame
+
+    cajas = {True: [], False: []}
+    esquinas = {True: [], False: []}
+    longitud = 20
+
+    for det in detecciones:
+        bbox = det["bbox"]
+        x, y, w, h = int(bbox["x"]), int(bbox["y"]), int(bbox["w"]), int(bbox["h"])
+        autorizado = bool(det["autorizado"])
+        x1, y1 = x + w, y + h
+
+        cajas[autorizado].append(np.array([(x, y), (x1, y), (x1, y1), (x, y1)], dtype=np.int32))
+        esquinas[autorizado].extend(
+            np.array(
+                [
+                    ((x, y), (x + longitud, y)),
+                    ((x, y), (x, y + longitud)),
+                    ((x1, y), (x1 - longitud, y)),
+                    ((x1, y), (x1, y + longitud)),
+                    ((x, y1), (x + longitud, y1)),
+                    ((x, y1), (x, y1 - longitud)),
+                    ((x1, y1), (x1 - longitud, y1)),
+                    ((x1, y1), (x1, y1 - longitud)),
+                ],
+                dtype=np.int32,
+            )
+        )
+
+    # Una llamada por color para rectangulos y otra para esquinas
+    for autorizado, color in ((True, COLORES_AUTORIZACION[True][0]), (False, COLORES_AUTORIZACION[False][0])):
+        if cajas[autorizado]:
+            cv2.polylines(frame, cajas[autorizado], True, color, 3)
+            cv2.polylines(frame, esquinas[autorizado], False, color, 4)
+
+    # Paneles e iconos (sprites cacheados)
+    for det in detecciones:
+        bbox = det["bbox"]
+        x, y, w, h = int(bbox["x"]), int(bbox["y"]), int(bbox["w"]), int(bbox["h"])
+        autorizado = bool(det["autorizado"])
+        confianza = det["confianza"]
+
+        texto_confianza = f"{confianza:.0f}%" if confianza > 0 else "N/A"
+        panel, mascara_panel = _sprite_panel(f"{det['nombre']}", f"{det['rol']}", texto_confianza, autorizado)
+
+        y_panel = y - 80
+        if y_panel < 0:
+            y_panel = y + h + 10
+        _pegar_sprite(frame, panel, x - 1, y_panel - 1, mascara_panel)
+
+        icono, mascara = _sprite_icono(autorizado)
+        _pegar_sprite(frame, icono, x + w - 50, y + 10, mascara)
+
+    return frame
+
+
 def dibujar_menu_seleccion(frame, opciones, seleccion, titulo="MENU"):
     """
     Dibuja un menu de seleccion en el frame
@@ -131,6 +311,31 @@ def dibujar_menu_seleccion(frame, opciones, seleccion, titulo="MENU"):
     return frame
 
 
+@lru_cache(maxsize=32)
+def renderizar_menu(opciones, seleccion, titulo="MENU", alto=720, ancho=1280):
+    """
+    Renderiza un menu completo sobre fondo blanco y lo cachea por estado
+
+    Cada combinacion (opciones, seleccion, titulo) se dibuja una sola vez;
+    las siguientes llamadas devuelven el mismo frame (de solo lectura).
+
+    Args:
+        opciones: Tupla de strings con las opciones
+        seleccion: Indice de la opcion seleccionada
+        titulo: Titulo del menu
+        alto (int): Alto del frame
+        ancho (int): Ancho del frame
+
+    Returns:
+        frame: Frame del menu (no modificar)
+    """
+    frame = np.full((alto, ancho, 3), 255, dtype=np.uint8)
+    frame = dibujar_menu_seleccion(frame, list(opciones), seleccion, titulo)
+    frame.flags.writeable = False
+
+    return frame
+
+
 def mostrar_mensaje_centro(frame, mensaje, color=(255, 255, 255)):
     """
     Muestra un mensaje en el centro del frame
@@ -145,10 +350,8 @@ def mostrar_mensaje_centro(frame, mensaje, color=(255, 255, 255)):
     """
     altura, ancho = frame.shape[:2]
 
-    # Fondo semi-transparente
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (0, altura // 2 - 60), (ancho, altura // 2 + 60), (0, 0, 0), -1)
-    cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
+    # Fondo semi-transparente (solo la franja, sin copiar el frame)
+    oscurecer_region(frame, 0, altura // 2 - 60, ancho, altura // 2 + 60, 0.3)
 
     # Texto
     (w_texto, h_texto), _ = cv2.getTextSize(mensaje, cv2.FONT_HERSHEY_SIMPLEX, 1.2, 2)
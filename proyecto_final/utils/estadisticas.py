@@ -0,0 +1,114 @@
+"""
+Estadisticas de sesion con memoria acotada
+"""
+
+import os
+import sys
+from collections import Counter, deque
+
+from config import Config
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+# Campos pesados que no se conservan en el historial (recortes y vectores)
+CAMPOS_EXCLUIDOS = ("rostro_img", "embedding")
+
+
+class EstadisticasSesion:
+    """
+    Contadores incrementales de la sesion mas un historial circular de tamano fijo
+
+    Los contadores se actualizan en O(1) por deteccion y el historial no guarda
+    datos de pixeles, por lo que la memoria se mantiene constante en sesiones largas.
+    """
+
+    def __init__(self, max_recientes=None):
+        """
+        Inicializa las estadisticas
+
+        Args:
+            max_recientes (int): Cantidad de detecciones/alertas recientes a conservar
+        """
+        self.max_recientes = max_recientes or Config.HISTORIAL_SESION_MAX
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Pone todos los contadores en cero"""
+        self.total_detecciones = 0
+        self.total_alertas = 0
+        self.por_persona = Counter()
+        self.por_rol = Counter()
+        self.por_nivel_alerta = Counter()
+        self.detecciones_recientes = deque(maxlen=self.max_recientes)
+        self.alertas_recientes = deque(maxlen=self.max_recientes)
+
+        # Latencia captura -> resultado y frames/resultados descartados por viejos
+        self.latencias_ms = deque(maxlen=self.max_recientes)
+        self.latencia_max_ms = 0.0
+        self.frames_descartados = 0
+        self.resultados_descartados = 0
+
+    def registrar_deteccion(self, deteccion):
+        """
+        Registra una deteccion
+
+        Args:
+            deteccion (dict): Deteccion producida por SistemaReconocimiento
+        """
+        self.total_detecciones += 1
+        self.por_persona[deteccion["nombre"]] += 1
+        self.por_rol[deteccion["rol"]] += 1
+
+        resumen = {k: v for k, v in deteccion.items() if k not in CAMPOS_EXCLUIDOS}
+        self.detecciones_recientes.append(resumen)
+
+    def registrar_alerta(self, alerta):
+        """
+        Registra una alerta
+
+        Args:
+            alerta (dict): Informacion de la alerta (timestamp, nombre, rol, tipo_alerta)
+        """
+        self.total_alertas += 1
+        self.por_nivel_alerta[alerta["tipo_alerta"]] += 1
+        self.alertas_recientes.append(alerta)
+
+    def registrar_latencia(self, latencia_ms):
+        """
+        Registra la latencia de un resultado
+
+        Args:
+            latencia_ms (float): Tiempo desde la captura del frame hasta su resultado
+        """
+        self.latencias_ms.append(latencia_ms)
+        self.latencia_max_ms = max(self.latencia_max_ms, latencia_ms)
+
+    def resumen_latencia(self):
+        """
+        Latencia de los resultados recientes
+
+        Returns:
+            dict: ultima, media, p95 y max (ms), o None si todavia no hay resultados
+        """
+        if not self.latencias_ms:
+            return None
+
+        ordenadas = sorted(self.latencias_ms)
+        return {
+            "ultima": self.latencias_ms[-1],
+            "media": sum(ordenadas) / len(ordenadas),
+            "p95": ordenadas[min(int(len(ordenadas) * 0.95), len(ordenadas) - 1)],
+            "max": self.latencia_max_ms,
+        }
+
+    def ultimas_alertas(self, cantidad=5):
+        """
+        Retorna las ultimas alertas registradas
+
+        Args:
+            cantidad (int): Cantidad de alertas
+
+        Returns:
+            list: Alertas mas recientes, de la mas vieja a la mas nueva
+        """
+        return list(self.alertas_recientes)[-cantidad:]
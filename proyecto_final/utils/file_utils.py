@@ -4,6 +4,7 @@ Utilidades para manejo de archivos
 
 import os
 import sys
+import threading
 import time
 from datetime import datetime
 
@@ -33,30 +34,130 @@ def guardar_frame_temporal(frame, prefijo="frame"):
     return filepath
 
 
-def limpiar_archivos_temporales(max_edad_minutos=10):
+def limpiar_archivos_temporales(max_edad_minutos=10, max_bytes=None, directorio=None):
     """
-    Limpia archivos temporales antiguos
+    Limpia archivos temporales por edad y por cuota de espacio total
+
+    Recorre el directorio una sola vez con os.scandir y reutiliza el stat de
+    cada entrada. Elimina primero los archivos mas viejos hasta que no quede
+    ninguno vencido y el total entre en la cuota.
 
     Args:
         max_edad_minutos (int): Edad maxima en minutos
+        max_bytes (int): Tamano total maximo del directorio (None = sin cuota)
+        directorio (str): Directorio a limpiar (por defecto Config.TEMP_DIR)
+
+    Returns:
+        dict: Archivos eliminados, bytes liberados y bytes restantes
     """
-    ahora = time.time()
-    max_edad_segundos = max_edad_minutos * 60
+    directorio = directorio or Config.TEMP_DIR
+    limite_mtime = time.time() - max_edad_minutos * 60
+
+    archivos = []
+    try:
+        with os.scandir(directorio) as entradas:
+            for entrada in entradas:
+                try:
+                    if not entrada.is_file(follow_symlinks=False):
+                        continue
+                    st = entrada.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                archivos.append((st.st_mtime, st.st_size, entrada.path))
+    except FileNotFoundError:
+        return {"archivos_eliminados": 0, "bytes_liberados": 0, "bytes_restantes": 0}
+
+    # Mas viejos primero
+    archivos.sort()
+    bytes_totales = sum(tamano for _, tamano, _ in archivos)
 
     archivos_eliminados = 0
+    bytes_liberados = 0
 
-    for archivo in os.listdir(Config.TEMP_DIR):
-        ruta = os.path.join(Config.TEMP_DIR, archivo)
+    for mtime, tamano, ruta in archivos:
+        vencido = mtime < limite_mtime
+        excede_cuota = max_bytes is not None and bytes_totales > max_bytes
 
-        if os.path.isfile(ruta):
-            edad = ahora - os.path.getmtime(ruta)
+        # Lo que sigue es mas nuevo: si este no vence y la cuota se cumple, terminamos
+        if not vencido and not excede_cuota:
+            break
 
-            if edad > max_edad_segundos:
-                try:
-                    os.remove(ruta)
-                    archivos_eliminados += 1
-                except Exception:
-                    pass
+        try:
+            os.remove(ruta)
+        except OSError:
+            continue
+
+        archivos_eliminados += 1
+        bytes_liberados += tamano
+        bytes_totales -= tamano
 
     if archivos_eliminados > 0:
-        print(f"Limpiados {archivos_eliminados} archivos temporales")
+        print(f"Limpiados {archivos_eliminados} archivos temporales ({bytes_liberados / (1024 * 1024):.1f} MB)")
+
+    return {"archivos_eliminados": archivos_eliminados, "bytes_liberados": bytes_liberados, "bytes_restantes": bytes_totales}
+
+
+class LimpiadorTemporales:
+    """
+    Hilo en segundo plano que mantiene acotado el directorio temporal
+    """
+
+    def __init__(self, intervalo_segundos=None, max_edad_minutos=None, max_mb=None, directorio=None):
+        """
+        Inicializa el limpiador
+
+        Args:
+            intervalo_segundos (float): Tiempo entre pasadas
+            max_edad_minutos (int): Edad maxima de los archivos
+            max_mb (int): Cuota total en MB
+            directorio (str): Directorio a limpiar (por defecto Config.TEMP_DIR)
+        """
+        self.intervalo_segundos = intervalo_segundos or Config.TEMP_INTERVALO_LIMPIEZA
+        self.max_edad_minutos = max_edad_minutos or Config.TEMP_MAX_EDAD_MINUTOS
+        self.max_bytes = (max_mb or Config.TEMP_MAX_MB) * 1024 * 1024
+        self.directorio = directorio or Config.TEMP_DIR
+
+        self.archivos_eliminados = 0
+        self.bytes_liberados = 0
+
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def limpiar(self):
+        """
+        Ejecuta una pasada de limpieza y acumula los totales
+
+        Returns:
+            dict: Resultado de limpiar_archivos_temporales
+        """
+        resultado = limpiar_archivos_temporales(self.max_edad_minutos, self.max_bytes, self.directorio)
+        self.archivos_eliminados += resultado["archivos_eliminados"]
+        self.bytes_liberados += resultado["bytes_liberados"]
+        return resultado
+
+    def _ejecutar(self):
+        """Bucle del hilo: limpia al iniciar y luego cada intervalo"""
+        while True:
+            try:
+                self.limpiar()
+            except Exception as e:
+                print(f"Error limpiando temporales: {e}")
+
+            if self._detener.wait(self.intervalo_segundos):
+                break
+
+    def iniciar(self):
+        """Inicia el hilo de limpieza"""
+        if self._hilo and self._hilo.is_alive():
+            return
+
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo de limpieza"""
+        self._detener.set()
+
+        if self._hilo and self._hilo.is_alive():
+            self._hilo.join(timeout=2.0)
@@ -0,0 +1,253 @@
+"""
+Renderizado de overlays sin copias de frame completo
+
+Las mezclas semi-transparentes se aplican solo sobre la region afectada y en el
+mismo buffer del frame. Los textos se pre-renderizan como mascaras y se vuelven
+a rasterizar unicamente cuando su contenido cambia.
+"""
+
+import cv2
+import numpy as np
+
+FUENTE = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def _recortar_region(frame, x0, y0, x1, y1):
+    """
+    Devuelve la vista de la region (x0, y0)-(x1, y1) recortada a los limites del frame
+
+    Returns:
+        numpy.ndarray: Vista de la region o None si queda vacia
+    """
+    altura, ancho = frame.shape[:2]
+    x0, y0 = max(0, x0), max(0, y0)
+    x1, y1 = min(ancho, x1), min(altura, y1)
+
+    if x0 >= x1 or y0 >= y1:
+        return None
+
+    return frame[y0:y1, x0:x1]
+
+
+def oscurecer_region(frame, x0, y0, x1, y1, alpha=0.3):
+    """
+    Oscurece una region en el lugar (equivale a mezclar negro al 1 - alpha)
+
+    Args:
+        frame: Frame de OpenCV (se modifica)
+        x0, y0, x1, y1: Esquinas de la region
+        alpha (float): Fraccion del frame original que se conserva
+    """
+    region = _recortar_region(frame, x0, y0, x1, y1)
+    if region is not None:
+        cv2.convertScaleAbs(region, region, alpha)
+
+
+def tenir_region(frame, x0, y0, x1, y1, color, alpha=0.3):
+    """
+    Mezcla un color solido sobre una region en el lugar
+
+    Args:
+        frame: Frame de OpenCV (se modifica)
+        x0, y0, x1, y1: Esquinas de la region
+        color: Color BGR
+        alpha (float): Opacidad del color
+    """
+    region = _recortar_region(frame, x0, y0, x1, y1)
+    if region is not None:
+        cv2.convertScaleAbs(region, region, 1 - alpha)
+        cv2.add(region, (color[0] * alpha, color[1] * alpha, color[2] * alpha, 0), region)
+
+
+class CapaTexto:
+    """
+    Texto pre-renderizado como mascara
+
+    La mascara solo se vuelve a rasterizar cuando cambia el texto; dibujarla
+    solo toca la region del texto.
+    """
+
+    def __init__(self, escala, grosor):
+        """
+        Args:
+            escala (float): Escala de la fuente
+            grosor (int): Grosor del trazo
+        """
+        self.escala = escala
+        self.grosor = grosor
+        self.texto = None
+        self.mascara = None
+        self.binaria = True
+        self.alfa = None
+        self.alfa_inverso = None
+        self.alto_sobre_base = 0
+        self._sprites = {}
+
+    def actualizar(self, texto):
+        """
+        Rasteriza el texto si cambio
+
+        Args:
+            texto (str): Texto a mostrar
+
+        Returns:
+            bool: True si se volvio a rasterizar
+        """
+        if texto == self.texto:
+            return False
+
+        (ancho, alto), base = cv2.getTextSize(texto, FUENTE, self.escala, self.grosor)
+        margen = self.grosor
+
+        mascara = np.zeros((alto + base + 2 * margen, ancho + 2 * margen), dtype=np.uint8)
+        cv2.putText(mascara, texto, (margen, alto + margen), FUENTE, self.escala, 255, self.grosor)
+
+        # Con trazo sin antialiasing alcanza una mascara binaria; si no, se guarda el alfa
+        self.binaria = not np.any((mascara > 0) & (mascara < 255))
+        self.mascara = mascara
+        if not self.binaria:
+            self.alfa = mascara.astype(np.float32) / 255.0
+            self.alfa_inverso = 1.0 - self.alfa
+
+        self.texto = texto
+        self.alto_sobre_base = alto + margen
+        self._sprites = {}
+        return True
+
+    def _sprite(self, color):
+        """Bloque de color solido del tamano del texto, cacheado por color"""
+        sprite = self._sprites.get(color)
+        if sprite is None:
+            sprite = np.empty(self.mascara.shape + (3,), dtype=np.uint8)
+            sprite[:] = color
+            self._sprites[color] = sprite
+        return sprite
+
+    def ancho(self):
+        """Ancho en pixeles del texto actual"""
+        return 0 if self.mascara is None else self.mascara.shape[1]
+
+    def dibujar(self, frame, origen, color):
+        """
+        Dibuja el texto con el mismo origen (esquina inferior izquierda) que cv2.putText
+
+        Args:
+            frame: Frame de OpenCV (se modifica)
+            origen: Tupla (x, y) de la linea base
+            color: Color BGR
+        """
+        if self.mascara is None:
+            return
+
+        altura, ancho = frame.shape[:2]
+        alto_mascara, ancho_mascara = self.mascara.shape[:2]
+        x0 = origen[0] - self.grosor
+        y0 = origen[1] - self.alto_sobre_base
+
+        # Recortar mascara y region a los limites del frame
+        mx0, my0 = max(0, -x0), max(0, -y0)
+        mx1 = min(ancho_mascara, ancho - x0)
+        my1 = min(alto_mascara, altura - y0)
+
+        if mx0 >= mx1 or my0 >= my1:
+            return
+
+        region = frame[y0 + my0: y0 + my1, x0 + mx0: x0 + mx1]
+        sprite = self._sprite(tuple(color))[my0:my1, mx0:mx1]
+
+        if self.binaria:
+            cv2.copyTo(sprite, self.mascara[my0:my1, mx0:mx1], region)
+        else:
+            region[:] = cv2.blendLinear(region, sprite, self.alfa_inverso[my0:my1, mx0:mx1], self.alfa[my0:my1, mx0:mx1])
+
+
+class RenderizadorHUD:
+    """
+    Dibuja el panel de informacion, las alertas y los mensajes del modo en tiempo real
+    """
+
+    def __init__(self, titulo, controles):
+        """
+        Args:
+            titulo (str): Titulo fijo del panel superior
+            controles (str): Texto fijo de la barra de controles
+        """
+        self.titulo = CapaTexto(0.8, 2)
+        self.titulo.actualizar(titulo)
+        self.controles = CapaTexto(0.5, 1)
+        self.controles.actualizar(controles)
+
+        self.lineas_info = []
+        self.alerta_nivel = CapaTexto(1.2, 3)
+        self.alerta_persona = CapaTexto(0.7, 2)
+        self.alerta_rol = CapaTexto(0.6, 1)
+        self.mensaje = CapaTexto(1.2, 2)
+
+    def dibujar_info(self, frame, textos):
+        """
+        Dibuja el panel superior con el titulo y las lineas de informacion
+
+        Args:
+            frame: Frame de OpenCV (se modifica)
+            textos: Lista de lineas de informacion
+        """
+        altura, ancho = frame.shape[:2]
+
+        oscurecer_region(frame, 0, 0, ancho, 120, 0.3)
+        self.titulo.dibujar(frame, (20, 35), (255, 255, 255))
+
+        while len(self.lineas_info) < len(textos):
+            self.lineas_info.append(CapaTexto(0.5, 1))
+
+        y_pos = 65
+        for capa, texto in zip(self.lineas_info, textos):
+            capa.actualizar(texto)
+            capa.dibujar(frame, (20, y_pos), (200, 200, 200))
+            y_pos += 25
+
+        self.controles.dibujar(frame, (20, altura - 20), (200, 200, 200))
+
+    def dibujar_alerta(self, frame, texto_nivel, texto_persona, texto_rol, color, parpadeo):
+        """
+        Dibuja el panel de alerta
+
+        Args:
+            frame: Frame de OpenCV (se modifica)
+            texto_nivel (str): Nivel de la alerta
+            texto_persona (str): Linea con la persona
+            texto_rol (str): Linea con el rol
+            color: Color BGR de la alerta
+            parpadeo (bool): Si se tine el fondo en este frame
+        """
+        ancho = frame.shape[1]
+
+        if parpadeo:
+            tenir_region(frame, 0, 150, ancho, 250, color, 0.3)
+
+        cv2.rectangle(frame, (50, 150), (ancho - 50, 250), color, 3)
+        cv2.rectangle(frame, (50, 150), (ancho - 50, 190), color, -1)
+
+        self.alerta_nivel.actualizar(texto_nivel)
+        self.alerta_persona.actualizar(texto_persona)
+        self.alerta_rol.actualizar(texto_rol)
+
+        self.alerta_nivel.dibujar(frame, (70, 180), (255, 255, 255))
+        self.alerta_persona.dibujar(frame, (70, 215), (255, 255, 255))
+        self.alerta_rol.dibujar(frame, (70, 240), (255, 255, 255))
+
+    def dibujar_mensaje_centro(self, frame, mensaje, color=(255, 255, 255)):
+        """
+        Dibuja un mensaje centrado sobre una franja oscurecida
+
+        Args:
+            frame: Frame de OpenCV (se modifica)
+            mensaje (str): Texto a mostrar
+            color: Color BGR del texto
+        """
+        altura, ancho = frame.shape[:2]
+
+        oscurecer_region(frame, 0, altura // 2 - 60, ancho, altura // 2 + 60, 0.3)
+
+        self.mensaje.actualizar(mensaje)
+        x_texto = (ancho - self.mensaje.ancho()) // 2 + self.mensaje.grosor
+        self.mensaje.dibujar(frame, (x_texto, altura // 2), color)
@@ -0,0 +1,164 @@
+"""
+Registro binario de eventos de reconocimiento (append-only, segmentos .npy)
+"""
+
+import glob
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from config import Config
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+LARGO_IDENTIDAD = 48
+
+
+def crear_dtype_eventos(dimension):
+    """
+    Crea el dtype de registro de ancho fijo para una dimension de embedding
+
+    Args:
+        dimension (int): Dimension del embedding
+
+    Returns:
+        numpy.dtype: dtype estructurado de un evento
+    """
+    return np.dtype(
+        [
+            ("timestamp", "<f8"),
+            ("camara", "<i2"),
+            ("bbox", "<i4", (4,)),
+            ("track_id", "<i4"),
+            ("identidad", f"S{LARGO_IDENTIDAD}"),
+            ("distancia", "<f4"),
+            ("embedding", "<f2", (dimension,)),
+        ]
+    )
+
+
+def listar_segmentos(directorio=None):
+    """
+    Lista los segmentos del registro en orden cronologico
+
+    Args:
+        directorio (str): Directorio del registro (por defecto Config.EVENTOS_DIR)
+
+    Returns:
+        list: Rutas de los segmentos .npy
+    """
+    directorio = directorio or Config.EVENTOS_DIR
+    return sorted(glob.glob(os.path.join(directorio, "eventos_*.npy")))
+
+
+def abrir_segmento(ruta):
+    """
+    Abre un segmento mapeado en memoria (solo lectura)
+
+    Args:
+        ruta (str): Ruta del segmento
+
+    Returns:
+        numpy.memmap: Array estructurado de eventos
+    """
+    return np.load(ruta, mmap_mode="r")
+
+
+class RegistroEventos:
+    """
+    Registro append-only de cada rostro visto
+
+    Los eventos se acumulan en un buffer preasignado de tamano fijo y se
+    escriben como un segmento .npy nuevo cuando el buffer se llena o pasa
+    el intervalo de vaciado. Los segmentos nunca se modifican.
+    """
+
+    def __init__(self, directorio=None, tamano_segmento=None, camara=None):
+        """
+        Inicializa el registro
+
+        Args:
+            directorio (str): Directorio de segmentos (por defecto Config.EVENTOS_DIR)
+            tamano_segmento (int): Eventos maximos por segmento
+            camara (int): Identificador de la camara que genera los eventos
+        """
+        self.directorio = directorio or Config.EVENTOS_DIR
+        self.tamano_segmento = tamano_segmento or Config.EVENTOS_TAMANO_SEGMENTO
+        self.camara = Config.CAMERA_INDEX if camara is None else camara
+        os.makedirs(self.directorio, exist_ok=True)
+
+        self.buffer = None
+        self.pendientes = 0
+        self.ultimo_vaciado = time.time()
+        self.eventos_escritos = 0
+        self.cerrado = False
+        self.lock = threading.Lock()
+
+    def registrar(self, deteccion, timestamp=None):
+        """
+        Agrega una deteccion al registro
+
+        Args:
+            deteccion (dict): Deteccion con bbox, nombre, distancia y embedding
+            timestamp (float): Epoch del evento (por defecto time.time())
+        """
+        embedding = deteccion.get("embedding")
+        if embedding is None:
+            return
+
+        with self.lock:
+            # Un worker que termina despues de cerrar no debe abrir un buffer que nadie vaciara
+            if self.cerrado:
+                return
+
+            if self.buffer is None:
+                self.buffer = np.zeros(self.tamano_segmento, dtype=crear_dtype_eventos(len(embedding)))
+
+            evento = self.buffer[self.pendientes]
+            bbox = deteccion["bbox"]
+
+            evento["timestamp"] = timestamp if timestamp is not None else time.time()
+            evento["camara"] = self.camara
+            evento["bbox"] = (bbox["x"], bbox["y"], bbox["w"], bbox["h"])
+            evento["track_id"] = deteccion.get("track_id", -1)
+            # Se corta en bytes sin partir un caracter multibyte
+            evento["identidad"] = deteccion["nombre"].encode("utf-8")[:LARGO_IDENTIDAD].decode("utf-8", "ignore").encode("utf-8")
+            evento["distancia"] = np.nan if deteccion.get("distancia") is None else deteccion["distancia"]
+            evento["embedding"] = embedding
+            self.pendientes += 1
+
+            if self.pendientes >= self.tamano_segmento or time.time() - self.ultimo_vaciado >= Config.EVENTOS_VACIAR_SEGUNDOS:
+                self._vaciar()
+
+    def _vaciar(self):
+        """Escribe los eventos pendientes como un segmento nuevo (requiere el lock)"""
+        self.ultimo_vaciado = time.time()
+
+        if self.pendientes == 0:
+            return
+
+        nombre = f"eventos_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.npy"
+        ruta = os.path.join(self.directorio, nombre)
+        temporal = ruta + ".tmp"
+
+        with open(temporal, "wb") as f:
+            np.save(f, self.buffer[: self.pendientes])
+        os.replace(temporal, ruta)
+
+        self.eventos_escritos += self.pendientes
+        self.pendientes = 0
+
+    def vaciar(self):
+        """Fuerza la escritura de los eventos pendientes"""
+        with self.lock:
+            self._vaciar()
+
+    def cerrar(self):
+        """Escribe lo pendiente, libera el buffer y deja de aceptar eventos"""
+        with self.lock:
+            self._vaciar()
+            self.buffer = None
+            self.cerrado = True